@@ -0,0 +1,50 @@
+"""
+Account Store Memory Benchmark
+
+Compares the memory held by users_db as a Dict[str, User] with a
+walletColumnar.ColumnarStore holding the same accounts.
+
+usage: python benchmarks/bench_account_memory.py [N ...]   (default: 10000 1000000 10000000)
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletColumnar
+
+DEFAULT_SIZES = (10_000, 1_000_000, 10_000_000)
+
+
+def measure(make_store, n: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    store = make_store()
+    previous = wallet.use_store(store)
+    try:
+        for i in range(n):
+            wallet.register_user("User", f"user{i}@bank.com", "1234", 100.0)
+        gc.collect()
+        used, _ = tracemalloc.get_traced_memory()
+    finally:
+        wallet.use_store(previous)
+        tracemalloc.stop()
+    del store
+    return used
+
+
+def main(sizes) -> None:
+    print(f"{'accounts':>10} {'dict MiB':>10} {'columnar MiB':>13} {'B/acct dict':>12} {'B/acct col':>11} {'saving':>7}")
+    for n in sizes:
+        dict_bytes = measure(dict, n)
+        col_bytes = measure(walletColumnar.ColumnarStore, n)
+        print(f"{n:>10} {dict_bytes / 2**20:>10.1f} {col_bytes / 2**20:>13.1f} "
+              f"{dict_bytes / n:>12.0f} {col_bytes / n:>11.0f} {1 - col_bytes / dict_bytes:>7.0%}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
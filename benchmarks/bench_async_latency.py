@@ -0,0 +1,72 @@
+"""
+AsyncWallet Load Generator
+
+Starts N concurrent client coroutines against one AsyncWallet. Each client
+issues deposits, transfers and balance views back to back, and the script
+reports throughput and p50/p99/max request latency.
+
+usage: python benchmarks/bench_async_latency.py [--clients N] [--requests N] [--max-batch N] [--max-pending N]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletAsync
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+async def client(aw: walletAsync.AsyncWallet, emails: list, requests: int, seed: int, latencies: list) -> None:
+    rng = random.Random(seed)
+    clock = time.perf_counter
+    for _ in range(requests):
+        roll = rng.random()
+        started = clock()
+        if roll < 0.5:
+            sender, receiver = rng.sample(emails, 2)
+            await aw.transfer(sender, receiver, 1.0)
+        elif roll < 0.8:
+            await aw.deposit(rng.choice(emails), 2.0)
+        else:
+            await aw.view_balance(rng.choice(emails))
+        latencies.append(clock() - started)
+
+
+async def main(args) -> None:
+    wallet.users_db.clear()
+    emails = [f"user{i}@bank.com" for i in range(args.accounts)]
+    for email in emails:
+        wallet.register_user("User", email, "1234", 1000.0)
+        wallet.authenticate_user(email, "1234")
+
+    latencies: list = []
+    async with walletAsync.AsyncWallet(args.max_pending, args.max_batch) as aw:
+        started = time.perf_counter()
+        await asyncio.gather(*(client(aw, emails, args.requests, i, latencies) for i in range(args.clients)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    total = len(latencies)
+    print(f"clients={args.clients} requests={total} batches={aw.batches} "
+          f"avg_batch={aw.requests / aw.batches:.1f}")
+    print(f"throughput={total / elapsed:.0f} req/s  p50={percentile(latencies, 0.50) * 1e3:.2f} ms  "
+          f"p99={percentile(latencies, 0.99) * 1e3:.2f} ms  max={latencies[-1] * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--max-batch", type=int, default=1024)
+    parser.add_argument("--max-pending", type=int, default=10000)
+    asyncio.run(main(parser.parse_args()))
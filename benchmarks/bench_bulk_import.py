@@ -0,0 +1,100 @@
+"""
+Bulk Import / Export Throughput
+
+Writes a CSV of N accounts (a small share of them invalid or duplicated), then
+times walletBulk.import_accounts against calling register_user once per row,
+and times walletBulk.export_accounts. Peak traced memory of the import itself
+is reported for two file sizes to show it does not grow with the file.
+
+usage: python benchmarks/bench_bulk_import.py [--accounts N] [--chunk N]
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletBulk
+
+
+def write_source(path: str, accounts: int) -> None:
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("name", "email", "pin", "balance"))
+        for i in range(accounts):
+            if i % 100 == 1:
+                writer.writerow(("User", f"user{i - 1}@bank.com", "1234", "1.00"))
+            elif i % 100 == 2:
+                writer.writerow(("User", f"user{i}-bank", "1234", "1.00"))
+            else:
+                writer.writerow(("User", f"user{i}@bank.com", "1234", f"{i % 1000}.25"))
+
+
+def reset() -> None:
+    wallet.users_db.clear()
+    wallet.rebuild_ledger()
+
+
+def per_row(path: str) -> float:
+    reset()
+    started = time.perf_counter()
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for name, email, pin, balance in reader:
+            wallet.register_user(name, email, pin, float(balance))
+    return time.perf_counter() - started
+
+
+def bulk(path: str, errors: str, chunk: int) -> tuple:
+    reset()
+    started = time.perf_counter()
+    summary = walletBulk.import_accounts(path, errors, chunk)
+    return time.perf_counter() - started, summary
+
+
+def import_overhead(path: str, errors: str, chunk: int) -> int:
+    # Peak allocations above what the imported accounts themselves retain.
+    reset()
+    tracemalloc.start()
+    walletBulk.import_accounts(path, errors, chunk)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "accounts.csv")
+        errors = os.path.join(directory, "errors.csv")
+        exported = os.path.join(directory, "export.csv")
+        write_source(source, args.accounts)
+
+        elapsed = per_row(source)
+        print(f"register_user per row: {args.accounts / elapsed * 60:>12,.0f} rows/min")
+        elapsed, summary = bulk(source, errors, args.chunk)
+        print(f"import_accounts:       {args.accounts / elapsed * 60:>12,.0f} rows/min  ({summary.message})")
+        started = time.perf_counter()
+        written = walletBulk.export_accounts(exported, args.chunk)
+        elapsed = time.perf_counter() - started
+        print(f"export_accounts:       {written / elapsed * 60:>12,.0f} rows/min")
+
+        small = os.path.join(directory, "small.csv")
+        write_source(small, args.accounts // 10)
+        for label, path in (("1/10 file", small), ("full file", source)):
+            print(f"import overhead, {label}: {import_overhead(path, errors, args.chunk) / 1024:>8,.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
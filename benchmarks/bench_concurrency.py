@@ -0,0 +1,82 @@
+"""
+Concurrent Transfer Stress Benchmark
+
+Runs a mix of transfers and withdrawals from 1, 2, 4, 8 ... threads against a
+shared account book and reports throughput per thread count. After every run
+it checks the no-overdraft and conservation-of-funds invariants.
+
+usage: python benchmarks/bench_concurrency.py [--accounts N] [--ops-per-thread N] [--threads 1,2,4,8]
+"""
+
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+
+
+def setup(accounts: int) -> list:
+    wallet.users_db.clear()
+    emails = [f"user{i}@bank.com" for i in range(accounts)]
+    for email in emails:
+        wallet.register_user("User", email, "1234", 100.0)
+        wallet.authenticate_user(email, "1234")
+    return emails
+
+
+def run(emails: list, threads: int, ops: int) -> tuple:
+    withdrawn = [0] * threads
+    start_gate = threading.Barrier(threads + 1)
+
+    def worker(index: int) -> None:
+        rng = random.Random(index)
+        sample = rng.sample
+        start_gate.wait()
+        for _ in range(ops):
+            sender, receiver = sample(emails, 2)
+            if rng.random() < 0.1:
+                if wallet.withdraw(sender, 1.0).success:
+                    withdrawn[index] += wallet.to_millicents(1.0)
+            else:
+                wallet.transfer(sender, receiver, 2.5)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return elapsed, sum(withdrawn)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--ops-per-thread", type=int, default=20000)
+    parser.add_argument("--threads", default="1,2,4,8")
+    args = parser.parse_args()
+
+    print(f"{'threads':>7} {'ops/s':>10} {'scaling':>8}  invariants")
+    base = None
+    for threads in [int(t) for t in args.threads.split(",")]:
+        emails = setup(args.accounts)
+        initial = sum(u.balance_mc for u in wallet.users_db.values())
+        elapsed, withdrawn = run(emails, threads, args.ops_per_thread)
+        balances = [u.balance_mc for u in wallet.users_db.values()]
+        ok = min(balances) >= 0 and sum(balances) + withdrawn == initial
+        rate = threads * args.ops_per_thread / elapsed
+        base = base or rate
+        print(f"{threads:>7} {rate:>10.0f} {rate / base:>7.2f}x  {'ok' if ok else 'VIOLATED'}")
+        if not ok:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
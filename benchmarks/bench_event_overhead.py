@@ -0,0 +1,91 @@
+"""
+Event Stream Overhead
+
+Times the transfer path with no event stream attached and with an EventStream
+attached (a subscriber draining it between rounds), and reports the relative
+overhead. Rounds are short, alternate between the two setups, are timed in
+process CPU time, and the best round of each is kept, to cancel out machine
+noise. On a noisy machine the end-to-end figure can still swing by several
+percent either way, so the cost of the hook itself is also timed in isolation,
+net of calling an empty function, and reported as a share of one transfer.
+
+usage: python benchmarks/bench_event_overhead.py [--accounts N] [--transfers N] [--rounds N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletEvents
+
+
+def setup(accounts: int) -> list:
+    wallet.users_db.clear()
+    wallet.rebuild_ledger()
+    emails = [f"user{i}@bank.com" for i in range(accounts)]
+    for email in emails:
+        wallet.register_user("User", email, "1234", 1_000_000.0)
+        wallet.authenticate_user(email, "1234")
+    return emails
+
+
+def timed(pairs: list) -> float:
+    transfer = wallet.transfer
+    started = time.process_time()
+    for sender, receiver in pairs:
+        transfer(sender, receiver, 1.0)
+    return time.process_time() - started
+
+
+def per_call(hook, calls: int) -> float:
+    best = float("inf")
+    for _ in range(7):
+        started = time.process_time()
+        for _ in range(calls):
+            hook("transfer", "a@bank.com", "b@bank.com", 100_000)
+        best = min(best, time.process_time() - started)
+    return best / calls
+
+
+def noop(op, a=None, b=None, c=None, d=None, *unused) -> None:
+    pass
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--transfers", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=40)
+    args = parser.parse_args()
+
+    emails = setup(args.accounts)
+    rng = random.Random(1)
+    pairs = [tuple(rng.sample(emails, 2)) for _ in range(args.transfers)]
+    stream = walletEvents.EventStream(1 << 18)
+    subscription = stream.subscribe()
+    plain, streamed = [], []
+    for _ in range(args.rounds):
+        plain.append(timed(pairs))
+        wallet.add_mutation_hook(stream.record)
+        streamed.append(timed(pairs))
+        wallet.remove_mutation_hook(stream.record)
+        while subscription.poll(65536):
+            subscription.commit()
+    base, with_events = min(plain), min(streamed)
+    print(f"no stream:   {args.transfers / base:>10,.0f} transfers/s")
+    print(f"with stream: {args.transfers / with_events:>10,.0f} transfers/s  "
+          f"overhead {(with_events / base - 1):+.1%}  missed {subscription.missed}")
+    stream.close()
+    probe = walletEvents.EventStream(1 << 18)
+    per_event = per_call(probe.record, 200_000) - per_call(noop, 200_000)
+    probe.close()
+    print(f"hook alone:  {per_event * 1e9:>10,.0f} ns/event  = {per_event / (base / args.transfers):.1%} of a transfer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Import and First-Call Latency
+
+Measures what a short-lived process (a CLI tool, a serverless worker) pays before
+its first useful result: the time to import digitalWalletSystem, and the time
+from there to the first completed operation. Every sample runs in a fresh
+interpreter, so nothing is cached in sys.modules; each figure is the fastest of
+--runs processes, to cancel out machine noise.
+
+Scenarios:
+    import       import digitalWalletSystem and nothing else
+    money        import, then one to_millicents() call (loads money only)
+    status       import, then a Reason lookup (loads status only)
+    first_op     import, then register_user, authenticate_user and deposit on
+                 the default wallet (loads the engine and creates the wallet)
+    wallet       import, then the same three operations on a new Wallet()
+    eager        import every submodule up front, as a monolithic module would
+
+With --compare REV the same scenarios are also run against the src/ tree of git
+revision REV (e.g. one from before the package split) for a side-by-side figure;
+scenarios the old tree cannot run are left blank.
+
+usage: python benchmarks/bench_import.py [--runs N] [--compare REV]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+SETUP = "import time; started = time.perf_counter()\n"
+SCENARIOS = {
+    "import": "import digitalWalletSystem as wallet\n",
+    "money": "import digitalWalletSystem as wallet\nwallet.to_millicents(1.0)\n",
+    "status": "import digitalWalletSystem as wallet\nwallet.Reason.OK\n",
+    "first_op": ("import digitalWalletSystem as wallet\n"
+                 "wallet.register_user('Ana', 'ana@mail.com', '1234', 10.0)\n"
+                 "wallet.authenticate_user('ana@mail.com', '1234')\n"
+                 "assert wallet.deposit('ana@mail.com', 1.0).success\n"),
+    "wallet": ("import digitalWalletSystem as wallet\n"
+               "w = wallet.Wallet()\n"
+               "w.register_user('Ana', 'ana@mail.com', '1234', 10.0)\n"
+               "w.authenticate_user('ana@mail.com', '1234')\n"
+               "assert w.deposit('ana@mail.com', 1.0).success\n"),
+    "eager": ("import digitalWalletSystem as wallet\n"
+              "import digitalWalletSystem.money, digitalWalletSystem.status\n"
+              "import digitalWalletSystem.storage, digitalWalletSystem.engine\n"),
+}
+REPORT = "print(time.perf_counter() - started)\n"
+
+
+def sample(src: str, body: str) -> float:
+    env = dict(os.environ, PYTHONPATH=src, PYTHONDONTWRITEBYTECODE="")
+    result = subprocess.run([sys.executable, "-c", SETUP + body + REPORT], env=env,
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return float("nan")
+    return float(result.stdout)
+
+
+def best(src: str, body: str, runs: int) -> float:
+    sample(src, body)  # writes the .pyc files, so every timed run reads bytecode
+    return min(sample(src, body) for _ in range(runs))
+
+
+def checkout(rev: str, into: str) -> str:
+    repo = os.path.dirname(SRC)
+    archive = subprocess.run(["git", "-C", repo, "archive", rev, "src"], capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", into], input=archive.stdout, check=True)
+    return os.path.join(into, "src")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--compare", metavar="REV")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        old = checkout(args.compare, tmp) if args.compare else None
+        header = f"{'scenario':<12}{'ms':>10}"
+        if old:
+            header += f"{args.compare[:10]:>14}{'speedup':>10}"
+        print(header)
+        for name, body in SCENARIOS.items():
+            seconds = best(SRC, body, args.runs)
+            line = f"{name:<12}{seconds * 1e3:>10.2f}"
+            if old:
+                before = best(old, body, args.runs)
+                if before == before:  # not NaN: the old tree can run this scenario
+                    line += f"{before * 1e3:>14.2f}{before / seconds:>9.1f}x"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Secondary Index Cost
+
+Measures what the account indexes of walletIndex cost and what they buy. Write
+throughput (transfer, deposit, register_user) is timed with no index attached and
+with one attached; rounds alternate between the two and the best round of each
+is kept, to cancel out machine noise. Then the indexed queries (balance range,
+locked accounts, name prefix) are timed against the full scan of users_db they
+replace.
+
+usage: python benchmarks/bench_index_cost.py [--accounts N] [--ops N] [--rounds N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletIndex
+
+NAMES = ("Ana", "Bruno", "Carla", "Diogo", "Eva", "Filipe", "Gil", "Helena")
+
+
+def setup(accounts: int) -> list:
+    wallet.users_db.clear()
+    wallet.rebuild_ledger()
+    wallet.configure_throttle(enabled=False)
+    rng = random.Random(1)
+    emails = [f"user{i}@bank.com" for i in range(accounts)]
+    for i, email in enumerate(emails):
+        wallet.register_user(f"{rng.choice(NAMES)} {i}", email, "1234", rng.uniform(0, 50_000))
+        wallet.authenticate_user(email, "1234")
+    for email in rng.sample(emails, accounts // 100):
+        user = wallet.users_db[email]
+        user.locked = True
+    return emails
+
+
+def timed_writes(kind: str, calls: list) -> float:
+    started = time.perf_counter()
+    for operation, args in calls:
+        operation(*args)
+    return time.perf_counter() - started
+
+
+def make_calls(kind: str, emails: list, ops: int, round_no: int) -> list:
+    rng = random.Random(round_no)
+    if kind == "transfer":
+        return [(wallet.transfer, tuple(rng.sample(emails, 2)) + (1.0,)) for _ in range(ops)]
+    if kind == "deposit":
+        return [(wallet.deposit, (rng.choice(emails), 1.0)) for _ in range(ops)]
+    return [(wallet.register_user, ("New", f"new{round_no}-{i}@bank.com", "1234", 10.0)) for i in range(ops)]
+
+
+def best(fn, number: int = 20) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=50_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    emails = setup(args.accounts)
+    started = time.perf_counter()
+    index = walletIndex.open_index()
+    print(f"index build: {time.perf_counter() - started:.2f} s for {args.accounts:,} accounts")
+    index.close()
+
+    round_no = 0
+    for kind in ("transfer", "deposit", "register_user"):
+        plain, indexed = [], []
+        for _ in range(args.rounds):
+            round_no += 1
+            plain.append(timed_writes(kind, make_calls(kind, emails, args.ops, round_no)))
+            round_no += 1
+            calls = make_calls(kind, emails, args.ops, round_no)
+            index.open()
+            indexed.append(timed_writes(kind, calls))
+            index.close()
+        base, with_index = min(plain), min(indexed)
+        print(f"{kind:<14} no index {args.ops / base:>10,.0f} ops/s  with index {args.ops / with_index:>10,.0f} ops/s  "
+              f"overhead {(with_index / base - 1):+.1%}  ({(with_index - base) / args.ops * 1e6:.2f} us/op)")
+
+    index.open()
+    users = wallet.users_db
+    queries = (
+        ("balance 10k-10.1k", lambda: index.balance_range(10_000.0, 10_100.0),
+         lambda: [u.email for u in users.values() if 10_000.0 <= u.balance <= 10_100.0]),
+        ("top 100 by balance", lambda: index.balance_range(40_000.0, limit=100),
+         lambda: [u.email for u in users.values() if u.balance >= 40_000.0][:100]),
+        ("locked accounts", index.locked, lambda: [u.email for u in users.values() if u.locked]),
+        ("name prefix", lambda: index.by_name("helena 12"),
+         lambda: [u.email for u in users.values() if u.name.casefold().startswith("helena 12")][:50]),
+    )
+    for name, indexed_query, scan in queries:
+        print(f"{name:<20} index {best(indexed_query) * 1e6:>10,.1f} us   scan {best(scan, 2) * 1e6:>12,.1f} us")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
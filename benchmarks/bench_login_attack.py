@@ -0,0 +1,92 @@
+"""
+Login Attack Benchmark
+
+Simulates credential stuffing against authenticate_user: a few attacking sources
+send bursts of guesses for mostly unknown emails (plus wrong PINs for real ones),
+interleaved with legitimate logins from many distinct sources. It runs once with
+throttling disabled and once enabled, and reports throughput, how many attack
+attempts reached the account lookup, accounts locked, the share of legitimate
+logins that got through, and how many buckets the throttle holds.
+
+usage: python benchmarks/bench_login_attack.py [--accounts N] [--requests N] [--attackers N] [--legit F]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+
+THROTTLED = "Too many login attempts. Try again later."
+
+
+def setup(accounts: int) -> list:
+    wallet.users_db.clear()
+    wallet.rebuild_ledger()
+    emails = [f"user{i}@bank.com" for i in range(accounts)]
+    for email in emails:
+        wallet.register_user("User", email, "1234", 100.0)
+    return emails
+
+
+def make_traffic(emails: list, requests: int, attackers: int, legit: float, seed: int) -> list:
+    rng = random.Random(seed)
+    traffic = []
+    for i in range(requests):
+        if rng.random() < legit:
+            traffic.append((True, rng.choice(emails), "1234", f"client-{i}"))
+        elif rng.random() < 0.9:
+            traffic.append((False, f"leaked{rng.randrange(10**9)}@mail.com", "0000", f"attacker-{rng.randrange(attackers)}"))
+        else:
+            traffic.append((False, rng.choice(emails), f"{rng.randrange(10000):04d}", f"attacker-{rng.randrange(attackers)}"))
+    return traffic
+
+
+def run(emails: list, traffic: list, enabled: bool) -> dict:
+    wallet.configure_throttle(enabled=enabled)
+    for email in emails:
+        user = wallet.users_db[email]
+        user.locked = False
+        user.login_attempts = 0
+    wallet.rebuild_ledger()
+    authenticate = wallet.authenticate_user
+    started = time.perf_counter()
+    results = [authenticate(email, pin, source) for _, email, pin, source in traffic]
+    elapsed = time.perf_counter() - started
+
+    legit = [r for (is_legit, *_), r in zip(traffic, results) if is_legit]
+    attacks = [r for (is_legit, *_), r in zip(traffic, results) if not is_legit]
+    return {
+        "rate": len(traffic) / elapsed,
+        "attacks_reaching_lookup": sum(r.message != THROTTLED for r in attacks),
+        "attacks": len(attacks),
+        "locked": wallet.ledger_summary().locked_accounts,
+        "legit_ok": sum(r.success for r in legit) / max(1, len(legit)),
+        "buckets": len(wallet._email_buckets or ()) + len(wallet._source_buckets or ()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500_000)
+    parser.add_argument("--attackers", type=int, default=20)
+    parser.add_argument("--legit", type=float, default=0.05)
+    args = parser.parse_args()
+
+    emails = setup(args.accounts)
+    traffic = make_traffic(emails, args.requests, args.attackers, args.legit, seed=1)
+    for enabled in (False, True):
+        stats = run(emails, traffic, enabled)
+        print(f"throttle {'on ' if enabled else 'off'}: {stats['rate']:>10,.0f} req/s  "
+              f"attacks reaching lookup {stats['attacks_reaching_lookup']:,}/{stats['attacks']:,}  "
+              f"locked accounts {stats['locked']:,}  legit logins ok {stats['legit_ok']:.1%}  "
+              f"buckets held {stats['buckets']:,}")
+
+
+if __name__ == "__main__":
+    main()
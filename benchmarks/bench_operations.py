@@ -0,0 +1,174 @@
+"""
+Wallet Operation Benchmark Suite
+
+Drives every public operation (register_user, authenticate_user, view_balance,
+deposit, apply_interest, transfer, withdraw) and a weighted mix of them against
+an account book of realistic size. For each scenario it reports throughput,
+p50/p99 latency and the peak memory allocated while it ran; timings come from
+the fastest of --repeat runs.
+
+Results can be written as JSON (--json) and compared with an earlier run
+(--baseline): any scenario whose throughput dropped by more than --threshold
+is reported and the script exits with status 1, so it can gate a change in CI.
+Compare runs from the same machine only.
+
+usage: python benchmarks/bench_operations.py [--accounts N] [--ops N] [--repeat N] [--only a,b]
+                                             [--json out.json] [--baseline base.json] [--threshold 0.1]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+
+# operation -> weight in the "mix" scenario
+MIX = (
+    ("view_balance", 40),
+    ("deposit", 20),
+    ("transfer", 20),
+    ("withdraw", 10),
+    ("apply_interest", 5),
+    ("authenticate_user", 5),
+)
+
+
+def reset(accounts: int) -> list:
+    wallet.users_db.clear()
+    wallet.rebuild_ledger()
+    wallet.configure_throttle(enabled=False)
+    wallet.configure_sessions()
+    emails = [f"user{i}@bank.com" for i in range(accounts)]
+    for email in emails:
+        wallet.register_user("User", email, "1234", 1_000.0)
+        wallet.authenticate_user(email, "1234")
+    return emails
+
+
+def make_calls(scenario: str, emails: list, ops: int, seed: int) -> list:
+    rng = random.Random(seed)
+    calls = []
+    if scenario == "register_user":
+        return [(wallet.register_user, ("User", f"new{i}@bank.com", "1234", 10.0)) for i in range(ops)]
+    choices = [name for name, weight in MIX for _ in range(weight)] if scenario == "mix" else [scenario]
+    for _ in range(ops):
+        op = rng.choice(choices)
+        email = rng.choice(emails)
+        if op == "authenticate_user":
+            calls.append((wallet.authenticate_user, (email, "1234")))
+        elif op == "view_balance":
+            calls.append((wallet.view_balance, (email,)))
+        elif op == "deposit":
+            calls.append((wallet.deposit, (email, 5.0)))
+        elif op == "apply_interest":
+            calls.append((wallet.apply_interest, (email, 0.0001)))
+        elif op == "transfer":
+            calls.append((wallet.transfer, (email, rng.choice(emails), 1.0)))
+        elif op == "withdraw":
+            calls.append((wallet.withdraw, (email, 1.0)))
+    return calls
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def timed_run(scenario: str, accounts: int, ops: int) -> tuple:
+    emails = reset(accounts)
+    calls = make_calls(scenario, emails, ops, seed=1)
+    clock = time.perf_counter_ns
+    latencies = []
+    record = latencies.append
+    started = clock()
+    for operation, args in calls:
+        t0 = clock()
+        operation(*args)
+        record(clock() - t0)
+    return (clock() - started) / 1e9, latencies
+
+
+def run_scenario(scenario: str, accounts: int, ops: int, repeat: int) -> dict:
+    # The fastest of several runs is the least disturbed by the rest of the machine.
+    elapsed, latencies = min((timed_run(scenario, accounts, ops) for _ in range(repeat)),
+                             key=lambda run: run[0])
+    latencies.sort()
+
+    # Memory is measured in a second pass: tracemalloc slows every allocation down.
+    emails = reset(accounts)
+    calls = make_calls(scenario, emails, ops, seed=1)
+    tracemalloc.start()
+    for operation, args in calls:
+        operation(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "ops": ops,
+        "ops_per_sec": ops / elapsed,
+        "p50_us": percentile(latencies, 0.50) / 1000,
+        "p99_us": percentile(latencies, 0.99) / 1000,
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+def regressions(results: dict, baseline: dict, threshold: float) -> list:
+    failed = []
+    for scenario, result in results.items():
+        before = baseline.get("scenarios", {}).get(scenario)
+        if before is None:
+            continue
+        change = result["ops_per_sec"] / before["ops_per_sec"] - 1
+        if change < -threshold:
+            failed.append((scenario, change))
+    return failed
+
+
+def main() -> None:
+    scenarios = [name for name, _ in MIX] + ["register_user", "mix"]
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=100_000)
+    parser.add_argument("--only", default=",".join(scenarios))
+    parser.add_argument("--json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'scenario':<18} {'ops/s':>12} {'p50 us':>9} {'p99 us':>9} {'peak KiB':>10}")
+    for scenario in args.only.split(","):
+        result = results[scenario] = run_scenario(scenario, args.accounts, args.ops, args.repeat)
+        print(f"{scenario:<18} {result['ops_per_sec']:>12,.0f} {result['p50_us']:>9.2f} "
+              f"{result['p99_us']:>9.2f} {result['peak_memory_kib']:>10,.0f}")
+
+    report = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "accounts": args.accounts,
+        "repeat": args.repeat,
+        "scenarios": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        failed = regressions(results, baseline, args.threshold)
+        for scenario, change in failed:
+            print(f"REGRESSION {scenario}: {change:+.1%} ops/s (threshold -{args.threshold:.0%})")
+        if failed:
+            sys.exit(1)
+        print(f"no regression beyond -{args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
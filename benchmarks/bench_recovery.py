@@ -0,0 +1,77 @@
+"""
+Journal Recovery Benchmark
+
+Measures how long walletJournal takes to rebuild a wallet of --accounts accounts
+at startup, from:
+
+    log         a log segment holding one registration per account followed by
+                --deposits deposit records spread over the accounts
+    snapshot    a compacted snapshot of the same accounts and an empty segment
+
+The journal files are written directly with the journal's own encoders
+(encode_record, write_snapshot), so building them is not part of the figure.
+Each figure is the fastest of --runs recoveries into a fresh Wallet, in process
+CPU time, and is also reported per million accounts.
+
+usage: python benchmarks/bench_recovery.py [--accounts N] [--deposits N] [--runs N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletJournal
+from walletJournal import SNAPSHOT_NAME, encode_record, write_snapshot
+
+
+def write_log(directory: str, accounts: int, deposits: int) -> None:
+    records = [encode_record("register", f"user{i}@bank.com", "User", "1234", 10_000_000, 0.05)
+               for i in range(accounts)]
+    records += [encode_record("deposit", f"user{i % accounts}@bank.com", 100_000) for i in range(deposits)]
+    with open(os.path.join(directory, "wal-00000000.log"), "wb") as f:
+        f.write(b"".join(records))
+
+
+def write_compacted(directory: str, accounts: int) -> None:
+    rows = [("User", f"user{i}@bank.com", "1234", 10_000_000, 0, 0.05, 0, 0) for i in range(accounts)]
+    write_snapshot(os.path.join(directory, SNAPSHOT_NAME), 1, rows, {}, ())
+    open(os.path.join(directory, "wal-00000001.log"), "wb").close()
+
+
+def recover(directory: str, runs: int) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        target = wallet.Wallet()
+        journal = walletJournal.Journal(directory, target=target)
+        gc.collect()
+        started = time.process_time()
+        journal.recover()
+        best = min(best, time.process_time() - started)
+        journal._log.close()
+        del target, journal
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=200_000)
+    parser.add_argument("--deposits", type=int, default=200_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir, tempfile.TemporaryDirectory() as snapshot_dir:
+        write_log(log_dir, args.accounts, args.deposits)
+        write_compacted(snapshot_dir, args.accounts)
+        for scenario, directory in (("log", log_dir), ("snapshot", snapshot_dir)):
+            seconds = recover(directory, args.runs)
+            print(f"{scenario:<9} {seconds:>7.3f} s  {seconds * 1_000_000 / args.accounts:>7.2f} s per million accounts")
+
+
+if __name__ == "__main__":
+    main()
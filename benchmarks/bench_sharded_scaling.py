@@ -0,0 +1,97 @@
+"""
+Sharded Wallet Scaling Benchmark
+
+Runs the same mix of deposits, withdrawals and transfers against a ShardedWallet
+with 1, 2, 4 ... worker processes and reports throughput per worker count.
+Requests are sent with run_batch(), so every shard works on its share at the same
+time; a --cross fraction of the transfers goes between shards and pays for the
+two-phase commit. After every run it checks that no funds were created or lost.
+
+Scaling is bounded by the number of cores: on a machine with fewer cores than
+workers the extra processes only add overhead.
+
+usage: python benchmarks/bench_sharded_scaling.py [--accounts N] [--ops N] [--batch N] [--workers 1,2,4] [--cross F]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletShards
+
+
+def setup(sharded: walletShards.ShardedWallet, accounts: int) -> dict:
+    emails = [f"user{i}@bank.com" for i in range(accounts)]
+    sharded.run_batch([("register_user", "User", email, "1234", 100.0) for email in emails])
+    sharded.run_batch([("authenticate_user", email, "1234") for email in emails])
+    by_shard = {}
+    for email in emails:
+        by_shard.setdefault(sharded.shard_of(email), []).append(email)
+    return by_shard
+
+
+def make_requests(by_shard: dict, ops: int, cross: float, seed: int) -> list:
+    rng = random.Random(seed)
+    shards = list(by_shard)
+    requests = []
+    for _ in range(ops):
+        roll = rng.random()
+        home = by_shard[rng.choice(shards)]
+        if roll < 0.3:
+            requests.append(("deposit", rng.choice(home), 2.0))
+        elif roll < 0.4:
+            requests.append(("withdraw", rng.choice(home), 1.0))
+        elif len(shards) > 1 and rng.random() < cross:
+            first, second = rng.sample(shards, 2)
+            requests.append(("transfer", rng.choice(by_shard[first]), rng.choice(by_shard[second]), 2.5))
+        else:
+            sender, receiver = rng.sample(home, 2)
+            requests.append(("transfer", sender, receiver, 2.5))
+    return requests
+
+
+def run(workers: int, accounts: int, ops: int, batch: int, cross: float) -> tuple:
+    with walletShards.ShardedWallet(workers) as sharded:
+        by_shard = setup(sharded, accounts)
+        requests = make_requests(by_shard, ops, cross, seed=workers)
+        expected = sharded.total_funds_mc()
+        started = time.perf_counter()
+        results = []
+        for start in range(0, len(requests), batch):
+            results += sharded.run_batch(requests[start:start + batch])
+        elapsed = time.perf_counter() - started
+        for request, result in zip(requests, results):
+            if request[0] == "deposit" and result.success:
+                expected += wallet.to_millicents(request[2])
+            elif request[0] == "withdraw" and result.success:
+                expected -= wallet.to_millicents(request[2])
+        conserved = sharded.total_funds_mc() == expected
+    return elapsed, conserved
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--ops", type=int, default=200_000)
+    parser.add_argument("--batch", type=int, default=4096)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--cross", type=float, default=0.0)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cores, {args.accounts} accounts, {args.ops} ops, cross-shard fraction {args.cross}")
+    baseline = None
+    for workers in [int(n) for n in args.workers.split(",")]:
+        elapsed, conserved = run(workers, args.accounts, args.ops, args.batch, args.cross)
+        rate = args.ops / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>3} workers: {rate:>10,.0f} ops/s  speedup {rate / baseline:4.2f}x  "
+              f"funds {'conserved' if conserved else 'MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Per-Tenant Memory Benchmark
+
+Measures what hosting many tenants costs in memory, each tenant holding --accounts
+accounts in its own Wallet:
+
+    single      every account of every tenant in one shared Wallet (no isolation)
+    resident    one Wallet per tenant, all of them resident in a TenantRegistry
+    pooled      the same registry with --capacity resident tenants; the rest are
+                evicted to disk and loaded back on use
+    1024-stripe resident tenants with the default LOCK_STRIPES instead of --stripes;
+                measured on a sample of SAMPLE tenants and scaled up, since
+                at this size it would take gigabytes
+
+Memory is what a scenario retains: the tracemalloc total, after gc.collect(), of
+what was allocated while building it, measured only after a small warm-up run of
+every scenario so that one-off allocations (module state, caches) are not
+charged to the first one. The per-tenant figure is the excess per resident
+tenant over a single wallet holding the same resident accounts, so for the pooled
+scenario it includes the registry's bookkeeping for the evicted tenants. The
+pooled scenario also reports the mean latency of a tenant() call that has to
+load from disk and of one that finds the tenant resident.
+
+usage: python benchmarks/bench_tenant_memory.py [--tenants N] [--accounts N] [--stripes N] [--capacity N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletTenants
+
+SAMPLE = 500
+
+def populate(tenant: "wallet.Wallet", name: str, accounts: int) -> None:
+    for i in range(accounts):
+        tenant.register_user("User", f"user{i}@{name}.com", "1234", 100.0)
+
+
+def traced(build):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        kept = build()
+        gc.collect()
+        used, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return used, kept
+
+
+def warm_up(directory: str, stripes: int) -> None:
+    single(2, 2)
+    reg = registry(directory, 4, 2, stripes, 2)[1]
+    access(reg, ["t0", "t1"])
+    reg.close()
+
+
+def single(tenants: int, accounts: int) -> int:
+    def build():
+        shared = wallet.Wallet()
+        for t in range(tenants):
+            populate(shared, f"t{t}", accounts)
+        return shared
+    return traced(build)[0]
+
+
+def registry(directory: str, tenants: int, accounts: int, stripes: int, capacity: int):
+    def build():
+        reg = walletTenants.TenantRegistry(directory, capacity=capacity, lock_stripes=stripes)
+        for t in range(tenants):
+            with reg.tenant(f"t{t}") as tenant:
+                populate(tenant, f"t{t}", accounts)
+        return reg
+    return traced(build)
+
+
+def access(reg: "walletTenants.TenantRegistry", names) -> float:
+    started = time.perf_counter()
+    for name in names:
+        with reg.tenant(name) as tenant:
+            tenant.view_balance  # touch the wallet
+    return (time.perf_counter() - started) / len(names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=10_000)
+    parser.add_argument("--accounts", type=int, default=5)
+    parser.add_argument("--stripes", type=int, default=16)
+    parser.add_argument("--capacity", type=int, default=1000)
+    args = parser.parse_args()
+    n = args.tenants
+
+    with tempfile.TemporaryDirectory() as directory:
+        warm_up(directory, args.stripes)
+    baseline = single(n, args.accounts)
+    print(f"{n} tenants x {args.accounts} accounts")
+    print(f"{'scenario':<14}{'resident':>10}{'MiB':>10}{'KiB/tenant':>12}")
+    print(f"{'single':<14}{'-':>10}{baseline / 2**20:>10.1f}{'-':>12}")
+
+    scenarios = [("resident", args.stripes, n, n), ("pooled", args.stripes, args.capacity, n)]
+    if args.stripes != wallet.LOCK_STRIPES:
+        sample = min(n, SAMPLE)
+        scenarios.append((f"{wallet.LOCK_STRIPES}-stripe", wallet.LOCK_STRIPES, sample, sample))
+    for label, stripes, capacity, count in scenarios:
+        with tempfile.TemporaryDirectory() as directory:
+            used, reg = registry(directory, count, args.accounts, stripes, capacity)
+            resident = len(reg.resident())
+            same_accounts = baseline if resident == n else single(resident, args.accounts)
+            per_tenant = (used - same_accounts) / resident
+            # a sampled scenario is scaled up to n tenants
+            total = used if count == n else baseline + per_tenant * n
+            print(f"{label:<14}{resident * n // count:>10}{total / 2**20:>10.1f}"
+                  f"{per_tenant / 1024:>12.1f}")
+            if capacity < count:
+                cold = [f"t{t}" for t in range(n - capacity)][:capacity]
+                load = access(reg, cold)  # each call loads one tenant and evicts another
+                hot = access(reg, cold)
+                print(f"{'':<14}tenant() from disk {load * 1e6:.0f} us, resident {hot * 1e6:.1f} us")
+            del reg
+
+if __name__ == "__main__":
+    main()
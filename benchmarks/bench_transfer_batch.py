@@ -0,0 +1,75 @@
+"""
+Batch Transfer Benchmark
+
+Applies the same --items random transfers among --accounts logged-in accounts
+twice, on fresh wallets: once as a loop of transfer() calls and once as a single
+transfer_batch() call, and reports both times and the speedup. Amounts have cent
+precision, as payment files do. With --hooks a no-op mutation hook is attached,
+so both paths also pay for reporting every transfer. Timings are the fastest of
+--repeat runs.
+
+usage: python benchmarks/bench_transfer_batch.py [--items N] [--accounts N] [--repeat N] [--hooks]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+
+
+def make_wallet(emails: list, hooks: bool) -> "wallet.Wallet":
+    book = wallet.Wallet()
+    book.configure_throttle(enabled=False)
+    for email in emails:
+        book.register_user("User", email, "1234", 1_000_000.0)
+        book.authenticate_user(email, "1234")
+    if hooks:
+        book.add_mutation_hook(lambda op, *args: None)
+    return book
+
+
+def timed(run) -> float:
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=200_000)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--hooks", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    emails = [f"user{i}@bank.com" for i in range(args.accounts)]
+    items = [(*rng.sample(emails, 2), round(rng.uniform(0.01, 5.0), 2)) for _ in range(args.items)]
+
+    def loop(book):
+        transfer = book.transfer
+        for sender, receiver, amount in items:
+            transfer(sender, receiver, amount)
+
+    def batch(book):
+        book.transfer_batch(items)
+
+    best = {}
+    for _ in range(args.repeat):
+        for name, run in (("transfer loop", loop), ("transfer_batch", batch)):
+            book = make_wallet(emails, args.hooks)
+            best[name] = min(best.get(name, float("inf")), timed(lambda: run(book)))
+            assert book.ledger_summary().total_balance_mc == args.accounts * 100_000_000_000
+
+    print(f"{args.items} transfers among {args.accounts} accounts{' (hooks attached)' if args.hooks else ''}")
+    for name, seconds in best.items():
+        print(f"{name:<16}{seconds * 1e3:>10.1f} ms{seconds / args.items * 1e6:>10.2f} us/transfer")
+    print(f"speedup {best['transfer loop'] / best['transfer_batch']:.1f}x")
+
+if __name__ == "__main__":
+    main()
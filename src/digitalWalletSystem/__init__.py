@@ -0,0 +1,103 @@
+"""
+system invariants
+
+    - No duplicate users in users_db (unique emails)
+    - A user can never access the system without entering the correct PIN.
+    - No unauthorized account can be created, modified, or accessed during login.
+    - The number of login attempts is accurately tracked for each user.
+    - Only authenticated users can access financial data.
+    - The system never alters account balances during a balance view operation.
+    - The displayed balance must always reflect: Base Balance; Recent Transactions; Interest.
+    - The account balance never decreases as a result of a deposit operation.
+    - Invalid deposits (negative or zero amounts) do not modify any stored data.
+    - Financial data integrity is maintained across all transactions.
+    - Interest is only applied to accounts with a positive balance.
+    - The interest_rate must always remain within a valid range (0 < rate ≤ 1).
+    - The account balance never decreases due to interest application.
+    - Notifications must always reflect the actual outcome of the interest process.
+    - The total sum of all account balances remains constant.
+    - Funds are never created or destroyed during a transfer.
+    - Notifications are accurate and automatic.
+    - No duplicate or irrelevant notifications are produced.
+    - Invalid transfer attempts do not modify any account data.
+    - Withdrawals never reduce the account balance below zero.
+    - Successful withdrawals decrease the balance exactly by the withdrawn amount.
+
+package layout
+
+    The package imports nothing but itself. Each name below is loaded from its
+    submodule the first time it is used, so a process pays only for what it calls:
+        money    millicent arithmetic and the interest policy
+        status   operation results and reason codes
+        storage  account records and histories
+        engine   the Wallet class and its operations
+    Wallet() creates an independent wallet, e.g. one per test or per tenant. The
+    module-level operations (register_user, deposit, users_db, ...) belong to a
+    default Wallet, created on first use and returned by default_wallet().
+"""
+
+import _thread
+
+_EXPORTS = {
+    "money": ("MILLICENTS_PER_DOLLAR", "RATE_SCALE", "MAX_MILLICENTS", "to_millicents", "to_dollars", "interest_millicents",
+              "interest_millicents_array"),
+    "status": ("Reason", "AccountStatus", "LoginStatus", "BalanceInfo", "LedgerSummary", "HistoryPage",
+               "DepositStatus", "InterestStatus", "InterestSummary", "TransferStatus", "WithdrawalStatus",
+               "INVALID_SESSION"),
+    "storage": ("History", "HistoryPolicy", "User", "HISTORY_RETENTION", "HISTORY_PAGE_SIZE",
+                "BALANCE_HISTORY_LIMIT", "DEFAULT_INTEREST_RATE", "DEPOSIT", "WITHDRAWAL", "INTEREST", "TRANSFER_OUT", "TRANSFER_IN",
+                "BATCH_TRANSFER", "TEXT", "TRANSACTION_TEMPLATES", "NOTIFICATION_TEMPLATES"),
+    "engine": ("Wallet", "Transaction", "TransactionAborted", "valid_email", "valid_pin",
+               "LOCK_STRIPES", "MAX_LOGIN_ATTEMPTS", "LEDGER_PERIOD_SECONDS", "LEDGER_PERIODS_KEPT",
+               "FLOW_DEPOSITS", "FLOW_WITHDRAWALS", "FLOW_INTEREST"),
+}
+_MODULE_OF = {name: module for module, names in _EXPORTS.items() for name in names}
+
+OPERATIONS = (
+    "register_user", "authenticate_user", "view_balance", "view_history", "deposit", "apply_interest",
+    "apply_interest_all", "transfer", "transfer_batch", "withdraw", "end_session", "ledger_summary",
+    "rebuild_ledger", "use_store", "add_mutation_hook", "remove_mutation_hook", "hold_all_accounts",
+    "configure_throttle", "configure_sessions", "clear_sessions", "configure_accrual", "settle_accruals",
+    "escrow_debit", "escrow_settle", "escrow_release", "escrow_credit", "escrow_end", "pending_escrows",
+    "transaction", "set_notification_outbox", "configure_history",
+)
+
+__all__ = [name for names in _EXPORTS.values() for name in names if not name.startswith("_")]
+__all__ += ["default_wallet", *OPERATIONS, "users_db"]
+
+# ------------------- Default Wallet -------------------
+_default = None
+_default_lock = _thread.allocate_lock()
+
+def default_wallet():
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = __getattr__("Wallet")()
+    return _default
+
+# ------------------- Lazy Attributes -------------------
+# Exports are imported on first access and then cached as module globals, so later
+# lookups never come back here. Anything else is an attribute of the default wallet:
+# its methods are cached the same way, while state such as users_db is looked up on
+# the wallet each time, since the wallet may rebind it (use_store).
+def __getattr__(name: str):
+    module = _MODULE_OF.get(name)
+    if module is not None:
+        value = getattr(__import__(f"{__name__}.{module}", fromlist=(name,)), name)
+        globals()[name] = value
+        return value
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    wallet = default_wallet()
+    try:
+        value = getattr(wallet, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    if callable(getattr(type(wallet), name, None)):
+        globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,1609 @@
+"""
+Wallet Engine
+
+Wallet(store: Optional[MutableMapping[str, User]] = None, lock_stripes: int = LOCK_STRIPES)
+
+Requires:
+    - lock_stripes >= 1
+    - a store passed in is a mapping of email -> User-compatible record
+
+Ensures:
+    - every Wallet owns its accounts, locks, ledger, throttle, sessions, escrows,
+      history retention, hooks and outbox; operations on one wallet never touch
+      another's state
+    - the operations below are Wallet methods; the package's module-level
+      functions are the same methods of one default wallet
+"""
+
+from __future__ import annotations
+
+import itertools
+import operator
+import threading
+import time
+from binascii import b2a_base64
+from contextlib import contextmanager
+from collections import OrderedDict, deque
+from os import urandom
+
+# typing is only needed by type checkers, and importing it costs more than the
+# rest of the engine's imports together.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Dict, FrozenSet, Iterable, Iterator, List, MutableMapping, Optional, Sequence, Tuple
+
+from .money import RATE_SCALE, interest_millicents, interest_millicents_array, numpy, to_dollars, to_millicents
+from .status import (INVALID_SESSION, AccountStatus, BalanceInfo, DepositStatus, HistoryPage, InterestStatus,
+                     InterestSummary, LedgerSummary, LoginStatus, Reason, TransferStatus, WithdrawalStatus)
+from .storage import (BALANCE_HISTORY_LIMIT, BATCH_TRANSFER, DEFAULT_INTEREST_RATE, DEPOSIT, HISTORY_PAGE_SIZE,
+                      HISTORY_RETENTION, INTEREST, TRANSFER_IN, TRANSFER_OUT, WITHDRAWAL, HistoryPolicy, User)
+
+"""
+Register User Method
+
+register_user(name: str, email: str, pin: str, initial_balance: float) -> AccountStatus
+
+Requires:
+    - name must not be empty or None
+    - email must not be empty or None and must contain '@' and '.'
+    - pin must be 4 numeric digits string
+    - initial_balance >= 0
+    - user with same email must not already exist
+
+Ensures:
+    - If registration is successful:
+        - new user is added to users_db
+        - the system returns an AccountStatus indicating success
+        - stored info matches inputs
+        - stored balance equals initial_balance
+        - a confirmation message is displayed to the user
+
+    - If registration fails:
+        - no changes occur to users_db
+        - the system returns an AccountStatus indicating failure
+        - appropriate error message is displayed to the user
+        - the user remains on the registration page to correct input
+"""
+
+
+"""
+Login Account Method
+
+authenticate_user(email: str, entered_pin: str, source: Optional[str] = None) -> LoginStatus
+
+Requires:
+    - email must not be empty or None and must contain '@' and '.'
+    - email must exist in the users_db
+    - entered_pin must be a 4-digit numeric string
+    - users_db[email] must have fields: 'pin', 'locked', 'login_attempts'
+    - 'login_attempts' must be >= 0
+    - if user['locked'] == True, no login should be allowed
+
+Ensures:
+    - If entered_pin == user['pin'] and not locked:
+        - access_granted = True
+        - login_attempts reset to 0
+        - the system returns a LoginStatus indicating success
+        - user gains access to all account features
+
+    - If entered_pin != user['pin'] and not locked:
+        - access_granted = False
+        - login_attempts increases by 1
+        - the system returns a LoginStatus indicating failure
+        - the user remains on the login screen to reattempt login
+
+    - If login_attempts >= 5:
+        - locked = True
+        - The system returns a LoginStatus indicating account locked
+        - further login attempts are blocked until account is unlocked
+        - the account unlocks by itself on the first attempt made lockout_seconds
+          or more after it was locked (login_attempts restart from 0)
+
+    - Throttling (checked before the email is looked up or any PIN is compared;
+      configure_throttle() raises ValueError for a rate <= 0 or a burst < 1):
+        - every attempt takes a token from the bucket of its email and, when given,
+          of its source (e.g. a client address); buckets refill at a steady rate
+        - an attempt finding either bucket empty is rejected with a LoginStatus
+          indicating too many attempts, and changes no account data
+        - bucket state lives in bounded LRU tables (entries idle for longer than the
+          refill time are dropped), so memory stays fixed under any number of
+          distinct emails or sources
+"""
+
+"""
+Sessions
+
+authenticate_user(...) -> LoginStatus(success, message, token)
+end_session(token: str) -> bool
+
+Requires:
+    - token is a value returned in LoginStatus.token by a successful login
+
+Ensures:
+    - every successful login opens a new session and returns its opaque token
+    - view_balance, view_history, deposit, withdraw and transfer accept token=...;
+      with a token the caller is authorized by the session instead of the logged_in
+      flag, and the email argument may be None (if given it must match the session)
+    - a session expires session_ttl seconds after it was last used; at most
+      session_capacity sessions are kept, the least recently used is dropped first
+    - an invalid, expired or mismatched token is rejected like a logged-out user,
+      with the message "Invalid or expired session.", and changes no account data
+    - end_session(token) returns whether the token was open; when it was the
+      account's last open session the account is logged out (logged_in is cleared)
+    - sessions are dropped when users_db is replaced (use_store, journal recovery)
+"""
+
+
+"""
+Consult Balance Method
+
+view_balance(email: str) -> BalanceInfo
+
+Requires:
+    - email must not be empty or None and must contain '@' and '.'
+    - user must be logged in
+    - email must exist in the users_db
+    - user record must contain valid numeric fields for balance, transactions, and interest
+
+Ensures:
+    - If user is logged in and valid:
+        - returned balance equals user balance
+        - returned interest equals user interest
+        - returned transactions equals the most recent page (BALANCE_HISTORY_LIMIT
+          entries) of the users transactions, oldest first
+        - returned next_cursor can be passed to view_history() for older entries
+        - no modification occurs to the users_db
+        - the user receives confirmation that their balance has been successfully retrieved
+
+    - If user is not logged in or invalid:
+        - access is denied
+        - the system does not return any balance information
+        - an error message is returned indicating the issue
+        - no modification occurs to the users_db
+        - the user remains on the login or home screen until authenticated
+"""
+
+"""
+Transaction History Method
+
+view_history(email: str, cursor: Optional[int] = None, limit: int = HISTORY_PAGE_SIZE) -> HistoryPage
+
+Requires:
+    - user must be logged in
+    - email must exist in the users_db
+    - cursor is None (newest entries) or a next_cursor returned by an earlier call
+    - limit >= 1
+
+Ensures:
+    - entries are the transactions with sequence numbers in [cursor - limit, cursor),
+      oldest first, formatted only now
+    - next_cursor is the cursor of the page before this one, or None when no older
+      entry is still held in memory
+    - at most retention entries (plus 1/8 slack) per account are held in memory; older
+      ones are appended to the spill file, or dropped; both are set per wallet with
+      configure_history(retention=HISTORY_RETENTION, spill_path=None)
+    - no modification occurs to the users_db
+"""
+
+"""
+Deposit Funds Method
+
+deposit(email: str, amount: float) -> DepositStatus
+
+Requires:
+    - email must not be empty or None and must contain '@' and '.'
+    - user must be logged in
+    - email must exist in the users_db
+    - amount must be a valid number (float or int) greater than 0
+    - the system must have access to the users current balance
+
+Ensures:
+    - If amount > 0:
+        - user.balance = old_balance + amount
+        - the updated balance is stored securely in the database
+        - the system returns a DepositStatus indicating success
+
+    - If amount <= 0:
+        - user.balance = old_balance
+        - the system returns a DepositStatus indicating failure
+        - users_db structure remains valid
+        - the user remains on the deposit page and may retry with a valid amount
+"""
+
+"""
+Interest Accrual Method
+
+interest(email: str, interest_rate: float) -> InterestStatus
+
+Requires:
+    - email must not be empty or None and must contain '@' and '.'
+    - user must be logged in
+    - email must exist in the users_db
+    - user record must contain valid numeric fields for balance and interest_rate
+    - the interest_rate must be a valid decimal value between 0 and 1, representing the annual percentage rate
+
+Ensures:
+    - If balance > 0:
+        - new_balance = old_balance + (old_balance * interest_rate), with the interest
+          rounded half-to-even to the nearest millicent
+        - the system returns an InterestStatus indicating success
+        - returns "Interest of $X applied."
+        - the users updated balance is stored in the system database
+
+    - If balance <= 0:
+        - new_balance = old_balance
+        - the system returns an InterestStatus indicating no interest accrued
+        - returns "No interest accrued."
+"""
+
+"""
+Notifications Method
+
+Requires:
+    - user_email must exist in users_db
+    - user record must include 'balance' and 'notifications'
+    - balance must be a non-negative float
+    - transaction_performed is a boolean
+    - if transaction_performed == False, balance must remain unchanged
+    - notifications list must contain only strings
+
+
+Ensures:
+    - If transaction_performed == True:
+        - a new notification message is created
+        - notification contains confirmation text and correct balance
+        - message is appended exactly once to user['notifications']
+
+    - If transaction_performed == False:
+        - no new notifications are appended
+        - balance remains unchanged
+
+    - All messages remain unique (no duplicates)
+    - Notifications are only about valid transactions (no irrelevant text)
+    - While a delivery outbox is attached (walletNotify), each notification is also
+      enqueued for delivery as one compact record, stamped with a sequence number;
+      the delivery worker formats and sends it, off the mutation path
+
+"""
+
+
+"""
+Transfer Funds Method
+
+transfer(sender_email: str, receiver_email: str, amount: float) -> TransferStatus
+
+Requires:
+    - sender_email and receiver_email exist in users_db
+    - sender_email ≠ recipient_email
+    - amount is a float and represents millicent precision
+    - sender.balance ≥ amount > 0
+    - both users have non-negative balances
+    - both users accounts must be active and not restricted.
+
+Ensures:
+    - If transfer is valid:
+        - sender.balance decreases by exactly `amount`
+        - recipient.balance increases by exactly `amount`
+        - total system balance remains constant
+        - both users receive corresponding notifications
+        - the system returns a TransferStatus indicating success.
+
+    - If the transfer is invalid:
+        - no changes are made to either the senders or recipients balances.
+        - the system returns a TransferStatus indicating failure.
+
+"""
+
+"""
+Withdraw Funds Method
+
+withdraw(email: str, amount: float) -> WithdrawalStatus
+
+Requires:
+    - user_email must exist in users_db
+    - amount is a positive float
+    - user.balance >= 0
+    - withdrawal amount must not exceed user balance
+    - the system must have access to the users current balance.
+
+Ensures:
+    If withdrawal amount is valid:
+        - user balance decreases by the exact amount
+        - the system returns a WithdrawalStatus indicating success
+        - user receives a confirmation notification
+
+    If withdrawal amount is invalid:
+        - user.balance remains unchanged
+        - the system returns a WithdrawalStatus indicating failure
+        - error message is set
+        - the user remains on the withdrawal page to retry
+
+"""
+
+"""
+Bulk Interest Accrual Method
+
+apply_interest_all(interest_rate: Optional[float] = None) -> InterestSummary
+
+Requires:
+    - interest_rate is None, or a valid decimal value with 0 < interest_rate <= 1
+    - when interest_rate is None, each account's own interest_rate is used
+
+Ensures:
+    - every account with a positive balance and a valid rate (0 < rate <= 1) has
+      new_balance = old_balance + (old_balance * rate), in a single pass over the book
+    - accounts with zero or negative balance, or an invalid own rate, are unchanged
+    - no account balance decreases
+    - login state is not required; this is the back-office accrual run
+    - no per-user transaction or notification strings are produced; the returned
+      InterestSummary reports how many accounts were credited and skipped and the
+      total interest paid
+    - If interest_rate is given and invalid:
+        - no account is modified
+        - the system returns an InterestSummary indicating failure
+"""
+
+"""
+Scheduled Interest Accrual
+
+configure_accrual(enabled: bool = True, year_seconds: int = 31536000) -> None
+settle_accruals(emails: Iterable[str]) -> int
+
+Requires:
+    - 0 < User.interest_rate <= 1 for an account to accrue; the rate is per year
+
+Ensures:
+    - while accrual is enabled, every account earns simple interest continuously:
+      balance * interest_rate * elapsed / year_seconds since its last accrual, kept
+      exact to the millicent (the fraction below one millicent is carried forward)
+    - the pending accrual is settled into the balance, under the account's lock,
+      before anything else changes that balance (deposit, withdraw, transfer,
+      apply_interest, batch and two-phase transfers), so it always accrues on the
+      balance actually held during each interval; no scan of users_db is needed
+    - view_balance reports the balance including pending interest, and the pending
+      part separately, without modifying the account
+    - a settlement that credits interest records one transaction (no notification)
+      and is reported to the mutation hooks as ("accrue", email, interest_mc,
+      accrued_at, carry), which is enough to replay it exactly
+    - settle_accruals() settles the given accounts now, e.g. from a background
+      compactor during quiet periods (walletAccrual), and returns how many changed;
+      an account that accrued nothing, not even carry, is skipped and not reported
+    - accounts with zero or negative balance, or an invalid rate, accrue nothing
+    - enabling accrual starts every existing account accruing from that moment
+      (one pass over users_db, reported as an "accrue" of 0 per account stamped)
+"""
+
+"""
+Transactions
+
+transaction(accounts: Optional[Iterable[str]] = None) -> ContextManager[Transaction]
+
+Requires:
+    - inside the block only deposit, withdraw, transfer, transfer_batch and
+      apply_interest change balances (directly or through the Transaction's methods)
+
+Ensures:
+    - the block runs holding the locks of the listed accounts (every account when
+      accounts is None), so no other thread sees or changes them until it ends
+    - when accounts is given, an operation of the block that touches an account
+      not listed raises RuntimeError before changing anything (and so rolls back)
+    - register_user and anything holding every account (hold_all_accounts,
+      apply_interest_all, configure_accrual, walletBulk) raise RuntimeError inside
+      the block: they would wait for the registry lock while the block holds stripes
+    - each mutation made inside the block is written to an undo log; nothing is
+      copied up front, and operations outside a transaction run unchanged
+    - if a Transaction method returns a failed status, or the block raises, every
+      mutation of the block is undone in reverse order: balances, ledger totals,
+      history, notifications and interest accrual are as they were before it;
+      a failed status is kept in Transaction.status, an exception is re-raised
+    - otherwise the block commits: Transaction.committed is True and the mutation
+      hooks receive its mutations, in order, only now (a transfer_batch as one
+      "transfer" per item); a rolled-back block reports none of them (lockouts made
+      inside it still are); the same holds for notifications queued for delivery
+    - a transaction opened inside another one on the same thread joins it
+"""
+
+"""
+Ledger Summary Method
+
+ledger_summary(period: Optional[int] = None, verify: Optional[bool] = None) -> LedgerSummary
+
+Requires:
+    - period is None (the current period) or a period index, i.e. the Unix time
+      divided by LEDGER_PERIOD_SECONDS
+    - verify is None (use the wallet's ledger_debug), True or False
+
+Ensures:
+    - returns the total of all account balances, the number of accounts and of
+      locked accounts, and the deposits, withdrawals and interest of the period
+    - the figures are maintained incrementally by every mutator, so the call costs
+      O(lock_stripes) regardless of the number of accounts
+    - If verifying:
+        - the incremental totals are compared with a full recompute over users_db
+        - on a mismatch the summary indicates failure and the message describes it
+    - no modification occurs to the users_db
+"""
+
+"""
+Escrow Methods (two-phase transfer participant)
+
+escrow_debit(txid: str, email: Optional[str], counterparty: str, amount_mc: int, token: Optional[str] = None) -> TransferStatus
+escrow_credit(txid: str, email: str, counterparty: str, amount_mc: int) -> TransferStatus
+escrow_settle(txid: str) -> bool
+escrow_release(txid: str) -> bool
+escrow_end(txid: str) -> bool
+
+Requires:
+    - txid uniquely identifies one transfer across all wallets taking part in it
+    - amount_mc is a positive number of millicents
+
+Ensures:
+    - escrow_debit (prepare) moves amount_mc from a logged-in account with enough
+      funds into the escrow held under txid; repeating it for a held txid succeeds
+      without debiting again; with a token the account is authorized by its session
+      instead and email may be None, as in transfer()
+    - escrow_settle (commit) drops the escrow for good and records the outgoing
+      transfer in the sender's history; escrow_release (abort) returns the funds
+    - escrow_credit (commit, receiving side) credits an existing account once per
+      txid; repeating it succeeds without crediting again
+    - escrow_end (END, receiving side) forgets that txid was credited, once the
+      coordinator has recorded that the transfer is complete and will never retry
+      the credit; the wallet keeps no other per-transfer state after settlement
+    - every step is reported to the mutation hooks, so a journal replays escrows,
+      settled and credited transfers exactly
+    - funds are never created or destroyed: at any moment the sum of balances plus
+      the sum of held escrows is constant
+"""
+
+"""
+Batch Transfer Method
+
+transfer_batch(transfers: Iterable[Tuple[str, str, float]]) -> List[TransferStatus]
+
+Requires:
+    - every item is a (sender_email, receiver_email, amount) triple
+    - every item satisfies the requirements of transfer(), except that the sender's
+      balance is checked against its net position over the whole batch
+
+Ensures:
+    - the whole batch is validated before any balance is touched
+    - If every item is valid and no account's net position overdraws it:
+        - every account balance changes by exactly its net amount
+        - total system balance remains constant
+        - every touched account receives one summary transaction and notification
+        - every item gets a TransferStatus indicating success
+    - Otherwise:
+        - no changes are made to any account
+        - invalid items get the same failure message transfer() would give
+        - the remaining items get a TransferStatus indicating the batch was rejected
+    - results are in input order; equal results may share one read-only instance
+"""
+
+# ------------------- Mutation Hooks -------------------
+# Every successful mutation is reported as (op, *args) to the registered hooks,
+# e.g. ("deposit", email, amount_mc) with amounts in millicents. That includes the
+# authentication state: "login", "logout", "login_failed" (a wrong PIN counted in
+# login_attempts), "lock" and "unlock". Storage engines such as the write-ahead
+# log in walletJournal attach here; with no hooks registered the cost is one check.
+if TYPE_CHECKING:
+    MutationHook = Callable[..., None]
+
+# ------------------- Concurrency -------------------
+# Accounts are guarded by a fixed table of striped locks (account -> stripe by
+# email hash), so memory stays constant however many accounts exist. Operations
+# that touch several accounts take their stripes in ascending stripe order,
+# which makes deadlock impossible. Registration is serialized by the registry
+# lock, which is always taken before any stripe. Stripes are reentrant so that
+# operations can run inside a transaction holding them.
+LOCK_STRIPES = 1024
+
+@contextmanager
+def _holding(locks: Sequence[threading.RLock]) -> Iterator[None]:
+    for lock in locks:
+        lock.acquire()
+    try:
+        yield
+    finally:
+        for lock in reversed(locks):
+            lock.release()
+
+# ------------------- Ledger -------------------
+# Running totals kept incrementally by the mutators, so system-wide figures never
+# need a scan of users_db. The ledger is sharded like the locks: each stripe owns
+# one shard and updates it while holding that stripe, so no extra lock is needed.
+# A summary adds up the shards, whatever the number of accounts. Transfers move
+# money between accounts and leave the sum of the shards unchanged.
+LEDGER_PERIOD_SECONDS = 86400
+LEDGER_PERIODS_KEPT = 90
+LEDGER_DEBUG = False
+
+FLOW_DEPOSITS, FLOW_WITHDRAWALS, FLOW_INTEREST = range(3)
+
+class _LedgerShard:
+    __slots__ = ("balance_mc", "accounts", "locked", "periods")
+
+    def __init__(self):
+        self.balance_mc = 0
+        self.accounts = 0
+        self.locked = 0
+        self.periods: Dict[int, List[int]] = {}
+
+    def flow(self, column: int, amount_mc: int) -> None:
+        period = int(time.time() // LEDGER_PERIOD_SECONDS)
+        totals = self.periods.get(period)
+        if totals is None:
+            totals = self.periods[period] = [0, 0, 0]
+            if len(self.periods) > LEDGER_PERIODS_KEPT:
+                del self.periods[min(self.periods)]
+        totals[column] += amount_mc
+
+# ------------------- Login Throttling -------------------
+# Token buckets per email and per source, kept in LRU tables of fixed capacity.
+# A bucket is [tokens, last refill time]; it refills at rate tokens per second up
+# to burst. A bucket left idle long enough to refill completely is the same as no
+# bucket, so such entries are expired, and under pressure the least recently used
+# bucket is dropped. One lock guards both tables; its critical section is a few
+# dict operations, taken before any account lock.
+MAX_LOGIN_ATTEMPTS = 5
+
+class _BucketTable:
+    __slots__ = ("rate", "burst", "capacity", "_buckets")
+
+    def __init__(self, rate: float, burst: float, capacity: int):
+        self.rate = rate
+        self.burst = burst
+        self.capacity = capacity
+        self._buckets: OrderedDict[str, List[float]] = OrderedDict()
+
+    def take(self, key: str, now: float) -> bool:
+        buckets = self._buckets
+        bucket = buckets.get(key)
+        if bucket is None:
+            if len(buckets) >= self.capacity:
+                self._expire(now)
+            buckets[key] = [self.burst - 1, now]
+            return True
+        buckets.move_to_end(key)
+        tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if tokens < 1:
+            bucket[0] = tokens
+            return False
+        bucket[0] = tokens - 1
+        return True
+
+    def _expire(self, now: float) -> None:
+        # Touching a bucket moves it to the end, so the table is ordered by last use:
+        # drop the least recently used one, then every other bucket that has refilled.
+        buckets = self._buckets
+        full_after = self.burst / self.rate
+        buckets.popitem(last=False)
+        while buckets and now - next(iter(buckets.values()))[1] >= full_after:
+            buckets.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+# ------------------- Sessions -------------------
+# Tokens are what secrets.token_urlsafe(18) returns, 144 random bits from
+# os.urandom in URL-safe base64, built directly: the secrets module imports
+# base64, re, random and hashlib, which would double the cost of the first login.
+_URLSAFE = bytes.maketrans(b"+/", b"-_")
+
+# ------------------- Utility Functions -------------------
+def valid_email(email: str) -> bool:
+    return email and '@' in email and '.' in email
+
+def valid_pin(pin: str) -> bool:
+    return pin.isdigit() and len(pin) == 4
+
+def _amount_mc(amount: float) -> int:
+    # A positive amount in millicents, or 0 for anything that is not one: zero,
+    # negative, NaN, infinite or out of range.
+    if not amount > 0:
+        return 0
+    try:
+        return to_millicents(amount)
+    except ValueError:
+        return 0
+
+def _accrue(balances_mc: Sequence[int], rates: Sequence[float]) -> List[int]:
+    # Interest per account in millicents, 0 where the balance or the rate is not eligible.
+    np = numpy()
+    if np is not None:
+        b = np.asarray(balances_mc, dtype=np.int64)
+        r = np.asarray(rates, dtype=np.float64)
+        eligible = (b > 0) & (r > 0) & (r <= 1)
+        return np.where(eligible, interest_millicents_array(b, r), 0).tolist()
+    return [interest_millicents(b, r) if b > 0 and 0 < r <= 1 else 0
+            for b, r in zip(balances_mc, rates)]
+
+_SENDER, _RECEIVER, _AMOUNT = map(operator.itemgetter, range(3))
+
+class _SharedTransferStatus(TransferStatus):
+    # The per-transfer results of transfer_batch are shared by every batch that
+    # returns them, so they are read-only: setting a field raises AttributeError.
+    __slots__ = ()
+
+    def __init__(self, success: bool, message: str, reason: Reason = Reason.OK):
+        for name, value in zip(self._fields, (success, message, reason)):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"shared batch status is read-only; use _replace({name}=...)")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("shared batch status is read-only")
+
+    def __repr__(self) -> str:
+        return super().__repr__().replace("_SharedTransferStatus", "TransferStatus", 1)
+
+_BATCH_OK = _SharedTransferStatus(True, "Transfer applied.")
+_BATCH_MISSING = _SharedTransferStatus(False, "Sender or receiver does not exist.", reason=Reason.USER_NOT_FOUND)
+_BATCH_SELF = _SharedTransferStatus(False, "Cannot transfer to self.", reason=Reason.SELF_TRANSFER)
+_BATCH_LOGGED_OUT = _SharedTransferStatus(False, "Both users must be logged in.", reason=Reason.NOT_LOGGED_IN)
+_BATCH_INVALID_AMOUNT = _SharedTransferStatus(False, "Insufficient funds or invalid amount.", reason=Reason.INVALID_AMOUNT)
+_BATCH_INSUFFICIENT = _SharedTransferStatus(False, "Insufficient funds or invalid amount.", reason=Reason.INSUFFICIENT_FUNDS)
+_BATCH_REJECTED = _SharedTransferStatus(False, "Batch rejected; no transfers were applied.", reason=Reason.BATCH_REJECTED)
+
+# ------------------- Transactions -------------------
+# Mutations a rollback undoes; anything else done inside a transaction (a lockout)
+# stands and is reported either way. "transfer_batch" is only ever an undo entry:
+# (((email, net_mc), ...), ((sender, receiver, amount_mc), ...)), reported as the
+# transfers it holds.
+_UNDOABLE = frozenset(("deposit", "withdraw", "interest", "transfer", "transfer_batch", "accrue"))
+
+def _no_hook(op: str, *args) -> None:
+    pass
+
+class TransactionAborted(Exception):
+    def __init__(self, status):
+        super().__init__(status.message)
+        self.status = status
+
+class Transaction:
+    def __init__(self, wallet: Wallet, accounts: Optional[FrozenSet[str]] = None):
+        self.wallet = wallet
+        self.accounts = accounts  # None: every account
+        self.ops: List[Tuple[str, tuple]] = []
+        self.accruals: Dict[str, Tuple[int, int]] = {}
+        self.notifications: List[tuple] = []
+        self.status = None
+        self.committed = False
+
+    def _check(self, status):
+        if not status.success:
+            raise TransactionAborted(status)
+        return status
+
+    def deposit(self, email: Optional[str], amount: float, token: Optional[str] = None) -> DepositStatus:
+        return self._check(self.wallet.deposit(email, amount, token=token))
+
+    def withdraw(self, email: Optional[str], amount: float, token: Optional[str] = None) -> WithdrawalStatus:
+        return self._check(self.wallet.withdraw(email, amount, token=token))
+
+    def transfer(self, sender_email: Optional[str], receiver_email: str, amount: float,
+                 token: Optional[str] = None) -> TransferStatus:
+        return self._check(self.wallet.transfer(sender_email, receiver_email, amount, token=token))
+
+    def apply_interest(self, email: str, interest_rate: float) -> InterestStatus:
+        return self._check(self.wallet.apply_interest(email, interest_rate))
+
+    def transfer_batch(self, transfers: Iterable[Tuple[str, str, float]]) -> List[TransferStatus]:
+        results = self.wallet.transfer_batch(transfers)
+        for status in results:
+            self._check(status)
+        return results
+
+    def _rollback(self) -> None:
+        users_db = self.wallet.users_db
+        ledger = self.wallet._ledger
+        stripes = self.wallet.lock_stripes
+        for op, args in reversed(self.ops):
+            if op == "transfer_batch":
+                for email, net_mc in args[0]:
+                    user = users_db[email]
+                    user.balance_mc -= net_mc
+                    user.transactions.pop()
+                    user.notifications.pop()
+                continue
+            if op == "transfer":
+                sender_email, receiver_email, amount_mc = args
+                sender = users_db[sender_email]
+                receiver = users_db[receiver_email]
+                sender.balance_mc += amount_mc
+                receiver.balance_mc -= amount_mc
+                for user in (sender, receiver):
+                    user.transactions.pop()
+                    user.notifications.pop()
+                continue
+            if op not in _UNDOABLE:
+                continue
+            email, amount_mc = args[0], args[1]
+            user = users_db[email]
+            shard = ledger[hash(email) % stripes]
+            if op == "withdraw":
+                user.balance_mc += amount_mc
+                shard.balance_mc += amount_mc
+                shard.flow(FLOW_WITHDRAWALS, -amount_mc)
+            else:
+                user.balance_mc -= amount_mc
+                shard.balance_mc -= amount_mc
+                shard.flow(FLOW_DEPOSITS if op == "deposit" else FLOW_INTEREST, -amount_mc)
+            if op != "accrue":
+                user.transactions.pop()
+                user.notifications.pop()
+            elif amount_mc:
+                user.transactions.pop()
+        for email, (accrued_at, carry) in self.accruals.items():
+            user = users_db[email]
+            user.accrued_at = accrued_at
+            user.accrual_carry = carry
+
+# ------------------- Wallet -------------------
+class Wallet:
+    def __init__(self, store: Optional[MutableMapping[str, User]] = None, lock_stripes: int = LOCK_STRIPES):
+        # A plain dict by default; any mapping of email -> User-compatible record works,
+        # e.g. walletColumnar.ColumnarStore for large account books.
+        self.users_db: MutableMapping[str, User] = {} if store is None else store
+        self._mutation_hooks: List[MutationHook] = []
+        self._history = HistoryPolicy()
+        self.lock_stripes = lock_stripes
+        self._registry_lock = threading.Lock()
+        self._account_locks = [threading.RLock() for _ in range(lock_stripes)]
+        self._ledger = [_LedgerShard() for _ in range(lock_stripes)]
+        self.ledger_debug = LEDGER_DEBUG
+        self._throttle_lock = threading.Lock()
+        self._email_buckets: Optional[_BucketTable] = None
+        self._source_buckets: Optional[_BucketTable] = None
+        self.lockout_seconds: Optional[float] = 900.0
+        self.configure_throttle()
+        # token -> [email, account record, expiry]
+        self._session_lock = threading.Lock()
+        self._sessions: OrderedDict[str, list] = OrderedDict()
+        self._session_counts: Dict[str, int] = {}  # email -> open sessions
+        self.session_ttl = 1800.0
+        self.session_capacity = 100_000
+        self.accrual_enabled = False
+        self.accrual_year_seconds = 365 * 86400
+        self._accrual_clock: Callable[[], float] = time.time
+        # txid -> (email, counterparty, amount_mc) for debits that are prepared but not
+        # yet settled or released, and the txids already credited on this side.
+        self._escrows: Dict[str, Tuple[str, str, int]] = {}
+        self._escrow_credited: set = set()
+        # Open transactions by thread id. While one is open, its thread's mutations are
+        # reported to the transaction instead of the hooks, and _no_hook keeps
+        # _mutation_hooks non-empty so that every mutator reports them. The lock also
+        # guards changes to _mutation_hooks.
+        self._transactions: Dict[int, Transaction] = {}
+        self._transactions_lock = threading.Lock()
+        # With an outbox attached, every notification the mutators add is also appended
+        # to it as (email, kind, amount_mc, counterparty, balance_mc, seq) for a delivery
+        # worker to drain (walletNotify). seq is stamped under the account's lock, so
+        # it increases per user. deque.append and next() are atomic, so no extra lock.
+        self._outbox: Optional[deque] = None
+        self._notification_seq = itertools.count()
+        if store is not None:
+            self.rebuild_ledger()
+
+    # ---- database ----
+    def use_store(self, store: MutableMapping[str, User]) -> MutableMapping[str, User]:
+        previous = self.users_db
+        self.users_db = store
+        self.rebuild_ledger()
+        self.clear_sessions()
+        return previous
+
+    def configure_history(self, retention: int = HISTORY_RETENTION, spill_path: Optional[str] = None) -> None:
+        self._history.configure(retention, spill_path)
+
+    # ---- mutation hooks ----
+    # With a single hook and no transaction open, _emit is bound to the hook itself,
+    # so mutators report straight to it; otherwise it is the method below, which
+    # routes to the open transaction or to every hook.
+    def add_mutation_hook(self, hook: MutationHook) -> None:
+        with self._transactions_lock:
+            self._mutation_hooks.append(hook)
+            self._route_hooks()
+
+    def remove_mutation_hook(self, hook: MutationHook) -> None:
+        with self._transactions_lock:
+            if hook in self._mutation_hooks:
+                self._mutation_hooks.remove(hook)
+            self._route_hooks()
+
+    def _route_hooks(self) -> None:
+        # Called with _transactions_lock held.
+        if len(self._mutation_hooks) == 1 and not self._transactions:
+            self._emit = self._mutation_hooks[0]
+        else:
+            vars(self).pop("_emit", None)
+
+    def _emit(self, op: str, *args) -> None:
+        if self._transactions:
+            tx = self._transactions.get(threading.get_ident())
+            if tx is not None:
+                tx.ops.append((op, args))
+                return
+        for hook in self._mutation_hooks:
+            hook(op, *args)
+
+    # ---- concurrency ----
+    def _account_lock(self, email: str) -> threading.RLock:
+        return self._account_locks[hash(email) % self.lock_stripes]
+
+    def _locks_for(self, emails: Iterable[str]) -> List[threading.RLock]:
+        return [self._account_locks[i] for i in sorted({hash(email) % self.lock_stripes for email in emails})]
+
+    @contextmanager
+    def hold_all_accounts(self) -> Iterator[None]:
+        # Quiesce every mutator, e.g. to take a consistent snapshot of users_db.
+        self._outside_transaction("hold_all_accounts")
+        with self._registry_lock, _holding(self._account_locks):
+            yield
+
+    def _outside_transaction(self, name: str) -> None:
+        # The registry lock comes before any stripe; a transaction holding stripes
+        # must not wait for it.
+        if self._transactions and threading.get_ident() in self._transactions:
+            raise RuntimeError(f"{name} cannot run inside a transaction")
+
+    def _enlisted(self, emails: Iterable[str]) -> None:
+        # Inside a transaction opened for some accounts, refuse to touch any other.
+        if self._transactions:
+            tx = self._transactions.get(threading.get_ident())
+            if tx is not None and tx.accounts is not None and not tx.accounts.issuperset(emails):
+                raise RuntimeError("the transaction does not hold every account this operation touches")
+
+    # ---- ledger ----
+    def rebuild_ledger(self) -> None:
+        # Recount balances, accounts and lockouts after users_db was replaced or filled
+        # directly (journal recovery, use_store). Period flows are kept.
+        with self.hold_all_accounts():
+            for shard in self._ledger:
+                shard.balance_mc = shard.accounts = shard.locked = 0
+            for email, user in self.users_db.items():
+                shard = self._ledger[hash(email) % self.lock_stripes]
+                shard.balance_mc += user.balance_mc
+                shard.accounts += 1
+                shard.locked += bool(user.locked)
+
+    def ledger_summary(self, period: Optional[int] = None, verify: Optional[bool] = None) -> LedgerSummary:
+        if period is None:
+            period = int(time.time() // LEDGER_PERIOD_SECONDS)
+        total_mc = accounts = locked = 0
+        flows = [0, 0, 0]
+        for shard in self._ledger:
+            total_mc += shard.balance_mc
+            accounts += shard.accounts
+            locked += shard.locked
+            totals = shard.periods.get(period)
+            if totals is not None:
+                flows[0] += totals[0]
+                flows[1] += totals[1]
+                flows[2] += totals[2]
+
+        success, message, reason = True, "Ledger summary retrieved successfully.", Reason.OK
+        if self.ledger_debug if verify is None else verify:
+            with self.hold_all_accounts():
+                expected = (sum(user.balance_mc for user in self.users_db.values()), len(self.users_db),
+                            sum(1 for user in self.users_db.values() if user.locked))
+                actual = (sum(shard.balance_mc for shard in self._ledger), sum(shard.accounts for shard in self._ledger),
+                          sum(shard.locked for shard in self._ledger))
+            if actual != expected:
+                success, reason = False, Reason.LEDGER_MISMATCH
+                message = f"Ledger mismatch: incremental (balance_mc, accounts, locked) {actual} != recomputed {expected}."
+        return LedgerSummary(success, to_dollars(total_mc), total_mc, accounts, locked, period,
+                             to_dollars(flows[0]), to_dollars(flows[1]), to_dollars(flows[2]), message, reason)
+
+    # ---- login throttling ----
+    def configure_throttle(self, email_rate: float = 1.0, email_burst: float = 20,
+                           source_rate: float = 50.0, source_burst: float = 200,
+                           max_keys: int = 100_000, lockout_seconds: Optional[float] = 900.0,
+                           enabled: bool = True) -> None:
+        # A bucket that never refills would lock its key out for good, and the expiry
+        # of idle buckets divides by the rate, so both rates must be positive.
+        if enabled and not (email_rate > 0 and source_rate > 0 and email_burst >= 1 and source_burst >= 1):
+            raise ValueError("Throttle rates must be positive and bursts at least 1.")
+        with self._throttle_lock:
+            self.lockout_seconds = lockout_seconds
+            if enabled:
+                self._email_buckets = _BucketTable(email_rate, email_burst, max_keys)
+                self._source_buckets = _BucketTable(source_rate, source_burst, max_keys)
+            else:
+                self._email_buckets = self._source_buckets = None
+
+    def _throttled(self, email: str, source: Optional[str]) -> bool:
+        if self._email_buckets is None:
+            return False
+        now = time.monotonic()
+        with self._throttle_lock:
+            if source is not None and not self._source_buckets.take(source, now):
+                return True
+            return not self._email_buckets.take(email, now)
+
+    # ---- sessions ----
+    # The account record is resolved once at login, so a request with a token needs
+    # no users_db lookup. Every use moves the session to the end and pushes its
+    # expiry out, so the table is ordered by expiry and both expired and least
+    # recently used sessions are dropped from the front.
+    def configure_sessions(self, ttl: float = 1800.0, capacity: int = 100_000) -> None:
+        self.session_ttl = ttl
+        self.session_capacity = capacity
+        self.clear_sessions()
+
+    def clear_sessions(self) -> None:
+        with self._session_lock:
+            self._sessions.clear()
+            self._session_counts.clear()
+
+    def _open_session(self, email: str, user: User) -> str:
+        token = b2a_base64(urandom(18), newline=False).translate(_URLSAFE).decode("ascii")
+        now = time.monotonic()
+        with self._session_lock:
+            sessions = self._sessions
+            sessions[token] = [email, user, now + self.session_ttl]
+            self._session_counts[email] = self._session_counts.get(email, 0) + 1
+            if len(sessions) > self.session_capacity:
+                self._forget_session(sessions.popitem(last=False)[1][0])
+            while sessions and next(iter(sessions.values()))[2] <= now:
+                self._forget_session(sessions.popitem(last=False)[1][0])
+        return token
+
+    def _forget_session(self, email: str) -> bool:
+        """Count one session of email as gone; True if it was the last. Needs _session_lock."""
+        left = self._session_counts.pop(email, 1) - 1
+        if left:
+            self._session_counts[email] = left
+        return not left
+
+    def _session(self, token: str, email: Optional[str]) -> Optional[Tuple[str, User]]:
+        # Lock-free: each OrderedDict call is atomic, and a session evicted between
+        # them still authorizes this one request.
+        entry = self._sessions.get(token)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry[2] <= now:
+            with self._session_lock:
+                if self._sessions.pop(token, None) is not None:
+                    self._forget_session(entry[0])
+            return None
+        if email is not None and entry[0] != email:
+            return None
+        entry[2] = now + self.session_ttl
+        try:
+            self._sessions.move_to_end(token)
+        except KeyError:
+            pass
+        return entry[0], entry[1]
+
+    def end_session(self, token: str) -> bool:
+        entry = self._sessions.get(token)
+        if entry is None:
+            return False
+        email, user = entry[0], entry[1]
+        # account lock before session lock, the order authenticate_user takes them in
+        with self._account_lock(email):
+            with self._session_lock:
+                if self._sessions.pop(token, None) is None:
+                    return False
+                last = self._forget_session(email)
+            if last and user.logged_in:
+                user.logged_in = False
+                if self._mutation_hooks:
+                    self._emit("logout", email)
+        return True
+
+    # ---- interest accrual ----
+    # Lazy, per-account accrual: accrued_at is the Unix second up to which interest has
+    # been settled (0: not accruing yet) and accrual_carry the remainder, below one
+    # millicent, of the exact product balance_mc * rate * seconds. Callers settle while
+    # holding the account's stripe lock and only when accrual_enabled, so a wallet
+    # without accrual pays one check per mutation.
+    def configure_accrual(self, enabled: bool = True, year_seconds: int = 365 * 86400,
+                          clock: Callable[[], float] = time.time) -> None:
+        self.accrual_year_seconds = year_seconds
+        self._accrual_clock = clock
+        if not enabled:
+            self.accrual_enabled = False
+            return
+        # Accounts opened while accrual was off have accrued_at == 0 and would only
+        # start accruing at their next mutation; they start now instead.
+        with self.hold_all_accounts():
+            now = int(clock())
+            for email, user in self.users_db.items():
+                if not user.accrued_at:
+                    user.accrued_at = now
+                    if self._mutation_hooks:
+                        self._emit("accrue", email, 0, now, user.accrual_carry)
+            self.accrual_enabled = True
+
+    def _pending_accrual(self, user: User, now: int) -> Tuple[int, int]:
+        """Return (interest_mc, carry) accrued by user up to now."""
+        since = user.accrued_at
+        rate = user.interest_rate
+        if not since or now <= since or user.balance_mc <= 0 or not 0 < rate <= 1:
+            return 0, user.accrual_carry
+        numerator = user.balance_mc * round(rate * RATE_SCALE) * (now - since) + user.accrual_carry
+        return divmod(numerator, RATE_SCALE * self.accrual_year_seconds)
+
+    def _settle_accrual(self, email: str, user: User, idle: bool = False) -> bool:
+        # idle: no mutation follows, so an account that accrued nothing (not even
+        # carry) is left as it is and not reported. Its balance cannot have changed
+        # since accrued_at without a settlement, so settling it later is exact.
+        now = int(self._accrual_clock())
+        if now <= user.accrued_at:
+            return False
+        interest_mc, carry = self._pending_accrual(user, now)
+        if idle and not interest_mc and carry == user.accrual_carry:
+            return False
+        if self._transactions:
+            tx = self._transactions.get(threading.get_ident())
+            if tx is not None:
+                tx.accruals.setdefault(email, (user.accrued_at, user.accrual_carry))
+        user.accrued_at = now
+        user.accrual_carry = carry
+        if interest_mc:
+            user.balance_mc += interest_mc
+            shard = self._ledger[hash(email) % self.lock_stripes]
+            shard.balance_mc += interest_mc
+            shard.flow(FLOW_INTEREST, interest_mc)
+            user.transactions.add(INTEREST, interest_mc, policy=self._history)
+        if self._mutation_hooks:
+            self._emit("accrue", email, interest_mc, now, carry)
+        return True
+
+    def settle_accruals(self, emails: Iterable[str]) -> int:
+        settled = 0
+        if not self.accrual_enabled:
+            return settled
+        for email in emails:
+            user = self.users_db.get(email)
+            if user is None:
+                continue
+            with self._account_lock(email):
+                settled += self._settle_accrual(email, user, idle=True)
+        return settled
+
+    # ---- operations ----
+    def register_user(self, name: str, email: str, pin: str, initial_balance: float) -> AccountStatus:
+        if not name or not valid_email(email) or not valid_pin(pin) or initial_balance < 0:
+            return AccountStatus(False, "Invalid registration input.", reason=Reason.INVALID_INPUT)
+
+        try:
+            balance_mc = to_millicents(initial_balance)
+        except ValueError:
+            return AccountStatus(False, "Invalid registration input.", reason=Reason.INVALID_INPUT)
+        self._outside_transaction("register_user")
+        stripe = hash(email) % self.lock_stripes
+        with self._registry_lock, self._account_locks[stripe]:
+            if email in self.users_db:
+                return AccountStatus(False, "User already exists.", reason=Reason.USER_EXISTS)
+            self._insert_account(name, email, pin, balance_mc)
+        return AccountStatus(True, f"User {name} registered successfully with balance ${initial_balance:.2f}")
+
+    def _insert_account(self, name: str, email: str, pin: str, balance_mc: int,
+                        interest_rate: float = DEFAULT_INTEREST_RATE) -> None:
+        # The one insert path, shared with walletBulk: the caller has validated the
+        # input, holds _registry_lock and the account's stripe, and checked that
+        # email is new.
+        self.users_db[email] = User(name, email, pin, balance_mc=balance_mc, interest_rate=interest_rate)
+        shard = self._ledger[hash(email) % self.lock_stripes]
+        shard.balance_mc += balance_mc
+        shard.accounts += 1
+        if self._mutation_hooks:
+            self._emit("register", email, name, pin, balance_mc, interest_rate)
+        if self.accrual_enabled:
+            # the stored record, not the User built above: a columnar store copies it
+            self._settle_accrual(email, self.users_db[email])
+
+    def authenticate_user(self, email: str, entered_pin: str, source: Optional[str] = None) -> LoginStatus:
+        if not valid_email(email) or not valid_pin(entered_pin):
+            return LoginStatus(False, "Invalid email or PIN format.", reason=Reason.INVALID_INPUT)
+        if self._throttled(email, source):
+            return LoginStatus(False, "Too many login attempts. Try again later.", reason=Reason.THROTTLED)
+        if email not in self.users_db:
+            return LoginStatus(False, "User does not exist.", reason=Reason.USER_NOT_FOUND)
+
+        user = self.users_db[email]
+        stripe = hash(email) % self.lock_stripes
+        with self._account_locks[stripe]:
+            if user.locked:
+                if self.lockout_seconds is None or time.time() - user.locked_at < self.lockout_seconds:
+                    return LoginStatus(False, "Account is locked due to too many failed login attempts.",
+                                       reason=Reason.ACCOUNT_LOCKED)
+                user.locked = False
+                user.login_attempts = 0
+                self._ledger[stripe].locked -= 1
+                if self._mutation_hooks:
+                    self._emit("unlock", email)
+
+            if user.pin == entered_pin:
+                user.logged_in = True
+                user.login_attempts = 0
+                if self._mutation_hooks:
+                    self._emit("login", email)
+                return LoginStatus(True, "Login successful.", self._open_session(email, user))
+            else:
+                user.login_attempts += 1
+                if user.login_attempts >= MAX_LOGIN_ATTEMPTS:
+                    user.locked = True
+                    user.locked_at = time.time()
+                    self._ledger[stripe].locked += 1
+                    if self._mutation_hooks:
+                        self._emit("lock", email)
+                    return LoginStatus(False, "Account locked due to multiple failed attempts.",
+                                       reason=Reason.ACCOUNT_LOCKED)
+                if self._mutation_hooks:
+                    self._emit("login_failed", email)
+                return LoginStatus(False, f"Incorrect PIN. Attempts: {user.login_attempts}", reason=Reason.WRONG_PIN)
+
+    def view_balance(self, email: Optional[str], token: Optional[str] = None) -> BalanceInfo:
+        if token is None:
+            if email not in self.users_db:
+                return BalanceInfo(0, [], 0, "User does not exist.", reason=Reason.USER_NOT_FOUND)
+            user = self.users_db[email]
+            if not user.logged_in:
+                return BalanceInfo(0, [], 0, "Access denied. User not logged in.", reason=Reason.NOT_LOGGED_IN)
+        else:
+            session = self._session(token, email)
+            if session is None:
+                return BalanceInfo(0, [], 0, INVALID_SESSION, reason=Reason.INVALID_SESSION)
+            email, user = session
+        with self._account_lock(email):
+            entries, next_cursor = user.transactions.page(None, BALANCE_HISTORY_LIMIT)
+            if not self.accrual_enabled:
+                return BalanceInfo(user.balance, entries, user.interest_rate, "Balance retrieved successfully.", next_cursor)
+            pending_mc, _ = self._pending_accrual(user, int(self._accrual_clock()))
+            return BalanceInfo(to_dollars(user.balance_mc + pending_mc), entries, user.interest_rate,
+                               "Balance retrieved successfully.", next_cursor, to_dollars(pending_mc))
+
+    def view_history(self, email: Optional[str], cursor: Optional[int] = None, limit: int = HISTORY_PAGE_SIZE,
+                     token: Optional[str] = None) -> HistoryPage:
+        if token is None:
+            if email not in self.users_db:
+                return HistoryPage([], None, "User does not exist.", reason=Reason.USER_NOT_FOUND)
+            user = self.users_db[email]
+            if not user.logged_in:
+                return HistoryPage([], None, "Access denied. User not logged in.", reason=Reason.NOT_LOGGED_IN)
+        else:
+            session = self._session(token, email)
+            if session is None:
+                return HistoryPage([], None, INVALID_SESSION, reason=Reason.INVALID_SESSION)
+            email, user = session
+        with self._account_lock(email):
+            entries, next_cursor = user.transactions.page(cursor, limit)
+        return HistoryPage(entries, next_cursor, "History retrieved successfully.")
+
+    def deposit(self, email: Optional[str], amount: float, token: Optional[str] = None) -> DepositStatus:
+        if token is None:
+            if email not in self.users_db:
+                return DepositStatus(False, "User does not exist.", reason=Reason.USER_NOT_FOUND)
+            user = self.users_db[email]
+            if not user.logged_in:
+                return DepositStatus(False, "User not logged in.", reason=Reason.NOT_LOGGED_IN)
+        else:
+            session = self._session(token, email)
+            if session is None:
+                return DepositStatus(False, INVALID_SESSION, reason=Reason.INVALID_SESSION)
+            email, user = session
+        amount_mc = _amount_mc(amount)
+        if amount_mc <= 0:
+            return DepositStatus(False, "Deposit amount must be positive.", reason=Reason.INVALID_AMOUNT)
+        self._enlisted((email,))
+
+        stripe = hash(email) % self.lock_stripes
+        with self._account_locks[stripe]:
+            if self.accrual_enabled:
+                self._settle_accrual(email, user)
+            user.balance_mc += amount_mc
+            shard = self._ledger[stripe]
+            shard.balance_mc += amount_mc
+            shard.flow(FLOW_DEPOSITS, amount_mc)
+            user.transactions.add(DEPOSIT, amount_mc, policy=self._history)
+            user.notifications.add(DEPOSIT, amount_mc, "", user.balance_mc, policy=self._history)
+            if self._outbox is not None:
+                self._enqueue_notification((email, DEPOSIT, amount_mc, "", user.balance_mc))
+            if self._mutation_hooks:
+                self._emit("deposit", email, amount_mc)
+        return DepositStatus(True, f"Deposited ${amount:.2f} successfully.")
+
+    def apply_interest(self, email: str, interest_rate: float) -> InterestStatus:
+        if email not in self.users_db:
+            return InterestStatus(False, "User does not exist.", reason=Reason.USER_NOT_FOUND)
+        user = self.users_db[email]
+        if not user.logged_in:
+            return InterestStatus(False, "User not logged in.", reason=Reason.NOT_LOGGED_IN)
+        if not (0 < interest_rate <= 1):
+            return InterestStatus(False, "Invalid interest rate.", reason=Reason.INVALID_RATE)
+        self._enlisted((email,))
+
+        stripe = hash(email) % self.lock_stripes
+        with self._account_locks[stripe]:
+            if self.accrual_enabled:
+                self._settle_accrual(email, user)
+            if user.balance_mc <= 0:
+                return InterestStatus(False, "No interest accrued on zero or negative balance.",
+                                      reason=Reason.NO_BALANCE)
+            interest_mc = interest_millicents(user.balance_mc, interest_rate)
+            interest_amount = to_dollars(interest_mc)
+            user.balance_mc += interest_mc
+            shard = self._ledger[stripe]
+            shard.balance_mc += interest_mc
+            shard.flow(FLOW_INTEREST, interest_mc)
+            user.transactions.add(INTEREST, interest_mc, policy=self._history)
+            user.notifications.add(INTEREST, interest_mc, "", user.balance_mc, policy=self._history)
+            if self._outbox is not None:
+                self._enqueue_notification((email, INTEREST, interest_mc, "", user.balance_mc))
+            if self._mutation_hooks:
+                self._emit("interest", email, interest_mc)
+        return InterestStatus(True, f"Interest of ${interest_amount:.2f} applied.")
+
+    def apply_interest_all(self, interest_rate: Optional[float] = None) -> InterestSummary:
+        if interest_rate is not None and not (0 < interest_rate <= 1):
+            return InterestSummary(False, 0, 0, 0.0, "Invalid interest rate.", reason=Reason.INVALID_RATE)
+        with self.hold_all_accounts():
+            return self._apply_interest_all(interest_rate)
+
+    def _apply_interest_all(self, interest_rate: Optional[float]) -> InterestSummary:
+        if self.accrual_enabled:
+            for email, user in self.users_db.items():
+                self._settle_accrual(email, user)
+        bulk_accrue = getattr(self.users_db, "accrue_interest", None)
+        if bulk_accrue is not None:
+            credited_pairs = bulk_accrue(interest_rate)
+            total_mc = 0
+            for email, interest_mc in credited_pairs:
+                total_mc += interest_mc
+                shard = self._ledger[hash(email) % self.lock_stripes]
+                shard.balance_mc += interest_mc
+                shard.flow(FLOW_INTEREST, interest_mc)
+            if self._mutation_hooks:
+                for email, interest_mc in credited_pairs:
+                    self._emit("interest", email, interest_mc)
+            credited = len(credited_pairs)
+            total = to_dollars(total_mc)
+            return InterestSummary(True, credited, len(self.users_db) - credited, total,
+                                   f"Interest of ${total:.2f} applied to {credited} accounts.")
+
+        users = list(self.users_db.values())
+        balances_mc = [user.balance_mc for user in users]
+        if interest_rate is None:
+            rates = [user.interest_rate for user in users]
+        else:
+            rates = [interest_rate] * len(users)
+
+        credited = 0
+        total_mc = 0
+        for user, interest_mc in zip(users, _accrue(balances_mc, rates)):
+            if interest_mc > 0:
+                user.balance_mc += interest_mc
+                credited += 1
+                total_mc += interest_mc
+                shard = self._ledger[hash(user.email) % self.lock_stripes]
+                shard.balance_mc += interest_mc
+                shard.flow(FLOW_INTEREST, interest_mc)
+                if self._mutation_hooks:
+                    self._emit("interest", user.email, interest_mc)
+        total = to_dollars(total_mc)
+        return InterestSummary(True, credited, len(users) - credited, total,
+                               f"Interest of ${total:.2f} applied to {credited} accounts.")
+
+    def transfer(self, sender_email: Optional[str], receiver_email: str, amount: float,
+                 token: Optional[str] = None) -> TransferStatus:
+        if token is None:
+            if sender_email not in self.users_db or receiver_email not in self.users_db:
+                return TransferStatus(False, "Sender or receiver does not exist.", reason=Reason.USER_NOT_FOUND)
+            sender = self.users_db[sender_email]
+        else:
+            session = self._session(token, sender_email)
+            if session is None:
+                return TransferStatus(False, INVALID_SESSION, reason=Reason.INVALID_SESSION)
+            sender_email, sender = session
+            if receiver_email not in self.users_db:
+                return TransferStatus(False, "Sender or receiver does not exist.", reason=Reason.USER_NOT_FOUND)
+        if sender_email == receiver_email:
+            return TransferStatus(False, "Cannot transfer to self.", reason=Reason.SELF_TRANSFER)
+
+        receiver = self.users_db[receiver_email]
+        if token is None and not sender.logged_in or not receiver.logged_in:
+            return TransferStatus(False, "Both users must be logged in.", reason=Reason.NOT_LOGGED_IN)
+        amount_mc = _amount_mc(amount)
+        if amount_mc <= 0:
+            return TransferStatus(False, "Insufficient funds or invalid amount.", reason=Reason.INVALID_AMOUNT)
+        self._enlisted((sender_email, receiver_email))
+
+        first = hash(sender_email) % self.lock_stripes
+        second = hash(receiver_email) % self.lock_stripes
+        if first > second:
+            first, second = second, first
+        with self._account_locks[first]:
+            if second != first:
+                self._account_locks[second].acquire()
+            try:
+                if self.accrual_enabled:
+                    self._settle_accrual(sender_email, sender)
+                    self._settle_accrual(receiver_email, receiver)
+                if sender.balance_mc < amount_mc:
+                    return TransferStatus(False, "Insufficient funds or invalid amount.",
+                                          reason=Reason.INSUFFICIENT_FUNDS)
+                sender.balance_mc -= amount_mc
+                receiver.balance_mc += amount_mc
+                sender.transactions.add(TRANSFER_OUT, amount_mc, receiver_email, policy=self._history)
+                receiver.transactions.add(TRANSFER_IN, amount_mc, sender_email, policy=self._history)
+                sender.notifications.add(TRANSFER_OUT, amount_mc, receiver_email, sender.balance_mc, policy=self._history)
+                receiver.notifications.add(TRANSFER_IN, amount_mc, sender_email, receiver.balance_mc, policy=self._history)
+                if self._outbox is not None:
+                    self._enqueue_notification((sender_email, TRANSFER_OUT, amount_mc, receiver_email, sender.balance_mc))
+                    self._enqueue_notification((receiver_email, TRANSFER_IN, amount_mc, sender_email, receiver.balance_mc))
+                if self._mutation_hooks:
+                    self._emit("transfer", sender_email, receiver_email, amount_mc)
+            finally:
+                if second != first:
+                    self._account_locks[second].release()
+        return TransferStatus(True, f"Transferred ${amount:.2f} successfully.")
+
+    def transfer_batch(self, transfers: Iterable[Tuple[str, str, float]]) -> List[TransferStatus]:
+        items = list(transfers)
+        if not items:
+            return []
+        # One pass over the items nets each account's position; everything else runs
+        # per distinct amount or per account. Amounts in a batch repeat, so each
+        # distinct one is converted once, and the checks over all items run in C.
+        amounts_mc = {amount: _amount_mc(amount) for amount in set(map(_AMOUNT, items))}
+        if min(amounts_mc.values()) <= 0 or any(map(operator.eq, map(_SENDER, items), map(_RECEIVER, items))):
+            return self._reject_batch(items)
+        net: Dict[str, int] = {}
+        get = net.get
+        for sender_email, receiver_email, amount in items:
+            amount_mc = amounts_mc[amount]
+            net[sender_email] = get(sender_email, 0) - amount_mc
+            net[receiver_email] = get(receiver_email, 0) + amount_mc
+        users = list(map(self.users_db.get, net))
+        if not all(user is not None and user.logged_in for user in users):
+            return self._reject_batch(items)
+        self._enlisted(net)
+
+        with _holding(self._locks_for(net)):
+            if self.accrual_enabled:
+                for email, user in zip(net, users):
+                    self._settle_accrual(email, user)
+            overdrawn = {email for (email, delta), user in zip(net.items(), users) if user.balance_mc + delta < 0}
+            if overdrawn:
+                return self._reject_batch(items, overdrawn)
+
+            for (email, delta), user in zip(net.items(), users):
+                user.balance_mc += delta
+                user.transactions.add(BATCH_TRANSFER, delta, policy=self._history)
+                user.notifications.add(BATCH_TRANSFER, delta, "", user.balance_mc, policy=self._history)
+                if self._outbox is not None:
+                    self._enqueue_notification((email, BATCH_TRANSFER, delta, "", user.balance_mc))
+            if self._mutation_hooks:
+                tx = self._transactions.get(threading.get_ident()) if self._transactions else None
+                if tx is not None:
+                    tx.ops.append(("transfer_batch", (tuple(net.items()),
+                                                      tuple((sender_email, receiver_email, amounts_mc[amount])
+                                                            for sender_email, receiver_email, amount in items))))
+                else:
+                    for sender_email, receiver_email, amount in items:
+                        self._emit("transfer", sender_email, receiver_email, amounts_mc[amount])
+        return [_BATCH_OK] * len(items)
+
+    def _reject_batch(self, items: List[Tuple[str, str, float]], overdrawn: Iterable[str] = ()) -> List[TransferStatus]:
+        results = []
+        for sender_email, receiver_email, amount in items:
+            sender = self.users_db.get(sender_email)
+            receiver = self.users_db.get(receiver_email)
+            if sender is None or receiver is None:
+                results.append(_BATCH_MISSING)
+            elif sender_email == receiver_email:
+                results.append(_BATCH_SELF)
+            elif not sender.logged_in or not receiver.logged_in:
+                results.append(_BATCH_LOGGED_OUT)
+            elif _amount_mc(amount) <= 0:
+                results.append(_BATCH_INVALID_AMOUNT)
+            elif sender_email in overdrawn:
+                results.append(_BATCH_INSUFFICIENT)
+            else:
+                results.append(_BATCH_REJECTED)
+        return results
+
+    def withdraw(self, email: Optional[str], amount: float, token: Optional[str] = None) -> WithdrawalStatus:
+        if token is None:
+            if email not in self.users_db:
+                return WithdrawalStatus(False, "User does not exist.", reason=Reason.USER_NOT_FOUND)
+            user = self.users_db[email]
+            if not user.logged_in:
+                return WithdrawalStatus(False, "User not logged in.", reason=Reason.NOT_LOGGED_IN)
+        else:
+            session = self._session(token, email)
+            if session is None:
+                return WithdrawalStatus(False, INVALID_SESSION, reason=Reason.INVALID_SESSION)
+            email, user = session
+        amount_mc = _amount_mc(amount)
+        if amount_mc <= 0:
+            return WithdrawalStatus(False, "Invalid withdrawal amount.", reason=Reason.INVALID_AMOUNT)
+        self._enlisted((email,))
+
+        stripe = hash(email) % self.lock_stripes
+        with self._account_locks[stripe]:
+            if self.accrual_enabled:
+                self._settle_accrual(email, user)
+            if amount_mc > user.balance_mc:
+                return WithdrawalStatus(False, "Invalid withdrawal amount.", reason=Reason.INSUFFICIENT_FUNDS)
+            user.balance_mc -= amount_mc
+            shard = self._ledger[stripe]
+            shard.balance_mc -= amount_mc
+            shard.flow(FLOW_WITHDRAWALS, amount_mc)
+            user.transactions.add(WITHDRAWAL, amount_mc, policy=self._history)
+            user.notifications.add(WITHDRAWAL, amount_mc, "", user.balance_mc, policy=self._history)
+            if self._outbox is not None:
+                self._enqueue_notification((email, WITHDRAWAL, amount_mc, "", user.balance_mc))
+            if self._mutation_hooks:
+                self._emit("withdraw", email, amount_mc)
+        return WithdrawalStatus(True, f"Withdrew ${amount:.2f} successfully.")
+
+    # ---- escrow ----
+    def escrow_debit(self, txid: str, email: Optional[str], counterparty: str, amount_mc: int,
+                     token: Optional[str] = None) -> TransferStatus:
+        if token is None:
+            if email not in self.users_db:
+                return TransferStatus(False, "Sender or receiver does not exist.", reason=Reason.USER_NOT_FOUND)
+            user = self.users_db[email]
+            if not user.logged_in:
+                return TransferStatus(False, "Both users must be logged in.", reason=Reason.NOT_LOGGED_IN)
+        else:
+            session = self._session(token, email)
+            if session is None:
+                return TransferStatus(False, INVALID_SESSION, reason=Reason.INVALID_SESSION)
+            email, user = session
+        if amount_mc <= 0:
+            return TransferStatus(False, "Insufficient funds or invalid amount.", reason=Reason.INVALID_AMOUNT)
+
+        stripe = hash(email) % self.lock_stripes
+        with self._account_locks[stripe]:
+            if txid in self._escrows:
+                return TransferStatus(True, "Funds already held.")
+            if self.accrual_enabled:
+                self._settle_accrual(email, user)
+            if user.balance_mc < amount_mc:
+                return TransferStatus(False, "Insufficient funds or invalid amount.", reason=Reason.INSUFFICIENT_FUNDS)
+            user.balance_mc -= amount_mc
+            self._ledger[stripe].balance_mc -= amount_mc
+            self._escrows[txid] = (email, counterparty, amount_mc)
+            if self._mutation_hooks:
+                self._emit("escrow_debit", txid, email, counterparty, amount_mc)
+        return TransferStatus(True, "Funds held.")
+
+    def escrow_settle(self, txid: str) -> bool:
+        escrow = self._escrows.get(txid)
+        if escrow is None:
+            return False
+        email, counterparty, amount_mc = escrow
+        with self._account_lock(email):
+            if self._escrows.pop(txid, None) is None:
+                return False
+            user = self.users_db.get(email)
+            if user is not None:
+                user.transactions.add(TRANSFER_OUT, amount_mc, counterparty, policy=self._history)
+                user.notifications.add(TRANSFER_OUT, amount_mc, counterparty, user.balance_mc, policy=self._history)
+                if self._outbox is not None:
+                    self._enqueue_notification((email, TRANSFER_OUT, amount_mc, counterparty, user.balance_mc))
+            if self._mutation_hooks:
+                self._emit("escrow_settle", txid)
+        return True
+
+    def escrow_release(self, txid: str) -> bool:
+        escrow = self._escrows.get(txid)
+        if escrow is None:
+            return False
+        email, _, amount_mc = escrow
+        stripe = hash(email) % self.lock_stripes
+        with self._account_locks[stripe]:
+            if self._escrows.pop(txid, None) is None:
+                return False
+            user = self.users_db[email]
+            if self.accrual_enabled:
+                self._settle_accrual(email, user)
+            user.balance_mc += amount_mc
+            self._ledger[stripe].balance_mc += amount_mc
+            if self._mutation_hooks:
+                self._emit("escrow_release", txid)
+        return True
+
+    def escrow_credit(self, txid: str, email: str, counterparty: str, amount_mc: int) -> TransferStatus:
+        # The commit phase must not fail once decided, so only existence is checked here;
+        # the coordinator checks the receiver's login before the debit is prepared.
+        if email not in self.users_db:
+            return TransferStatus(False, "Sender or receiver does not exist.", reason=Reason.USER_NOT_FOUND)
+        user = self.users_db[email]
+
+        stripe = hash(email) % self.lock_stripes
+        with self._account_locks[stripe]:
+            if txid in self._escrow_credited:
+                return TransferStatus(True, "Transfer already credited.")
+            if self.accrual_enabled:
+                self._settle_accrual(email, user)
+            user.balance_mc += amount_mc
+            self._ledger[stripe].balance_mc += amount_mc
+            self._escrow_credited.add(txid)
+            user.transactions.add(TRANSFER_IN, amount_mc, counterparty, policy=self._history)
+            user.notifications.add(TRANSFER_IN, amount_mc, counterparty, user.balance_mc, policy=self._history)
+            if self._outbox is not None:
+                self._enqueue_notification((email, TRANSFER_IN, amount_mc, counterparty, user.balance_mc))
+            if self._mutation_hooks:
+                self._emit("escrow_credit", txid, email, counterparty, amount_mc)
+        return TransferStatus(True, "Transfer credited.")
+
+    def escrow_end(self, txid: str) -> bool:
+        # set.remove is atomic, so of two concurrent calls only one reports the END.
+        try:
+            self._escrow_credited.remove(txid)
+        except KeyError:
+            return False
+        if self._mutation_hooks:
+            self._emit("escrow_end", txid)
+        return True
+
+    def pending_escrows(self) -> Dict[str, Tuple[str, str, int]]:
+        return dict(self._escrows)
+
+    # ---- transactions ----
+    @contextmanager
+    def transaction(self, accounts: Optional[Iterable[str]] = None) -> Iterator[Transaction]:
+        if accounts is not None:
+            accounts = frozenset(accounts)
+        locks = self._account_locks if accounts is None else self._locks_for(accounts)
+        with _holding(locks):
+            thread = threading.get_ident()
+            if thread in self._transactions:
+                yield self._transactions[thread]
+                return
+            tx = Transaction(self, accounts)
+            with self._transactions_lock:
+                if not self._transactions:
+                    self._mutation_hooks.append(_no_hook)
+                self._transactions[thread] = tx
+                self._route_hooks()
+            try:
+                yield tx
+            except TransactionAborted as aborted:
+                tx._rollback()
+                tx.status = aborted.status
+            except BaseException:
+                tx._rollback()
+                raise
+            else:
+                tx.committed = True
+            finally:
+                with self._transactions_lock:
+                    del self._transactions[thread]
+                    if not self._transactions:
+                        self._mutation_hooks.remove(_no_hook)
+                    self._route_hooks()
+                if tx.committed and self._outbox is not None:
+                    self._outbox.extend(tx.notifications)
+                # Still holding the locks, so hooks see the block's mutations in the
+                # order they were applied relative to every other thread.
+                if self._mutation_hooks:
+                    for op, args in tx.ops:
+                        if op == "transfer_batch":
+                            if tx.committed:
+                                for transfer in args[1]:
+                                    self._emit("transfer", *transfer)
+                        elif tx.committed or op not in _UNDOABLE:
+                            self._emit(op, *args)
+
+    # ---- notification outbox ----
+    def set_notification_outbox(self, outbox: Optional[deque]) -> None:
+        self._outbox = outbox
+
+    def _enqueue_notification(self, record: tuple) -> None:
+        record += (next(self._notification_seq),)
+        if self._transactions:
+            tx = self._transactions.get(threading.get_ident())
+            if tx is not None:
+                tx.notifications.append(record)
+                return
+        self._outbox.append(record)
@@ -0,0 +1,62 @@
+"""
+Money
+
+Exact integer money: balances and amounts in millicents, and the interest policy.
+"""
+
+# ------------------- Money -------------------
+# Balances and amounts are stored as integer millicents (1/1000 of a cent), so
+# sums and transfers are exact. Floats are accepted at the API boundary and
+# rounded half-to-even to the nearest millicent; a converted amount must fit in
+# int64 (the journal and columnar store hold it as one).
+# Interest policy: the rate is quantized to RATE_SCALE (1e-9) and the interest is
+# rounded half-to-even to the nearest millicent; it is never negative.
+MILLICENTS_PER_DOLLAR = 100_000
+RATE_SCALE = 1_000_000_000
+MAX_MILLICENTS = 2**63 - 1
+
+def to_millicents(amount: float) -> int:
+    """Raise ValueError if amount is NaN, infinite or beyond MAX_MILLICENTS."""
+    try:
+        millicents = round(amount * MILLICENTS_PER_DOLLAR)
+    except (OverflowError, ValueError):
+        raise ValueError(f"Amount {amount!r} is not finite.") from None
+    if not -MAX_MILLICENTS <= millicents <= MAX_MILLICENTS:
+        raise ValueError(f"Amount {amount!r} is out of range.")
+    return millicents
+
+def to_dollars(millicents: int) -> float:
+    return millicents / MILLICENTS_PER_DOLLAR
+
+def interest_millicents(balance_mc: int, interest_rate: float) -> int:
+    q, r = divmod(balance_mc * round(interest_rate * RATE_SCALE), RATE_SCALE)
+    if 2 * r > RATE_SCALE or (2 * r == RATE_SCALE and q & 1):
+        q += 1
+    return q
+
+def interest_millicents_array(balances_mc, rates):
+    # Vectorized interest_millicents over int64 balances and float rates. The
+    # product is split as (hi * RATE_SCALE + lo) * units so it never overflows int64.
+    np = numpy()
+    units = np.rint(np.asarray(rates, dtype=np.float64) * RATE_SCALE).astype(np.int64)
+    hi, lo = np.divmod(balances_mc, RATE_SCALE)
+    q, r = np.divmod(lo * units, RATE_SCALE)
+    q += hi * units
+    q += (2 * r > RATE_SCALE) | ((2 * r == RATE_SCALE) & (q & 1 == 1))
+    return q
+
+
+# numpy is optional and slow to import, so it is imported on the first vectorized
+# call rather than with the wallet.
+_numpy = False
+
+def numpy():
+    """Return the numpy module, or None if it is not installed."""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        _numpy = np
+    return _numpy
@@ -0,0 +1,167 @@
+"""
+Status Types
+
+The result records returned by the wallet operations, and the Reason codes
+they carry.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Dict, List, Optional, Tuple
+
+# ------------------- Status Classes -------------------
+# Every status carries a machine-readable reason, set by the operation at the
+# point it fails (Reason.OK on success). Statuses are slotted classes rather than
+# dataclasses: creating one is a plain __init__ call allocating no __dict__, and
+# importing them does not pull in dataclasses and inspect. _Record gives them
+# field-wise equality, a repr, and NamedTuple-style _fields, _asdict and _replace.
+class _Record:
+    __slots__ = ()
+    __hash__ = None
+    _fields: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls) -> None:
+        cls._fields = cls._fields + cls.__dict__.get("__slots__", ())
+
+    def __eq__(self, other) -> bool:
+        if not (isinstance(other, type(self)) or isinstance(self, type(other))):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self._fields)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__qualname__}({fields})"
+
+    def _asdict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self._fields}
+
+    def _replace(self, **changes: Any):
+        return type(self)(**{**self._asdict(), **changes})
+
+class Reason(Enum):
+    OK = "ok"
+    INVALID_INPUT = "invalid_input"
+    USER_EXISTS = "user_exists"
+    USER_NOT_FOUND = "user_not_found"
+    NOT_LOGGED_IN = "not_logged_in"
+    INVALID_SESSION = "invalid_session"
+    THROTTLED = "throttled"
+    ACCOUNT_LOCKED = "account_locked"
+    WRONG_PIN = "wrong_pin"
+    INVALID_AMOUNT = "invalid_amount"
+    INSUFFICIENT_FUNDS = "insufficient_funds"
+    SELF_TRANSFER = "self_transfer"
+    INVALID_RATE = "invalid_rate"
+    NO_BALANCE = "no_balance"
+    BATCH_REJECTED = "batch_rejected"
+    LEDGER_MISMATCH = "ledger_mismatch"
+    UNAVAILABLE = "unavailable"
+    UNKNOWN = "unknown"
+
+class AccountStatus(_Record):
+    __slots__ = ("success", "message", "reason")
+
+    def __init__(self, success: bool, message: str, reason: Reason = Reason.OK):
+        self.success = success
+        self.message = message
+        self.reason = reason
+
+class LoginStatus(_Record):
+    __slots__ = ("success", "message", "token", "reason")
+
+    def __init__(self, success: bool, message: str, token: Optional[str] = None, reason: Reason = Reason.OK):
+        self.success = success
+        self.message = message
+        self.token = token
+        self.reason = reason
+
+class BalanceInfo(_Record):
+    __slots__ = ("balance", "transactions", "interest", "message", "next_cursor", "pending_interest", "reason")
+
+    def __init__(self, balance: float, transactions: List[str], interest: float, message: str,
+                 next_cursor: Optional[int] = None, pending_interest: float = 0.0, reason: Reason = Reason.OK):
+        self.balance = balance
+        self.transactions = transactions
+        self.interest = interest
+        self.message = message
+        self.next_cursor = next_cursor
+        self.pending_interest = pending_interest
+        self.reason = reason
+
+class LedgerSummary(_Record):
+    __slots__ = ("success", "total_balance", "total_balance_mc", "accounts", "locked_accounts", "period",
+                 "deposits", "withdrawals", "interest", "message", "reason")
+
+    def __init__(self, success: bool, total_balance: float, total_balance_mc: int, accounts: int,
+                 locked_accounts: int, period: int, deposits: float, withdrawals: float,
+                 interest: float, message: str, reason: Reason = Reason.OK):
+        self.success = success
+        self.total_balance = total_balance
+        self.total_balance_mc = total_balance_mc
+        self.accounts = accounts
+        self.locked_accounts = locked_accounts
+        self.period = period
+        self.deposits = deposits
+        self.withdrawals = withdrawals
+        self.interest = interest
+        self.message = message
+        self.reason = reason
+
+class HistoryPage(_Record):
+    __slots__ = ("entries", "next_cursor", "message", "reason")
+
+    def __init__(self, entries: List[str], next_cursor: Optional[int], message: str, reason: Reason = Reason.OK):
+        self.entries = entries
+        self.next_cursor = next_cursor
+        self.message = message
+        self.reason = reason
+
+class DepositStatus(_Record):
+    __slots__ = ("success", "message", "reason")
+
+    def __init__(self, success: bool, message: str, reason: Reason = Reason.OK):
+        self.success = success
+        self.message = message
+        self.reason = reason
+
+class InterestStatus(_Record):
+    __slots__ = ("success", "message", "reason")
+
+    def __init__(self, success: bool, message: str, reason: Reason = Reason.OK):
+        self.success = success
+        self.message = message
+        self.reason = reason
+
+class InterestSummary(_Record):
+    __slots__ = ("success", "accounts_credited", "accounts_skipped", "total_interest", "message", "reason")
+
+    def __init__(self, success: bool, accounts_credited: int, accounts_skipped: int, total_interest: float,
+                 message: str, reason: Reason = Reason.OK):
+        self.success = success
+        self.accounts_credited = accounts_credited
+        self.accounts_skipped = accounts_skipped
+        self.total_interest = total_interest
+        self.message = message
+        self.reason = reason
+
+class TransferStatus(_Record):
+    __slots__ = ("success", "message", "reason")
+
+    def __init__(self, success: bool, message: str, reason: Reason = Reason.OK):
+        self.success = success
+        self.message = message
+        self.reason = reason
+
+class WithdrawalStatus(_Record):
+    __slots__ = ("success", "message", "reason")
+
+    def __init__(self, success: bool, message: str, reason: Reason = Reason.OK):
+        self.success = success
+        self.message = message
+        self.reason = reason
+
+INVALID_SESSION = "Invalid or expired session."
@@ -0,0 +1,218 @@
+"""
+Storage
+
+Account records and their bounded transaction and notification histories.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, List, Optional, TextIO, Tuple
+
+from .money import MILLICENTS_PER_DOLLAR, to_millicents
+from .status import _Record
+
+# ------------------- History -------------------
+# Transactions and notifications are kept as compact (kind, amount_mc, counterparty,
+# balance_mc) records and only formatted when read. Each history holds at most
+# retention records plus an eighth of slack, so eviction runs in chunks; evicted
+# records are formatted once and appended to the spill file, if configured. Both
+# come from a HistoryPolicy, which each Wallet owns (Wallet.configure_history).
+HISTORY_RETENTION = 1000
+HISTORY_PAGE_SIZE = 50
+BALANCE_HISTORY_LIMIT = 10
+DEFAULT_INTEREST_RATE = 0.05
+
+DEPOSIT, WITHDRAWAL, INTEREST, TRANSFER_OUT, TRANSFER_IN, BATCH_TRANSFER, TEXT = range(7)
+
+TRANSACTION_TEMPLATES = (
+    "Deposited ${amount:.2f}",
+    "Withdrew ${amount:.2f}",
+    "Interest applied: ${amount:.2f}",
+    "Transferred ${amount:.2f} to {counterparty}",
+    "Received ${amount:.2f} from {counterparty}",
+    "Batch transfer settled: net ${amount:+.2f}",
+    "{counterparty}",
+)
+NOTIFICATION_TEMPLATES = (
+    "Deposit successful. New balance: ${balance:.2f}",
+    "Withdrawal of ${amount:.2f} successful. New balance: ${balance:.2f}",
+    "Interest of ${amount:.2f} applied. New balance: ${balance:.2f}",
+    "Transferred ${amount:.2f} to {counterparty}. New balance: ${balance:.2f}",
+    "Received ${amount:.2f} from {counterparty}. New balance: ${balance:.2f}",
+    "Batch transfer settled. New balance: ${balance:.2f}",
+    "{counterparty}",
+)
+_TEMPLATES = {"transactions": TRANSACTION_TEMPLATES, "notifications": NOTIFICATION_TEMPLATES}
+
+class HistoryPolicy:
+    __slots__ = ("retention", "spill", "_lock")
+
+    def __init__(self, retention: int = HISTORY_RETENTION):
+        self.retention = retention
+        self.spill: Optional[TextIO] = None
+        self._lock = threading.Lock()
+
+    def configure(self, retention: int = HISTORY_RETENTION, spill_path: Optional[str] = None) -> None:
+        self.retention = retention
+        with self._lock:
+            if self.spill is not None:
+                self.spill.close()
+            self.spill = open(spill_path, "a", encoding="utf-8") if spill_path else None
+
+    def write(self, lines: str) -> None:
+        with self._lock:
+            if self.spill is not None:
+                self.spill.write(lines)
+
+# Used by histories changed outside any wallet operation, e.g. append() on a record.
+DEFAULT_POLICY = HistoryPolicy()
+
+class History:
+    __slots__ = ("owner", "channel", "templates", "_records", "_total")
+
+    def __init__(self, owner: str, channel: str, templates: Tuple[str, ...]):
+        self.owner = owner
+        self.channel = channel
+        self.templates = templates
+        self._records: deque = deque()
+        self._total = 0
+
+    def add(self, kind: int, amount_mc: int = 0, counterparty: str = "", balance_mc: int = 0,
+            policy: HistoryPolicy = DEFAULT_POLICY) -> None:
+        records = self._records
+        records.append((kind, amount_mc, counterparty, balance_mc))
+        self._total += 1
+        retention = policy.retention
+        if len(records) > retention + (retention >> 3):
+            self._evict(len(records) - retention, policy)
+
+    def append(self, text: str) -> None:
+        self.add(TEXT, 0, text)
+
+    def pop(self) -> None:
+        # Undo the newest add (transaction rollback).
+        if self._records:
+            self._records.pop()
+        self._total -= 1
+
+    def _evict(self, count: int, policy: HistoryPolicy) -> None:
+        first = self._total - len(self._records)
+        evicted = [self._records.popleft() for _ in range(count)]
+        if policy.spill is not None:
+            policy.write("".join(f"{self.owner}\t{self.channel}\t{first + i}\t{self.format(record)}\n"
+                                 for i, record in enumerate(evicted)))
+
+    def format(self, record: tuple) -> str:
+        kind, amount_mc, counterparty, balance_mc = record
+        return self.templates[kind].format(amount=amount_mc / MILLICENTS_PER_DOLLAR, counterparty=counterparty,
+                                           balance=balance_mc / MILLICENTS_PER_DOLLAR)
+
+    @property
+    def total(self) -> int:
+        return self._total
+
+    def page(self, cursor: Optional[int] = None, limit: int = HISTORY_PAGE_SIZE) -> Tuple[List[str], Optional[int]]:
+        first = self._total - len(self._records)
+        end = self._total if cursor is None else max(first, min(cursor, self._total))
+        start = max(first, end - limit)
+        records = self._records
+        entries = [self.format(records[i - first]) for i in range(start, end)]
+        return entries, (start if start > first else None)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[str]:
+        return map(self.format, list(self._records))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.format(record) for record in list(self._records)[index]]
+        return self.format(self._records[index])
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, History):
+            return self._records == other._records
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return f"History({list(self)!r})"
+
+    # Plain data for files (walletTenants): the records and the count of records ever
+    # added, so a loaded history keeps its cursors. The templates come from the channel.
+    def dump(self) -> dict:
+        return {"total": self._total, "records": list(self._records)}
+
+    @classmethod
+    def load(cls, owner: str, channel: str, data: dict) -> "History":
+        history = cls(owner, channel, _TEMPLATES[channel])
+        history._records.extend(map(tuple, data["records"]))
+        history._total = data["total"]
+        return history
+
+# ------------------- Data Structures -------------------
+# A slotted record, like the status types: no per-account __dict__. The balance
+# and everything after it are keyword-only, so a caller still passing a dollar
+# balance positionally fails instead of storing dollars as millicents. A list of
+# strings passed as a history is converted to a History; a history not passed is
+# created on first use (__getattr__ runs only while its slot is unset), since most
+# accounts loaded in bulk, e.g. by journal recovery, never touch theirs.
+_HISTORY_LOCK = threading.Lock()
+
+class User(_Record):
+    __slots__ = ("name", "email", "pin", "balance_mc", "logged_in", "login_attempts", "locked",
+                 "transactions", "interest_rate", "notifications", "locked_at", "accrued_at", "accrual_carry")
+
+    def __init__(self, name: str, email: str, pin: str, *, balance_mc: int, logged_in: bool = False,
+                 login_attempts: int = 0, locked: bool = False, transactions: Optional[History] = None,
+                 interest_rate: float = DEFAULT_INTEREST_RATE, notifications: Optional[History] = None,
+                 locked_at: float = 0.0, accrued_at: int = 0, accrual_carry: int = 0):
+        self.name = name
+        self.email = email
+        self.pin = pin
+        self.balance_mc = balance_mc
+        self.logged_in = logged_in
+        self.login_attempts = login_attempts
+        self.locked = locked
+        if transactions is not None:
+            self.transactions = _as_history(transactions, email, "transactions", TRANSACTION_TEMPLATES)
+        self.interest_rate = interest_rate
+        if notifications is not None:
+            self.notifications = _as_history(notifications, email, "notifications", NOTIFICATION_TEMPLATES)
+        self.locked_at = locked_at
+        self.accrued_at = accrued_at
+        self.accrual_carry = accrual_carry
+
+    def __getattr__(self, name: str) -> History:
+        templates = _TEMPLATES.get(name)
+        if templates is None:
+            raise AttributeError(f"'User' object has no attribute '{name}'")
+        slot = getattr(User, name)
+        with _HISTORY_LOCK:
+            try:
+                return slot.__get__(self, User)
+            except AttributeError:
+                history = History(self.email, name, templates)
+                slot.__set__(self, history)
+                return history
+
+    @property
+    def balance(self) -> float:
+        return self.balance_mc / MILLICENTS_PER_DOLLAR
+
+    @balance.setter
+    def balance(self, value: float) -> None:
+        self.balance_mc = to_millicents(value)
+
+def _as_history(entries, owner: str, channel: str, templates: Tuple[str, ...]) -> History:
+    if isinstance(entries, History):
+        return entries
+    history = History(owner, channel, templates)
+    for text in entries or ():
+        history.append(text)
+    return history
@@ -0,0 +1,92 @@
+"""
+Background Accrual Compaction
+
+AccrualCompactor(interval: float = 1.0, batch: int = 1000, idle: float = 5.0)
+
+Requires:
+    - interest accrual is enabled (digitalWalletSystem.configure_accrual)
+    - interval > 0, batch >= 1, idle >= 0
+
+Ensures:
+    - once started, a background thread wakes every interval seconds and, when no
+      mutation other than an accrual has happened for idle seconds, settles the
+      pending interest of every account, batch accounts at a time
+    - a pass stops between batches as soon as activity resumes, and continues
+      where it stopped at the next quiet period, so foreground operations never
+      wait behind more than one batch
+    - once a pass completes, no other starts until a new mutation is recorded, so
+      an idle wallet is not re-scanned every interval
+    - settlement goes through settle_accruals(), so balances, the ledger, the
+      journal and the event stream see ordinary "accrue" mutations
+    - close() stops the thread and removes the hook
+"""
+
+import threading
+import time
+from typing import List, Optional
+
+import digitalWalletSystem as wallet
+
+class AccrualCompactor:
+    def __init__(self, interval: float = 1.0, batch: int = 1000, idle: float = 5.0):
+        self.interval = interval
+        self.batch = batch
+        self.idle = idle
+        self.settled = 0
+        self._last_activity = [time.monotonic()]
+        self._compacted_at: Optional[float] = None  # _last_activity of the last full pass
+        self._pending: List[str] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.record = self._recorder()
+
+    def _recorder(self):
+        # Runs inside every mutator: one comparison and one store.
+        last_activity = self._last_activity
+        clock = time.monotonic
+
+        def record(op: str, *args) -> None:
+            if op != "accrue":
+                last_activity[0] = clock()
+        return record
+
+    def quiet(self) -> bool:
+        return time.monotonic() - self._last_activity[0] >= self.idle
+
+    def compact(self) -> int:
+        """Settle accounts in batches while the wallet stays quiet; return how many."""
+        settled = 0
+        activity = self._last_activity[0]
+        while self.quiet() and not self._stop.is_set():
+            if not self._pending:
+                if self._compacted_at == self._last_activity[0]:
+                    break
+                # list() holds the GIL for the whole copy, so registrations cannot
+                # change users_db underneath it.
+                self._pending = list(wallet.users_db)
+                if not self._pending:
+                    break
+            chunk = self._pending[-self.batch:]
+            del self._pending[-self.batch:]
+            settled += wallet.settle_accruals(chunk)
+            if not self._pending:
+                self._compacted_at = activity
+                break
+        self.settled += settled
+        return settled
+
+    def start(self) -> None:
+        wallet.add_mutation_hook(self.record)
+        self._thread = threading.Thread(target=self._run, name="wallet-accrual", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.compact()
+
+    def close(self) -> None:
+        wallet.remove_mutation_hook(self.record)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,171 @@
+"""
+Asyncio Front-End
+
+AsyncWallet(max_pending: int = 10000, max_batch: int = 1024, target: Optional[Wallet] = None)
+
+Requires:
+    - the wallet is started inside a running event loop, with start() or
+      "async with AsyncWallet() as wallet:"
+    - max_pending >= 1 and max_batch >= 1
+    - target is the Wallet the operations run on, the default wallet if None
+
+Ensures:
+    - every account, ledger and escrow operation of digitalWalletSystem
+      (register_user ... withdraw, view_history, end_session, ledger_summary,
+      settle_accruals, escrow_debit ... escrow_end, pending_escrows) has an awaitable
+      counterpart with the same arguments and the same result; configuration,
+      hooks and transaction() stay synchronous
+    - requests are queued and executed by a single dispatcher task; each event-loop
+      tick the dispatcher drains up to max_batch queued requests and runs them
+      back to back, then yields to the loop
+    - requests run in submission order, so a client awaiting its calls one by one
+      sees the same outcomes as the synchronous API
+    - at most max_pending requests are queued; further callers wait in submit()
+      until the dispatcher catches up (backpressure)
+    - close() finishes every request already queued, then stops the dispatcher
+    - submit() raises RuntimeError before start() and once close() has begun; a
+      request that was still waiting for room in the queue when the dispatcher
+      stopped fails with RuntimeError instead of waiting forever
+"""
+
+import asyncio
+from typing import Any, Callable, Optional
+
+import digitalWalletSystem as wallet
+
+
+class AsyncWallet:
+    def __init__(self, max_pending: int = 10000, max_batch: int = 1024, target: Optional[wallet.Wallet] = None):
+        self.wallet = wallet.default_wallet() if target is None else target
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.batches = 0
+        self.requests = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._closing = False
+
+    # ---- lifecycle ----
+    def start(self) -> None:
+        if self._dispatcher is not None:
+            raise RuntimeError("AsyncWallet is already running.")
+        self._queue = asyncio.Queue(self.max_pending)
+        self._closing = False
+        self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def close(self) -> None:
+        if self._dispatcher is not None and not self._closing:
+            self._closing = True
+            await self._queue.put(None)
+            await self._dispatcher
+            self._dispatcher = None
+            self._fail_queued()
+
+    def _fail_queued(self) -> None:
+        # Requests that reached the queue after the dispatcher stopped.
+        while not self._queue.empty():
+            request = self._queue.get_nowait()
+            if request is not None and not request[2].done():
+                request[2].set_exception(RuntimeError("AsyncWallet is closed."))
+
+    async def __aenter__(self) -> "AsyncWallet":
+        self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # ---- dispatch ----
+    async def submit(self, operation: Callable[..., Any], *args) -> Any:
+        if self._dispatcher is None:
+            raise RuntimeError("AsyncWallet is not running; call start() first.")
+        if self._closing:
+            raise RuntimeError("AsyncWallet is closed.")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, args, future))
+        if self._dispatcher is None:
+            self._fail_queued()  # closed while this call waited for room in the queue
+        return await future
+
+    async def _dispatch(self) -> None:
+        queue = self._queue
+        stopping = False
+        while not (stopping and queue.empty()):
+            batch = [await queue.get()]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            for request in batch:
+                if request is None:
+                    stopping = True
+                    continue
+                operation, args, future = request
+                self.requests += 1
+                if future.cancelled():
+                    continue
+                try:
+                    future.set_result(operation(*args))
+                except Exception as error:
+                    future.set_exception(error)
+            self.batches += 1
+            await asyncio.sleep(0)
+
+    # ---- operations ----
+    async def register_user(self, name: str, email: str, pin: str, initial_balance: float) -> wallet.AccountStatus:
+        return await self.submit(self.wallet.register_user, name, email, pin, initial_balance)
+
+    async def authenticate_user(self, email: str, entered_pin: str, source: Optional[str] = None) -> wallet.LoginStatus:
+        return await self.submit(self.wallet.authenticate_user, email, entered_pin, source)
+
+    async def view_balance(self, email: Optional[str], token: Optional[str] = None) -> wallet.BalanceInfo:
+        return await self.submit(self.wallet.view_balance, email, token)
+
+    async def deposit(self, email: Optional[str], amount: float, token: Optional[str] = None) -> wallet.DepositStatus:
+        return await self.submit(self.wallet.deposit, email, amount, token)
+
+    async def apply_interest(self, email: str, interest_rate: float) -> wallet.InterestStatus:
+        return await self.submit(self.wallet.apply_interest, email, interest_rate)
+
+    async def apply_interest_all(self, interest_rate: Optional[float] = None) -> wallet.InterestSummary:
+        return await self.submit(self.wallet.apply_interest_all, interest_rate)
+
+    async def transfer(self, sender_email: Optional[str], receiver_email: str, amount: float,
+                       token: Optional[str] = None) -> wallet.TransferStatus:
+        return await self.submit(self.wallet.transfer, sender_email, receiver_email, amount, token)
+
+    async def transfer_batch(self, transfers) -> list:
+        return await self.submit(self.wallet.transfer_batch, list(transfers))
+
+    async def withdraw(self, email: Optional[str], amount: float, token: Optional[str] = None) -> wallet.WithdrawalStatus:
+        return await self.submit(self.wallet.withdraw, email, amount, token)
+
+    async def view_history(self, email: Optional[str], cursor: Optional[int] = None,
+                           limit: int = wallet.HISTORY_PAGE_SIZE, token: Optional[str] = None) -> wallet.HistoryPage:
+        return await self.submit(self.wallet.view_history, email, cursor, limit, token)
+
+    async def end_session(self, token: str) -> bool:
+        return await self.submit(self.wallet.end_session, token)
+
+    async def ledger_summary(self, period: Optional[int] = None, verify: Optional[bool] = None) -> wallet.LedgerSummary:
+        return await self.submit(self.wallet.ledger_summary, period, verify)
+
+    async def settle_accruals(self, emails) -> int:
+        return await self.submit(self.wallet.settle_accruals, list(emails))
+
+    async def escrow_debit(self, txid: str, email: Optional[str], counterparty: str, amount_mc: int,
+                           token: Optional[str] = None) -> wallet.TransferStatus:
+        return await self.submit(self.wallet.escrow_debit, txid, email, counterparty, amount_mc, token)
+
+    async def escrow_credit(self, txid: str, email: str, counterparty: str, amount_mc: int) -> wallet.TransferStatus:
+        return await self.submit(self.wallet.escrow_credit, txid, email, counterparty, amount_mc)
+
+    async def escrow_settle(self, txid: str) -> bool:
+        return await self.submit(self.wallet.escrow_settle, txid)
+
+    async def escrow_release(self, txid: str) -> bool:
+        return await self.submit(self.wallet.escrow_release, txid)
+
+    async def escrow_end(self, txid: str) -> bool:
+        return await self.submit(self.wallet.escrow_end, txid)
+
+    async def pending_escrows(self) -> dict:
+        return await self.submit(self.wallet.pending_escrows)
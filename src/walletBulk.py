@@ -0,0 +1,151 @@
+"""
+Bulk Account Import / Export
+
+import_accounts(path: str, errors_path: Optional[str] = None, chunk_size: int = 10000) -> ImportSummary
+export_accounts(path: str, chunk_size: int = 10000) -> int
+
+Requires:
+    - the import file is CSV with a header row and the columns
+      name,email,pin,balance[,interest_rate]; balance is in dollars
+    - chunk_size >= 1
+
+Ensures:
+    - import_accounts streams the file chunk_size rows at a time, so memory used by
+      the import itself does not grow with the file
+    - each chunk is validated as a batch, column by column, with the rules of
+      register_user (a balance must be a finite, non-negative amount within
+      MAX_MILLICENTS), and emails already in users_db or earlier in the file are
+      rejected as duplicates
+    - valid rows are inserted as new accounts exactly as register_user would insert
+      them: the ledger is updated and a "register" mutation is reported per account
+    - every rejected row is written to errors_path (CSV: line,email,reason) when
+      given; no other row is affected by a rejected one
+    - export_accounts streams users_db to a CSV file in the import format, with
+      exact balances, and returns the number of accounts written; registrations
+      wait until it finishes
+"""
+
+import csv
+from dataclasses import dataclass
+from itertools import count, islice, zip_longest
+from typing import List, Optional, Tuple
+
+import digitalWalletSystem as wallet
+
+HEADER = ("name", "email", "pin", "balance", "interest_rate")
+
+@dataclass
+class ImportSummary:
+    success: bool
+    imported: int
+    rejected: int
+    message: str
+
+# ------------------- Import -------------------
+INVALID = "Invalid registration input."
+MISSING = "Missing columns."
+
+def _balance_mc(text: str) -> int:
+    # Millicents of a balance cell, or -1 for one register_user would reject:
+    # not a number, negative, NaN, infinite or beyond MAX_MILLICENTS.
+    try:
+        amount = float(text)
+        return wallet.to_millicents(amount) if amount >= 0 else -1
+    except ValueError:
+        return -1
+
+def _rate(text: str) -> float:
+    # The rate of an interest_rate cell (the default if empty), or 0.0 if invalid.
+    if not text:
+        return wallet.DEFAULT_INTEREST_RATE
+    try:
+        rate = float(text)
+    except ValueError:
+        return 0.0
+    return rate if 0 < rate <= 1 else 0.0
+
+def _validate(rows: List[List[str]]) -> Tuple[list, List[Optional[str]]]:
+    """Return the chunk's columns (name, email, pin, balance_mc, rate) and an error or None per row."""
+    # zip_longest transposes the chunk and pads short rows with "", so every check
+    # below is a map over one column rather than a Python loop over the rows.
+    columns = list(islice(zip_longest(*rows, fillvalue=""), len(HEADER)))
+    columns += [("",) * len(rows)] * (len(HEADER) - len(columns))
+    names, emails, pins, balances, rates = columns
+    balances_mc = list(map(_balance_mc, balances))
+    rates = list(map(_rate, rates))
+    valid = map(all, zip(names, map(wallet.valid_email, emails), map(wallet.valid_pin, pins),
+                         map((-1).__lt__, balances_mc), rates))
+    complete = map((4).__le__, map(len, rows))  # name, email, pin and balance present
+    errors = [None if ok else INVALID if full else MISSING for ok, full in zip(valid, complete)]
+    return [names, emails, pins, balances_mc, rates], errors
+
+def _insert_chunk(rows: List[List[str]], first_line: int, errors) -> int:
+    # Validation happens outside the locks; the duplicate check and the insert run
+    # with every account held, once per chunk rather than once per row.
+    columns, row_errors = _validate(rows)
+    db = wallet.users_db
+    insert = wallet._insert_account
+    imported = 0
+    with wallet.hold_all_accounts():
+        for line, name, email, pin, balance_mc, rate, error in zip(count(first_line), *columns, row_errors):
+            if error is None and email in db:
+                error = "User already exists."
+            if error is not None:
+                if errors is not None:
+                    errors.writerow((line, email, error))
+                continue
+            insert(name, email, pin, balance_mc, rate)
+            imported += 1
+    return imported
+
+def import_accounts(path: str, errors_path: Optional[str] = None, chunk_size: int = 10000) -> ImportSummary:
+    imported = rejected = 0
+    error_file = open(errors_path, "w", newline="", encoding="utf-8") if errors_path else None
+    try:
+        errors = None
+        if error_file is not None:
+            errors = csv.writer(error_file)
+            errors.writerow(("line", "email", "reason"))
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            if next(reader, None) is None:
+                return ImportSummary(False, 0, 0, "Import file is empty.")
+            line = 2
+            while True:
+                rows = list(islice(reader, chunk_size))
+                if not rows:
+                    break
+                count = _insert_chunk(rows, line, errors)
+                imported += count
+                rejected += len(rows) - count
+                line += len(rows)
+    finally:
+        if error_file is not None:
+            error_file.close()
+    return ImportSummary(True, imported, rejected,
+                         f"Imported {imported} accounts, rejected {rejected} rows.")
+
+# ------------------- Export -------------------
+def _format_mc(balance_mc: int) -> str:
+    dollars, millicents = divmod(abs(balance_mc), wallet.MILLICENTS_PER_DOLLAR)
+    sign = "-" if balance_mc < 0 else ""
+    return f"{sign}{dollars}.{millicents:05d}"
+
+def export_accounts(path: str, chunk_size: int = 10000) -> int:
+    written = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        # The registry lock keeps the set of accounts fixed while it is iterated;
+        # balances are read without the account locks, so concurrent deposits may
+        # land on either side of the export.
+        with wallet._registry_lock:
+            accounts = iter(wallet.users_db.values())
+            while True:
+                chunk = [(u.name, u.email, u.pin, _format_mc(u.balance_mc), repr(u.interest_rate))
+                         for u in islice(accounts, chunk_size)]
+                if not chunk:
+                    break
+                writer.writerows(chunk)
+                written += len(chunk)
+    return written
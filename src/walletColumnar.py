@@ -0,0 +1,324 @@
+"""
+Columnar Account Store
+
+ColumnarStore() -> MutableMapping[str, AccountView]
+use_store(store) -> None   (digitalWalletSystem)
+
+Requires:
+    - the store is installed with digitalWalletSystem.use_store() before any
+      account is registered, or it is filled from an existing users_db
+    - values assigned to store[email] are User instances (or views)
+
+Ensures:
+    - each account occupies one slot: an email -> slot index plus parallel typed
+      arrays for balance (int64 millicents), login_attempts, locked, locked_at,
+      logged_in, interest_rate and the interest accrual clock and carry
+    - name, email and pin are kept in parallel lists; transaction and
+      notification histories exist only for accounts that have entries, and
+      reading an account's empty history does not create one
+    - store[email] returns an AccountView exposing the same attributes as User,
+      so register_user ... withdraw work unchanged on either backend
+    - deleted slots are recycled; a view of a deleted account raises KeyError on
+      use, even once its slot holds another account
+    - accrue_interest() updates the balance column in place (vectorized with
+      NumPy when it is installed)
+"""
+
+from array import array
+from typing import Dict, Iterator, List, MutableMapping, Optional, Tuple
+
+import digitalWalletSystem as wallet
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# ------------------- Histories -------------------
+class _PendingHistory(wallet.History):
+    __slots__ = ("_table", "_slot")
+
+    def __init__(self, owner: str, channel: str, templates: Tuple[str, ...], table: Dict[int, wallet.History],
+                 slot: int):
+        super().__init__(owner, channel, templates)
+        self._table = table
+        self._slot = slot
+
+    def add(self, *args, **kwargs) -> None:
+        history = self._table.get(self._slot)
+        if history is None:
+            history = self._table[self._slot] = wallet.History(self.owner, self.channel, self.templates)
+        history.add(*args, **kwargs)
+
+    def pop(self) -> None:
+        self._table[self._slot].pop()
+
+# ------------------- Account View -------------------
+# A view names its slot together with the generation the slot had when the view
+# was made. Deleting an account moves its slot to a new generation, so a view kept
+# past the deletion (e.g. by a session) raises KeyError instead of reading or
+# writing whichever account reuses the slot.
+class AccountView:
+    __slots__ = ("_store", "_slot", "_generation")
+
+    def __init__(self, store: "ColumnarStore", slot: int):
+        self._store = store
+        self._slot = slot
+        self._generation = store.generations[slot]
+
+    def _live(self) -> int:
+        slot = self._slot
+        generations = self._store.generations
+        if slot >= len(generations) or generations[slot] != self._generation:
+            raise KeyError(f"Account view of slot {slot} outlived its account.")
+        return slot
+
+    @property
+    def name(self) -> str:
+        return self._store.names[self._live()]
+
+    @property
+    def email(self) -> str:
+        return self._store.emails[self._live()]
+
+    @property
+    def pin(self) -> str:
+        return self._store.pins[self._live()]
+
+    @property
+    def balance_mc(self) -> int:
+        return self._store.balance_mc[self._live()]
+
+    @balance_mc.setter
+    def balance_mc(self, value: int) -> None:
+        self._store.balance_mc[self._live()] = value
+
+    @property
+    def balance(self) -> float:
+        return wallet.to_dollars(self._store.balance_mc[self._live()])
+
+    @balance.setter
+    def balance(self, value: float) -> None:
+        self._store.balance_mc[self._live()] = wallet.to_millicents(value)
+
+    @property
+    def logged_in(self) -> bool:
+        return bool(self._store.logged_in[self._live()])
+
+    @logged_in.setter
+    def logged_in(self, value: bool) -> None:
+        self._store.logged_in[self._live()] = bool(value)
+
+    @property
+    def login_attempts(self) -> int:
+        return self._store.login_attempts[self._live()]
+
+    @login_attempts.setter
+    def login_attempts(self, value: int) -> None:
+        self._store.login_attempts[self._live()] = value
+
+    @property
+    def locked(self) -> bool:
+        return bool(self._store.locked[self._live()])
+
+    @locked.setter
+    def locked(self, value: bool) -> None:
+        self._store.locked[self._live()] = bool(value)
+
+    @property
+    def locked_at(self) -> float:
+        return self._store.locked_at[self._live()]
+
+    @locked_at.setter
+    def locked_at(self, value: float) -> None:
+        self._store.locked_at[self._live()] = value
+
+    @property
+    def accrued_at(self) -> int:
+        return self._store.accrued_at[self._live()]
+
+    @accrued_at.setter
+    def accrued_at(self, value: int) -> None:
+        self._store.accrued_at[self._live()] = value
+
+    @property
+    def accrual_carry(self) -> int:
+        return self._store.accrual_carry[self._live()]
+
+    @accrual_carry.setter
+    def accrual_carry(self, value: int) -> None:
+        self._store.accrual_carry[self._live()] = value
+
+    @property
+    def interest_rate(self) -> float:
+        return self._store.interest_rate[self._live()]
+
+    @interest_rate.setter
+    def interest_rate(self, value: float) -> None:
+        self._store.interest_rate[self._live()] = value
+
+    @property
+    def transactions(self) -> wallet.History:
+        return self._history(self._store.transactions, "transactions", wallet.TRANSACTION_TEMPLATES)
+
+    @property
+    def notifications(self) -> wallet.History:
+        return self._history(self._store.notifications, "notifications", wallet.NOTIFICATION_TEMPLATES)
+
+    def _history(self, table: Dict[int, wallet.History], channel: str, templates: Tuple[str, ...]) -> wallet.History:
+        slot = self._live()
+        history = table.get(slot)
+        if history is None:
+            # Most accounts never get an entry, so reading an empty history stores
+            # nothing; the first add() creates the real one.
+            history = _PendingHistory(self._store.emails[slot], channel, templates, table, slot)
+        return history
+
+    def __eq__(self, other) -> bool:
+        fields = ("name", "email", "pin", "balance_mc", "logged_in", "login_attempts",
+                  "locked", "transactions", "interest_rate", "notifications", "locked_at",
+                  "accrued_at", "accrual_carry")
+        try:
+            return all(getattr(self, f) == getattr(other, f) for f in fields)
+        except AttributeError:
+            return NotImplemented
+
+    def __repr__(self) -> str:
+        return (f"AccountView(name={self.name!r}, email={self.email!r}, balance={self.balance!r}, "
+                f"logged_in={self.logged_in!r}, locked={self.locked!r})")
+
+# ------------------- Store -------------------
+class ColumnarStore(MutableMapping):
+    def __init__(self, first_generation: int = 0):
+        # generations[slot] changes whenever the slot's account is deleted; values come
+        # from one counter that survives clear(), so no generation is ever reused.
+        self._generation = first_generation
+        self.generations = array("Q")
+        self._index: Dict[str, int] = {}
+        self._free: List[int] = []
+        self.names: List[Optional[str]] = []
+        self.emails: List[Optional[str]] = []
+        self.pins: List[Optional[str]] = []
+        self.balance_mc = array("q")
+        self.login_attempts = array("I")
+        self.locked = bytearray()
+        self.logged_in = bytearray()
+        self.interest_rate = array("d")
+        self.locked_at = array("d")
+        self.accrued_at = array("q")
+        self.accrual_carry = array("q")
+        self.transactions: Dict[int, wallet.History] = {}
+        self.notifications: Dict[int, wallet.History] = {}
+
+    def slot_of(self, email: str) -> int:
+        return self._index[email]
+
+    def _next_generation(self) -> int:
+        self._generation += 1
+        return self._generation
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        self.generations.append(self._next_generation())
+        self.names.append(None)
+        self.emails.append(None)
+        self.pins.append(None)
+        self.balance_mc.append(0)
+        self.login_attempts.append(0)
+        self.locked.append(0)
+        self.logged_in.append(0)
+        self.interest_rate.append(0.0)
+        self.locked_at.append(0.0)
+        self.accrued_at.append(0)
+        self.accrual_carry.append(0)
+        return len(self.emails) - 1
+
+    def __getitem__(self, email: str) -> AccountView:
+        return AccountView(self, self._index[email])
+
+    def get(self, email: str, default=None):
+        slot = self._index.get(email)
+        return default if slot is None else AccountView(self, slot)
+
+    def __setitem__(self, email: str, user) -> None:
+        slot = self._index.get(email)
+        if slot is None:
+            slot = self._allocate()
+            self._index[email] = slot
+        self.names[slot] = user.name
+        self.emails[slot] = email
+        self.pins[slot] = user.pin
+        self.balance_mc[slot] = user.balance_mc
+        self.login_attempts[slot] = user.login_attempts
+        self.locked[slot] = bool(user.locked)
+        self.logged_in[slot] = bool(user.logged_in)
+        self.interest_rate[slot] = user.interest_rate
+        self.locked_at[slot] = user.locked_at
+        self.accrued_at[slot] = user.accrued_at
+        self.accrual_carry[slot] = user.accrual_carry
+        self.transactions.pop(slot, None)
+        self.notifications.pop(slot, None)
+        if user.transactions:
+            self.transactions[slot] = user.transactions
+        if user.notifications:
+            self.notifications[slot] = user.notifications
+
+    def __delitem__(self, email: str) -> None:
+        slot = self._index.pop(email)
+        self.names[slot] = self.emails[slot] = self.pins[slot] = None
+        self.balance_mc[slot] = 0
+        self.login_attempts[slot] = 0
+        self.locked[slot] = self.logged_in[slot] = 0
+        self.interest_rate[slot] = 0.0
+        self.locked_at[slot] = 0.0
+        self.accrued_at[slot] = self.accrual_carry[slot] = 0
+        self.transactions.pop(slot, None)
+        self.notifications.pop(slot, None)
+        self.generations[slot] = self._next_generation()
+        self._free.append(slot)
+
+    def __contains__(self, email) -> bool:
+        return email in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def clear(self) -> None:
+        self.__init__(self._generation)
+
+    def __repr__(self) -> str:
+        return f"ColumnarStore({len(self)} accounts)"
+
+    # ---- bulk operations ----
+    def accrue_interest(self, interest_rate: Optional[float] = None) -> List[Tuple[str, int]]:
+        """Credit interest to every eligible slot; returns the (email, interest_mc) pairs credited."""
+        if np is not None and len(self.balance_mc):
+            balances = np.frombuffer(self.balance_mc, dtype=np.int64)
+            if interest_rate is None:
+                rates = np.frombuffer(self.interest_rate, dtype=np.float64)
+            else:
+                rates = np.full(len(balances), interest_rate)
+            eligible = (balances > 0) & (rates > 0) & (rates <= 1)
+            interest = np.where(eligible, wallet.interest_millicents_array(balances, rates), 0)
+            balances += interest
+            slots = np.flatnonzero(interest).tolist()
+            amounts = interest[slots].tolist()
+            emails = self.emails
+            return [(emails[slot], amount) for slot, amount in zip(slots, amounts)]
+
+        credited = []
+        balances = self.balance_mc
+        rates = self.interest_rate
+        for slot, email in enumerate(self.emails):
+            rate = rates[slot] if interest_rate is None else interest_rate
+            b = balances[slot]
+            if b > 0 and 0 < rate <= 1:
+                interest_mc = wallet.interest_millicents(b, rate)
+                if interest_mc:
+                    balances[slot] = b + interest_mc
+                    credited.append((email, interest_mc))
+        return credited
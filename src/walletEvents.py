@@ -0,0 +1,232 @@
+"""
+Wallet Event Stream (change-data capture)
+
+open_stream(capacity: int = 65536) -> EventStream
+EventStream.subscribe(from_start: bool = True) -> Subscription
+FileSink(subscription, path: str, interval: float = 0.1)
+
+Requires:
+    - capacity is a power of two
+    - only one EventStream is attached to users_db at a time
+
+Ensures:
+    - every successful mutation (register, login, logout, failed login, deposit,
+      withdraw, interest, accrue, transfer, lock, unlock and the escrow steps of
+      two-phase transfers)
+      is appended to an in-process ring buffer as one record with a unique,
+      increasing offset
+    - records are stored raw and turned into typed Event tuples only when read;
+      the pin of a registration is never part of an event
+    - a Subscription reads the stream in batches with poll(); its position moves
+      on every poll, and commit() marks everything polled so far as done; rewind()
+      returns to the last commit, so events are delivered at least once
+    - the ring keeps the newest capacity records; a subscriber that falls further
+      behind skips to the oldest record still held, and the number of records it
+      missed is added to Subscription.missed
+    - FileSink appends every event as a JSON line (with its offset, so readers can
+      drop duplicates) and commits only after the batch is flushed and fsynced
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from typing import List, NamedTuple, Optional
+
+import digitalWalletSystem as wallet
+
+CLOCK_RESOLUTION = 0.001
+
+# ------------------- Events -------------------
+class Event(NamedTuple):
+    offset: int
+    time: float
+    kind: str
+    email: str
+    counterparty: str = ""
+    amount_mc: int = 0
+    txid: str = ""
+
+    @property
+    def amount(self) -> float:
+        return wallet.to_dollars(self.amount_mc)
+
+def _to_event(record: tuple) -> Event:
+    offset, stamp, op, args = record
+    if op == "register":
+        return Event(offset, stamp, op, args[0], "", args[3])
+    if op == "transfer":
+        return Event(offset, stamp, op, args[0], args[1], args[2])
+    if op in ("escrow_debit", "escrow_credit"):
+        return Event(offset, stamp, op, args[1], args[2], args[3], args[0])
+    if op in ("escrow_settle", "escrow_release", "escrow_end"):
+        return Event(offset, stamp, op, "", "", 0, args[0])
+    if len(args) > 1:
+        return Event(offset, stamp, op, args[0], "", args[1])
+    return Event(offset, stamp, op, args[0])
+
+def _arity(args: tuple) -> int:
+    # Hooks never pass None, so the unused argument columns are the trailing Nones.
+    count = len(args)
+    while count and args[count - 1] is None:
+        count -= 1
+    return count
+
+# ------------------- Stream -------------------
+class EventStream:
+    def __init__(self, capacity: int = 65536):
+        if capacity & (capacity - 1):
+            raise ValueError("capacity must be a power of two")
+        self.capacity = capacity
+        self._mask = capacity - 1
+        # The ring as preallocated columns, one per field and per hook argument, so
+        # recording an event allocates nothing. Only the first four arguments are
+        # kept: no Event field comes from a later one (the interest rate of a
+        # registration). _offsets[slot] is -1 while the slot is being written.
+        self._offsets: List[int] = [-1] * capacity
+        self._ops: List[Optional[str]] = [None] * capacity
+        self._args = tuple([None] * capacity for _ in range(4))
+        self._times: List[float] = [0.0] * capacity
+        # A coarse clock: a thread refreshes _now every CLOCK_RESOLUTION seconds, so
+        # the hook reads a list item instead of calling time.time().
+        self._now = [time.time()]
+        self._stop = threading.Event()
+        self._clock = threading.Thread(target=self._tick, name="wallet-event-clock", daemon=True)
+        self._clock.start()
+        self.record = self._recorder()
+
+    def _tick(self) -> None:
+        now = self._now
+        while not self._stop.wait(CLOCK_RESOLUTION):
+            now[0] = time.time()
+
+    def _recorder(self):
+        # The mutation hook, built as a closure over locals because it runs inside
+        # every mutator. Lock-free: next() on a count is atomic, and a slot's offset
+        # is cleared before its columns are written and set after, so a reader can
+        # tell a slot not yet (or being) written from a current one.
+        offsets = self._offsets
+        ops = self._ops
+        col_a, col_b, col_c, col_d = self._args
+        times = self._times
+        now = self._now
+        mask = self._mask
+        next_offset = itertools.count().__next__
+
+        def record(op: str, a=None, b=None, c=None, d=None, *unused) -> None:
+            offset = next_offset()
+            slot = offset & mask
+            offsets[slot] = -1
+            ops[slot] = op
+            col_a[slot] = a
+            col_b[slot] = b
+            col_c[slot] = c
+            col_d[slot] = d
+            times[slot] = now[0]
+            offsets[slot] = offset
+        return record
+
+    def read(self, offset: int, limit: int) -> tuple:
+        """Return (records from offset on, up to limit, offset after them, records skipped)."""
+        offsets = self._offsets
+        mask = self._mask
+        records = []
+        skipped = 0
+        while len(records) < limit:
+            slot = offset & mask
+            current = offsets[slot]
+            if current < offset:
+                break
+            if current == offset:
+                args = tuple(column[slot] for column in self._args)
+                record = (offset, self._times[slot], self._ops[slot], args[:_arity(args)])
+                if offsets[slot] == offset:
+                    records.append(record)
+                    offset += 1
+                continue  # overwritten while it was read: lapped
+            # Lapped: everything from offset up to the oldest record still held was
+            # overwritten.
+            oldest = current - self.capacity + 1
+            skipped += oldest - offset
+            offset = oldest
+        return records, offset, skipped
+
+    def subscribe(self, from_start: bool = True) -> "Subscription":
+        start = 0
+        if not from_start:
+            _, start, _ = self.read(0, 1 << 62)
+        return Subscription(self, start)
+
+    def close(self) -> None:
+        wallet.remove_mutation_hook(self.record)
+        self._stop.set()
+        self._clock.join()
+
+class Subscription:
+    def __init__(self, stream: EventStream, offset: int):
+        self.stream = stream
+        self.position = offset
+        self.committed = offset
+        self.missed = 0
+
+    def poll(self, max_events: int = 1024) -> List[Event]:
+        records, self.position, skipped = self.stream.read(self.position, max_events)
+        self.missed += skipped
+        return [_to_event(record) for record in records]
+
+    def commit(self) -> int:
+        self.committed = self.position
+        return self.committed
+
+    def rewind(self) -> None:
+        self.position = self.committed
+
+def open_stream(capacity: int = 65536) -> EventStream:
+    stream = EventStream(capacity)
+    wallet.add_mutation_hook(stream.record)
+    return stream
+
+# ------------------- File Sink -------------------
+class FileSink:
+    def __init__(self, subscription: Subscription, path: str, interval: float = 0.1, batch: int = 4096):
+        self.subscription = subscription
+        self.path = path
+        self.interval = interval
+        self.batch = batch
+        self._file = open(path, "a", encoding="utf-8")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def drain(self) -> int:
+        written = 0
+        subscription = self.subscription
+        while True:
+            events = subscription.poll(self.batch)
+            if not events:
+                return written
+            try:
+                self._file.write("".join(json.dumps(event._asdict()) + "\n" for event in events))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError:
+                subscription.rewind()
+                raise
+            subscription.commit()
+            written += len(events)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="wallet-event-sink", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.drain()
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.drain()
+        self._file.close()
@@ -0,0 +1,231 @@
+"""
+Secondary Account Indexes
+
+open_index() -> AccountIndex
+AccountIndex.balance_range(low: Optional[float] = None, high: Optional[float] = None,
+                           limit: Optional[int] = None) -> List[str]
+AccountIndex.locked() -> List[str]
+AccountIndex.logged_in() -> List[str]
+AccountIndex.by_name(prefix: str, limit: int = 50) -> List[str]
+
+Requires:
+    - the index is opened after users_db is loaded (e.g. after journal recovery);
+      rebuild() resynchronizes it if users_db is replaced later
+    - balances change only through the wallet's operations, which report them to
+      the mutation hooks
+
+Ensures:
+    - open_index() builds the indexes from users_db once, holding every account
+      lock, and from then on keeps them current from the mutation hooks: every
+      mutation updates only the entries of the accounts it touched
+    - balance_range() returns the emails whose balance is within [low, high],
+      in ascending balance order, without scanning users_db
+    - locked() and logged_in() return the accounts currently locked out and the
+      accounts that are logged in
+    - by_name() returns the emails of accounts whose name starts with prefix,
+      ignoring case, in name order
+    - queries cost O(log n) plus the number of results returned
+    - close() detaches the index; the wallet no longer pays for it
+"""
+
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import digitalWalletSystem as wallet
+
+# ------------------- Sorted Keys -------------------
+# A sorted list split into buckets of at most 2 * BUCKET_SIZE keys, with the largest
+# key of each bucket kept alongside for bisecting: an insert or removal moves at
+# most one bucket's worth of references, however many keys are held.
+BUCKET_SIZE = 512
+
+class _SortedKeys:
+    __slots__ = ("_buckets", "_maxes", "_len")
+
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self._buckets = [keys[i:i + BUCKET_SIZE] for i in range(0, len(keys), BUCKET_SIZE)]
+        self._maxes = [bucket[-1] for bucket in self._buckets]
+        self._len = len(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def add(self, key) -> None:
+        buckets, maxes = self._buckets, self._maxes
+        self._len += 1
+        if not buckets:
+            buckets.append([key])
+            maxes.append(key)
+            return
+        i = bisect_left(maxes, key)
+        if i == len(maxes):
+            i -= 1
+            buckets[i].append(key)
+            maxes[i] = key
+        else:
+            insort(buckets[i], key)
+        bucket = buckets[i]
+        if len(bucket) > 2 * BUCKET_SIZE:
+            buckets[i:i + 1] = [bucket[:BUCKET_SIZE], bucket[BUCKET_SIZE:]]
+            maxes[i:i + 1] = [bucket[BUCKET_SIZE - 1], bucket[-1]]
+
+    def remove(self, key) -> None:
+        buckets, maxes = self._buckets, self._maxes
+        i = bisect_left(maxes, key)
+        bucket = buckets[i]
+        del bucket[bisect_left(bucket, key)]
+        self._len -= 1
+        if bucket:
+            maxes[i] = bucket[-1]
+        else:
+            del buckets[i]
+            del maxes[i]
+
+    def move(self, old, new) -> None:
+        """Replace key old by new: in place when new still falls in old's bucket."""
+        maxes = self._maxes
+        i = bisect_left(maxes, old)
+        if (new <= maxes[i] or i == len(maxes) - 1) and (i == 0 or new > maxes[i - 1]):
+            bucket = self._buckets[i]
+            del bucket[bisect_left(bucket, old)]
+            insort(bucket, new)
+            maxes[i] = bucket[-1]
+        else:
+            self.remove(old)
+            self.add(new)
+
+    def irange(self, low) -> Iterator:
+        """Yield the keys >= low in order."""
+        buckets = self._buckets
+        i = bisect_left(self._maxes, low)
+        if i == len(buckets):
+            return
+        bucket = buckets[i]
+        yield from bucket[bisect_left(bucket, low):]
+        for bucket in buckets[i + 1:]:
+            yield from bucket
+
+# ------------------- Index -------------------
+# Balance keys are single ints, balance_mc << ID_BITS plus the account's index id,
+# because comparing ints is several times cheaper than comparing (balance, email)
+# tuples and every balance change costs two bisects of the sorted keys.
+ID_BITS = 32
+_ID_MASK = (1 << ID_BITS) - 1
+
+class AccountIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: Dict[str, int] = {}
+        self._emails: List[str] = []
+        self._by_balance = _SortedKeys()
+        self._by_name = _SortedKeys()
+        self._locked: Set[str] = set()
+        self._logged_in: Set[str] = set()
+        self._escrows: Dict[str, Tuple[str, int]] = {}
+
+    def rebuild(self) -> None:
+        with wallet.hold_all_accounts():
+            self._rebuild()
+
+    def _rebuild(self) -> None:
+        with self._lock:
+            users = list(wallet.users_db.values())
+            self._emails = [user.email for user in users]
+            self._keys = {user.email: (user.balance_mc << ID_BITS) + i for i, user in enumerate(users)}
+            self._by_balance = _SortedKeys(self._keys.values())
+            self._by_name = _SortedKeys((user.name.casefold(), user.email) for user in users)
+            self._locked = {user.email for user in users if user.locked}
+            self._logged_in = {user.email for user in users if user.logged_in}
+            self._escrows = {txid: (email, amount_mc)
+                             for txid, (email, _, amount_mc) in wallet._escrows.items()}
+
+    def open(self) -> "AccountIndex":
+        # Attached while every account is still held, so no mutation falls between
+        # the build and the first hook call.
+        with wallet.hold_all_accounts():
+            self._rebuild()
+            wallet.add_mutation_hook(self)
+        return self
+
+    def close(self) -> None:
+        wallet.remove_mutation_hook(self)
+
+    # ---- maintenance (mutation hook) ----
+    def _move(self, email: str, delta_mc: int) -> None:
+        old = self._keys[email]
+        self._keys[email] = new = old + (delta_mc << ID_BITS)
+        self._by_balance.move(old, new)
+
+    def __call__(self, op: str, *args) -> None:
+        with self._lock:
+            if op == "transfer":
+                sender, receiver, amount_mc = args
+                self._move(sender, -amount_mc)
+                self._move(receiver, amount_mc)
+            elif op == "deposit" or op == "interest" or op == "accrue":
+                if args[1]:
+                    self._move(args[0], args[1])
+            elif op == "withdraw":
+                self._move(args[0], -args[1])
+            elif op == "login":
+                self._logged_in.add(args[0])
+            elif op == "logout":
+                self._logged_in.discard(args[0])
+            elif op == "register":
+                email, name, _, balance_mc, _ = args
+                key = self._keys[email] = (balance_mc << ID_BITS) + len(self._emails)
+                self._emails.append(email)
+                self._by_balance.add(key)
+                self._by_name.add((name.casefold(), email))
+            elif op == "lock":
+                self._locked.add(args[0])
+            elif op == "unlock":
+                self._locked.discard(args[0])
+            elif op == "escrow_debit":
+                txid, email, _, amount_mc = args
+                self._escrows[txid] = (email, amount_mc)
+                self._move(email, -amount_mc)
+            elif op == "escrow_credit":
+                self._move(args[1], args[3])
+            elif op == "escrow_release":
+                email, amount_mc = self._escrows.pop(args[0])
+                self._move(email, amount_mc)
+            elif op == "escrow_settle":
+                self._escrows.pop(args[0], None)
+
+    # ---- queries ----
+    def balance_range(self, low: Optional[float] = None, high: Optional[float] = None,
+                      limit: Optional[int] = None) -> List[str]:
+        low_key = wallet.to_millicents(low) << ID_BITS if low is not None else -1 << 126
+        end_key = wallet.to_millicents(high) + 1 << ID_BITS if high is not None else 1 << 126
+        emails = []
+        with self._lock:
+            accounts = self._emails
+            for key in self._by_balance.irange(low_key):
+                if key >= end_key or len(emails) == limit:
+                    break
+                emails.append(accounts[key & _ID_MASK])
+        return emails
+
+    def locked(self) -> List[str]:
+        with self._lock:
+            return list(self._locked)
+
+    def logged_in(self) -> List[str]:
+        with self._lock:
+            return list(self._logged_in)
+
+    def by_name(self, prefix: str, limit: int = 50) -> List[str]:
+        prefix = prefix.casefold()
+        emails = []
+        with self._lock:
+            for name, email in self._by_name.irange((prefix,)):
+                if not name.startswith(prefix) or len(emails) == limit:
+                    break
+                emails.append(email)
+        return emails
+
+def open_index() -> AccountIndex:
+    return AccountIndex().open()
@@ -0,0 +1,470 @@
+"""
+Write-Ahead Log Storage Engine
+
+open_journal(directory: str, sync_every: int, sync_interval: float, snapshot_every: int,
+             target: Optional[Wallet] = None) -> Journal
+
+Requires:
+    - directory is writable (it is created if missing)
+    - only one Journal is attached to a wallet at a time; target is that wallet, the
+      default wallet if None
+    - sync_every >= 1, sync_interval >= 0, snapshot_every >= 1
+
+Ensures:
+    - the target's users_db is rebuilt from the newest snapshot plus every log
+      segment written after it
+    - a torn or corrupt record at the end of the log is discarded and truncated away
+    - every later successful mutation is appended to the log as one binary record
+    - records are fsynced in groups: after sync_every records, after sync_interval
+      seconds (a background flusher thread), or on commit()/close(), whichever
+      comes first
+    - after snapshot_every records the flusher takes a compacted snapshot, holding
+      every account lock while it copies users_db; the snapshot replaces the older
+      segments
+    - a snapshot is a file of records in the log's own checksummed format, ending
+      in a record that counts them; accounts are stored in column-wise blocks that
+      recovery decodes a block at a time. Recovery refuses (ValueError) a snapshot
+      that is truncated, corrupt or of an unknown version (version 5 snapshots,
+      with one record per account, still load), and never executes its contents
+    - the journal is safe to use from concurrently running mutators
+
+Durability notes:
+    - balances, registrations (with their interest rates), lockouts and two-phase
+      transfer escrows are durable; transaction and notification history, login
+      state and login attempt counters are not persisted
+    - lock times are not persisted: a recovered lockout runs lockout_seconds from
+      the moment of recovery
+    - a crash loses at most the records of the current, not yet synced, group
+"""
+
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from itertools import accumulate
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Tuple
+
+import digitalWalletSystem as wallet
+
+# ------------------- Record Format -------------------
+# header: crc32 of (opcode + payload), payload length, opcode
+_HEADER = struct.Struct("<IIB")
+_STR_LEN = struct.Struct("<H")
+_INT = struct.Struct("<q")
+_FLOAT = struct.Struct("<d")
+
+# op name -> (opcode, field layout); "s" is a length-prefixed utf-8 string,
+# "q" a signed 64-bit integer (amounts in millicents), "d" a 64-bit float and
+# "b" raw bytes up to the end of the payload
+_OPS: Dict[str, Tuple[int, str]] = {
+    "register": (13, "sssqd"),  # email, name, pin, balance_mc, interest_rate
+    "deposit": (2, "sq"),
+    "withdraw": (3, "sq"),
+    "interest": (4, "sq"),
+    "transfer": (5, "ssq"),
+    "lock": (6, "s"),
+    "escrow_debit": (7, "sssq"),
+    "escrow_settle": (8, "s"),
+    "escrow_release": (9, "s"),
+    "escrow_credit": (10, "sssq"),
+    "unlock": (11, "s"),
+    "accrue": (12, "sqqq"),
+    "escrow_end": (14, "s"),
+}
+_OPS_BY_CODE: Dict[int, Tuple[str, str]] = {code: (op, layout) for op, (code, layout) in _OPS.items()}
+# Registrations logged before the interest rate was; they replay with the default rate.
+_OPS_BY_CODE[1] = ("register", "sssq")
+
+# Snapshot records, in the same format: one header, then every account, held escrow
+# and credited txid, then an end record with the number of records before it.
+# Accounts are written in blocks of up to ACCOUNT_BLOCK accounts, laid out as
+# columns (see _encode_accounts) so that recovery decodes a block at a time;
+# single "account" records are what version 5 snapshots hold.
+_SNAPSHOT_OPS: Dict[str, Tuple[int, str]] = {
+    "header": (1, "qq"),          # version, generation
+    "account": (2, "sssqqdqq"),   # name, email, pin, balance_mc, locked, interest_rate, accrued_at, carry
+    "escrow": (3, "sssq"),        # txid, email, counterparty, amount_mc
+    "credited": (4, "s"),         # txid
+    "end": (5, "q"),              # records before this one
+    "accounts": (6, "b"),         # a block of accounts
+}
+_SNAPSHOT_OPS_BY_CODE: Dict[int, Tuple[str, str]] = {code: (op, layout)
+                                                      for op, (code, layout) in _SNAPSHOT_OPS.items()}
+
+SNAPSHOT_VERSION = 6
+SNAPSHOT_NAME = "snapshot.bin"
+ACCOUNT_BLOCK = 65536
+
+def encode_record(op: str, *args, ops: Dict[str, Tuple[int, str]] = _OPS) -> bytes:
+    code, layout = ops[op]
+    payload = bytearray()
+    for kind, value in zip(layout, args):
+        if kind == "s":
+            raw = value.encode("utf-8")
+            payload += _STR_LEN.pack(len(raw))
+            payload += raw
+        elif kind == "d":
+            payload += _FLOAT.pack(value)
+        elif kind == "b":
+            payload += value
+        else:
+            payload += _INT.pack(value)
+    body = bytes((code,)) + bytes(payload)
+    return _HEADER.pack(zlib.crc32(body), len(payload), code) + bytes(payload)
+
+def _decoder(layout: str) -> Callable[[bytes, int, int], list]:
+    # Runs of fixed-width fields are unpacked by one Struct each, so a record costs
+    # one unpack per string and per run rather than one per field.
+    segments: List[Optional[struct.Struct]] = []  # None: a string
+    run = ""
+    for kind in layout:
+        if kind in "sb":
+            if run:
+                segments.append(struct.Struct("<" + run))
+                run = ""
+            if kind == "s":
+                segments.append(None)
+        else:
+            run += kind
+    if run:
+        segments.append(struct.Struct("<" + run))
+    raw_tail = layout.endswith("b")
+
+    def decode(data: bytes, pos: int, end: int) -> list:
+        args = []
+        for segment in segments:
+            if segment is None:
+                (length,) = _STR_LEN.unpack_from(data, pos)
+                pos += 2
+                args.append(data[pos:pos + length].decode("utf-8"))
+                pos += length
+            else:
+                args += segment.unpack_from(data, pos)
+                pos += segment.size
+        if raw_tail:
+            args.append(data[pos:end])
+        return args
+    return decode
+
+_DECODERS: Dict[str, Callable[[bytes, int, int], list]] = {}
+
+def _decoder_for(layout: str) -> Callable[[bytes, int, int], list]:
+    decode = _DECODERS.get(layout)
+    if decode is None:
+        decode = _DECODERS[layout] = _decoder(layout)
+    return decode
+
+def decode_payload(layout: str, payload: bytes) -> list:
+    return _decoder_for(layout)(payload, 0, len(payload))
+
+def read_records(data: bytes, ops_by_code: Dict[int, Tuple[str, str]] = _OPS_BY_CODE
+                 ) -> Tuple[List[Tuple[str, list]], int]:
+    """Decode records from data; returns them with the offset of the first bad byte."""
+    # Per opcode: the op, its decoder and the crc32 of the opcode byte, which the
+    # payload's crc continues, so neither the payload nor opcode + payload is copied.
+    table = {code: (op, _decoder_for(layout), zlib.crc32(bytes((code,))))
+             for code, (op, layout) in ops_by_code.items()}
+    view = memoryview(data)
+    unpack_header = _HEADER.unpack_from
+    crc32 = zlib.crc32
+    header_size = _HEADER.size
+    records = []
+    append = records.append
+    pos = 0
+    end = len(data)
+    while pos + header_size <= end:
+        crc, length, code = unpack_header(data, pos)
+        start = pos + header_size
+        stop = start + length
+        entry = table.get(code)
+        if stop > end or entry is None:
+            break
+        op, decode, code_crc = entry
+        if crc32(view[start:stop], code_crc) != crc:
+            break
+        append((op, decode(data, start, stop)))
+        pos = stop
+    view.release()
+    return records, pos
+
+# ------------------- Account Blocks -------------------
+# A block's payload: the account count; one _ACCOUNT_ROW per account (balance_mc,
+# locked, interest_rate, accrued_at, carry); the lengths, in characters, of each
+# account's name, email and pin as little-endian uint32s; then all those strings
+# concatenated, utf-8 encoded.
+_COUNT = struct.Struct("<I")
+_ACCOUNT_ROW = struct.Struct("<qqdqq")
+
+def _encode_accounts(rows: List[tuple]) -> bytes:
+    strings = [value for row in rows for value in row[:3]]
+    lengths = array("I", map(len, strings))
+    if sys.byteorder == "big":
+        lengths.byteswap()
+    pack = _ACCOUNT_ROW.pack
+    return b"".join((_COUNT.pack(len(rows)), b"".join(pack(*row[3:]) for row in rows),
+                     lengths.tobytes(), "".join(strings).encode("utf-8")))
+
+def _decode_accounts(block: bytes) -> Iterable[tuple]:
+    """Yield (name, email, pin, balance_mc, locked, interest_rate, accrued_at, carry) per account."""
+    (count,) = _COUNT.unpack_from(block)
+    rows_end = _COUNT.size + count * _ACCOUNT_ROW.size
+    lengths_end = rows_end + 12 * count
+    lengths = array("I")
+    lengths.frombytes(block[rows_end:lengths_end])
+    if sys.byteorder == "big":
+        lengths.byteswap()
+    text = block[lengths_end:].decode("utf-8")
+    ends = list(accumulate(lengths))
+    strings = list(map(text.__getitem__, map(slice, [0] + ends[:-1], ends)))
+    rows = _ACCOUNT_ROW.iter_unpack(block[_COUNT.size:rows_end])
+    return ((name, email, pin, *row)
+            for name, email, pin, row in zip(strings[0::3], strings[1::3], strings[2::3], rows))
+
+def _fsync_directory(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+# ------------------- Replay -------------------
+def apply_record(op: str, args: list, target: Optional[wallet.Wallet] = None) -> None:
+    if target is None:
+        target = wallet.default_wallet()
+    db = target.users_db
+    if op == "register":
+        email, name, pin, balance_mc = args[:4]
+        rate = args[4] if len(args) > 4 else wallet.DEFAULT_INTEREST_RATE
+        db[email] = wallet.User(name, email, pin, balance_mc=balance_mc, interest_rate=rate)
+    elif op == "deposit" or op == "interest":
+        db[args[0]].balance_mc += args[1]
+    elif op == "withdraw":
+        db[args[0]].balance_mc -= args[1]
+    elif op == "transfer":
+        sender, receiver, amount_mc = args
+        db[sender].balance_mc -= amount_mc
+        db[receiver].balance_mc += amount_mc
+    elif op == "lock":
+        # The lockout clock restarts at recovery; lock times are not journaled.
+        user = db[args[0]]
+        user.locked = True
+        user.locked_at = time.time()
+    elif op == "accrue":
+        email, interest_mc, accrued_at, carry = args
+        user = db[email]
+        user.balance_mc += interest_mc
+        user.accrued_at = accrued_at
+        user.accrual_carry = carry
+    elif op == "unlock":
+        user = db[args[0]]
+        user.locked = False
+        user.login_attempts = 0
+    elif op == "escrow_debit":
+        txid, email, counterparty, amount_mc = args
+        db[email].balance_mc -= amount_mc
+        target._escrows[txid] = (email, counterparty, amount_mc)
+    elif op == "escrow_settle":
+        target._escrows.pop(args[0], None)
+    elif op == "escrow_release":
+        email, _, amount_mc = target._escrows.pop(args[0])
+        db[email].balance_mc += amount_mc
+    elif op == "escrow_credit":
+        txid, email, _, amount_mc = args
+        db[email].balance_mc += amount_mc
+        target._escrow_credited.add(txid)
+    elif op == "escrow_end":
+        target._escrow_credited.discard(args[0])
+
+# ------------------- Journal -------------------
+class Journal:
+    def __init__(self, directory: str, sync_every: int = 256, sync_interval: float = 0.05,
+                 snapshot_every: int = 1_000_000, target: Optional[wallet.Wallet] = None):
+        self.directory = directory
+        self.wallet = wallet.default_wallet() if target is None else target
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self.generation = 0
+        self.records_since_snapshot = 0
+        self._buffer = bytearray()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._log: Optional[BinaryIO] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    # ---- paths ----
+    def _segment_path(self, generation: int) -> str:
+        return os.path.join(self.directory, f"wal-{generation:08d}.log")
+
+    def _segments(self) -> List[int]:
+        generations = []
+        for entry in os.listdir(self.directory):
+            if entry.startswith("wal-") and entry.endswith(".log"):
+                generations.append(int(entry[4:-4]))
+        return sorted(generations)
+
+    # ---- recovery ----
+    def recover(self) -> int:
+        os.makedirs(self.directory, exist_ok=True)
+        target = self.wallet
+        target.users_db.clear()
+        target._escrows.clear()
+        target._escrow_credited.clear()
+        self.generation = self._load_snapshot()
+        replayed = 0
+        segments = [g for g in self._segments() if g >= self.generation]
+        for generation in segments:
+            path = self._segment_path(generation)
+            with open(path, "rb") as f:
+                data = f.read()
+            records, valid_end = read_records(data)
+            for op, args in records:
+                apply_record(op, args, target)
+            replayed += len(records)
+            if valid_end < len(data):
+                with open(path, "r+b") as f:
+                    f.truncate(valid_end)
+        if segments:
+            self.generation = segments[-1]
+        target.rebuild_ledger()
+        target.clear_sessions()
+        self.records_since_snapshot = replayed
+        self._log = open(self._segment_path(self.generation), "ab")
+        return replayed
+
+    def _load_snapshot(self) -> int:
+        path = os.path.join(self.directory, SNAPSHOT_NAME)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "rb") as f:
+            data = f.read()
+        records, valid_end = read_records(data, _SNAPSHOT_OPS_BY_CODE)
+        if (valid_end != len(data) or len(records) < 2 or records[0][0] != "header"
+                or records[-1] != ("end", [len(records) - 1])):
+            raise ValueError(f"Snapshot {path} is truncated or corrupt.")
+        version, generation = records[0][1]
+        if version not in (5, SNAPSHOT_VERSION):
+            raise ValueError(f"Unsupported snapshot version {version}.")
+        target = self.wallet
+        db = target.users_db
+        User = wallet.User
+        now = time.time()
+        for op, args in records[1:-1]:
+            if op == "accounts":
+                accounts = _decode_accounts(args[0])
+            elif op == "account":
+                accounts = (args,)
+            elif op == "escrow":
+                txid, email, counterparty, amount_mc = args
+                target._escrows[txid] = (email, counterparty, amount_mc)
+                continue
+            else:
+                target._escrow_credited.add(args[0])
+                continue
+            for name, email, pin, balance_mc, locked, interest_rate, accrued_at, carry in accounts:
+                db[email] = User(name, email, pin, balance_mc=balance_mc, locked=bool(locked),
+                                 interest_rate=interest_rate, locked_at=now if locked else 0.0,
+                                 accrued_at=accrued_at, accrual_carry=carry)
+        return generation
+
+    # ---- logging ----
+    def __call__(self, op: str, *args) -> None:
+        if op not in _OPS:
+            return  # login state is not persisted
+        record = encode_record(op, *args)
+        with self._lock:
+            self._buffer += record
+            self._pending += 1
+            self.records_since_snapshot += 1
+            if self._pending >= self.sync_every or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._commit()
+
+    def commit(self) -> None:
+        with self._lock:
+            self._commit()
+
+    def _commit(self) -> None:
+        if self._buffer:
+            self._log.write(self._buffer)
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._buffer.clear()
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def snapshot(self) -> None:
+        # Must not be called from inside a mutation hook: it takes every account lock.
+        # The new segment is started before the snapshot is written, so a crash at any
+        # point still replays correctly: the old snapshot plus all segments, or the new
+        # snapshot plus the new segment.
+        target = self.wallet
+        with target.hold_all_accounts(), self._lock:
+            self._commit()
+            self._log.close()
+            self.generation += 1
+            self._log = open(self._segment_path(self.generation), "ab")
+            self.records_since_snapshot = 0
+            rows = [(u.name, u.email, u.pin, u.balance_mc, int(u.locked), u.interest_rate,
+                     u.accrued_at, u.accrual_carry)
+                    for u in target.users_db.values()]
+            escrows = dict(target._escrows)
+            credited = set(target._escrow_credited)
+            generation = self.generation
+        write_snapshot(os.path.join(self.directory, SNAPSHOT_NAME), generation, rows, escrows, credited)
+        _fsync_directory(self.directory)
+        for old_generation in self._segments():
+            if old_generation < generation:
+                os.remove(self._segment_path(old_generation))
+
+    # ---- background flusher ----
+    def start(self) -> None:
+        self._flusher = threading.Thread(target=self._run, name="wallet-journal", daemon=True)
+        self._flusher.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.sync_interval):
+            self.commit()
+            if self.records_since_snapshot >= self.snapshot_every:
+                self.snapshot()
+
+    def close(self) -> None:
+        self.wallet.remove_mutation_hook(self)
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        if self._log is not None:
+            if self.records_since_snapshot >= self.snapshot_every:
+                self.snapshot()
+            self.commit()
+            self._log.close()
+            self._log = None
+
+def write_snapshot(path: str, generation: int, rows: List[tuple], escrows: Dict[str, Tuple[str, str, int]],
+                   credited: Iterable[str]) -> None:
+    """Write a snapshot of rows (as Journal.snapshot() collects them) to path, atomically."""
+    records = [encode_record("header", SNAPSHOT_VERSION, generation, ops=_SNAPSHOT_OPS)]
+    records += [encode_record("accounts", _encode_accounts(rows[i:i + ACCOUNT_BLOCK]), ops=_SNAPSHOT_OPS)
+                for i in range(0, len(rows), ACCOUNT_BLOCK)]
+    records += [encode_record("escrow", txid, *escrow, ops=_SNAPSHOT_OPS) for txid, escrow in escrows.items()]
+    records += [encode_record("credited", txid, ops=_SNAPSHOT_OPS) for txid in credited]
+    records.append(encode_record("end", len(records), ops=_SNAPSHOT_OPS))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"".join(records))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def open_journal(directory: str, sync_every: int = 256, sync_interval: float = 0.05,
+                 snapshot_every: int = 1_000_000, target: Optional[wallet.Wallet] = None) -> Journal:
+    journal = Journal(directory, sync_every, sync_interval, snapshot_every, target)
+    journal.recover()
+    journal.wallet.add_mutation_hook(journal)
+    journal.start()
+    return journal
@@ -0,0 +1,181 @@
+"""
+Operation Metrics
+
+enable(operations: Iterable[str] = INSTRUMENTED) -> None
+disable() -> None
+snapshot() -> Dict[str, OperationMetrics]
+render_prometheus() -> str
+add_exporter(exporter: Callable[[str], None]) / export() -> None
+
+Requires:
+    - a bound method taken before enable() (e.g. f = wallet.deposit) is not
+      instrumented; look operations up when calling them, as walletAsync does
+
+Ensures:
+    - while enabled, each listed operation of digitalWalletSystem.Wallet is replaced
+      by a wrapper that counts calls per outcome reason (Status.reason) and records
+      the call's latency in a fixed-bucket histogram; results are returned unchanged
+    - every Wallet is measured: the default wallet behind the module functions, any
+      Wallet() created directly and tenant wallets alike, aggregated per operation
+    - disable() puts the original methods back, so a disabled wallet runs the
+      exact uninstrumented code and pays nothing
+    - render_prometheus() renders every counter and histogram in the Prometheus
+      text exposition format; export() hands that text to every registered
+      exporter, e.g. TextFileExporter(path), which replaces a file atomically
+"""
+
+import bisect
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+import digitalWalletSystem as wallet
+
+INSTRUMENTED = (
+    "register_user", "authenticate_user", "view_balance", "view_history", "deposit",
+    "apply_interest", "apply_interest_all", "transfer", "transfer_batch", "withdraw",
+)
+# upper bounds in seconds, Prometheus style (each bucket counts calls <= bound)
+LATENCY_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 1e-3, 1e-2, 1e-1, 1.0)
+
+# ------------------- Metrics -------------------
+# The wrapper runs on every call, so it records as little as it can: one count under
+# the reason the status carries, and one latency bucket.
+class OperationMetrics:
+    __slots__ = ("name", "counts", "buckets", "total_seconds", "lock")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.counts: Dict[wallet.Reason, int] = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total_seconds = [0.0]
+        self.lock = threading.Lock()
+
+    @property
+    def calls(self) -> int:
+        return sum(self.buckets)
+
+    @property
+    def outcomes(self) -> Dict[wallet.Reason, int]:
+        return dict(self.counts)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.counts.clear()
+            self.buckets[:] = [0] * len(self.buckets)
+            self.total_seconds[0] = 0.0
+
+    def copy(self) -> "OperationMetrics":
+        other = OperationMetrics(self.name)
+        with self.lock:
+            other.counts = dict(self.counts)
+            other.buckets = list(self.buckets)
+            other.total_seconds = list(self.total_seconds)
+        return other
+
+def _batch_reason(results: list) -> wallet.Reason:
+    # transfer_batch: the first failing item explains the batch
+    for status in results:
+        if not status.success:
+            return status.reason
+    return wallet.Reason.OK
+
+# ------------------- Instrumentation -------------------
+_metrics: Dict[str, OperationMetrics] = {}
+_originals: Dict[str, Callable] = {}
+_exporters: List[Callable[[str], None]] = []
+
+def _instrument(name: str, operation: Callable) -> Callable:
+    metrics = _metrics.setdefault(name, OperationMetrics(name))
+    counts, buckets, total, lock = metrics.counts, metrics.buckets, metrics.total_seconds, metrics.lock
+    clock = time.perf_counter
+    bisect_left = bisect.bisect_left
+    bounds = LATENCY_BUCKETS
+
+    def instrumented(*args, **kwargs):
+        started = clock()
+        result = operation(*args, **kwargs)
+        elapsed = clock() - started
+        key = _batch_reason(result) if isinstance(result, list) else result.reason
+        with lock:
+            counts[key] = counts.get(key, 0) + 1
+            buckets[bisect_left(bounds, elapsed)] += 1
+            total[0] += elapsed
+        return result
+    instrumented.__name__ = operation.__name__
+    instrumented.__doc__ = operation.__doc__
+    instrumented.__wrapped__ = operation
+    return instrumented
+
+# The wrappers replace the methods on the Wallet class. The package caches the
+# default wallet's bound methods as module globals, so those are dropped too, and
+# the next wallet.deposit binds whatever the class holds now.
+def enable(operations: Iterable[str] = INSTRUMENTED) -> None:
+    for name in operations:
+        if name not in _originals:
+            _originals[name] = vars(wallet.Wallet)[name]
+            setattr(wallet.Wallet, name, _instrument(name, _originals[name]))
+            vars(wallet).pop(name, None)
+
+def disable() -> None:
+    for name, operation in _originals.items():
+        setattr(wallet.Wallet, name, operation)
+        vars(wallet).pop(name, None)
+    _originals.clear()
+
+def enabled() -> bool:
+    return bool(_originals)
+
+def reset() -> None:
+    for metrics in _metrics.values():
+        metrics.clear()
+
+def snapshot() -> Dict[str, OperationMetrics]:
+    return {name: metrics.copy() for name, metrics in _metrics.items()}
+
+# ------------------- Export -------------------
+def render_prometheus(metrics: Optional[Dict[str, OperationMetrics]] = None) -> str:
+    metrics = snapshot() if metrics is None else metrics
+    lines = [
+        "# HELP wallet_operations_total Wallet operation calls by outcome reason.",
+        "# TYPE wallet_operations_total counter",
+    ]
+    for name, m in sorted(metrics.items()):
+        for reason, count in sorted(m.outcomes.items(), key=lambda item: item[0].value):
+            lines.append(f'wallet_operations_total{{operation="{name}",reason="{reason.value}"}} {count}')
+    lines += [
+        "# HELP wallet_operation_seconds Wallet operation latency.",
+        "# TYPE wallet_operation_seconds histogram",
+    ]
+    for name, m in sorted(metrics.items()):
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), m.buckets):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'wallet_operation_seconds_bucket{{operation="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'wallet_operation_seconds_sum{{operation="{name}"}} {m.total_seconds[0]!r}')
+        lines.append(f'wallet_operation_seconds_count{{operation="{name}"}} {m.calls}')
+    return "\n".join(lines) + "\n"
+
+class TextFileExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def __call__(self, text: str) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self.path)
+
+def add_exporter(exporter: Callable[[str], None]) -> None:
+    _exporters.append(exporter)
+
+def remove_exporter(exporter: Callable[[str], None]) -> None:
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+def export() -> None:
+    text = render_prometheus()
+    for exporter in _exporters:
+        exporter(text)
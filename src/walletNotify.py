@@ -0,0 +1,180 @@
+"""
+Notification Delivery
+
+open_delivery(sink: Callable[[List[Notification]], None], interval: float = 0.1, batch: int = 1000,
+              outbox_size: int = 100, capacity: int = 1 << 20,
+              target: Optional[Wallet] = None) -> NotificationDelivery
+JsonLinesSink(path: str)
+QueueSink(queue: Optional[Queue] = None)
+
+Requires:
+    - only one NotificationDelivery is attached to a wallet at a time; target (or
+      NotificationDelivery.open(target)) is that wallet, the default wallet if None
+    - the sink takes a list of Notification tuples; if it raises, none of them
+      count as delivered
+
+Ensures:
+    - on the mutation path a notification costs one append of a compact record to
+      a bounded queue; formatting and delivery happen on the worker
+    - the queue holds at most capacity records; if the worker falls that far
+      behind, the oldest records are dropped
+    - the worker moves queued records into a per-user outbox of at most
+      outbox_size pending notifications; when it is full the oldest pending one is
+      dropped and counted in .dropped
+    - every Notification carries its sequence number (seq), unique in the wallet and
+      increasing per user, so a sink or its consumers can discard a notification
+      delivered twice (delivery is at least once, see below). Distinct events with
+      the same text are all delivered
+    - a user's outbox is dropped as soon as it is delivered, so memory follows the
+      users with pending notifications rather than every user ever notified
+    - every interval seconds, and on flush() and close(), pending notifications
+      are formatted and handed to the sink in batches of at most batch, users
+      served in the order their first pending notification arrived
+    - a batch the sink rejects stays pending and is offered again at the next
+      flush, so delivery is at least once; .delivered counts every batch the sink
+      accepted, including those before a rejected one
+    - close() detaches the outbox, stops the worker and flushes what is left
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from itertools import islice
+from queue import Queue
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import digitalWalletSystem as wallet
+
+class Notification(NamedTuple):
+    email: str
+    text: str
+    seq: int
+
+def _format(record: tuple) -> Notification:
+    email, kind, amount_mc, counterparty, balance_mc, seq = record
+    text = wallet.NOTIFICATION_TEMPLATES[kind].format(
+        amount=amount_mc / wallet.MILLICENTS_PER_DOLLAR, counterparty=counterparty,
+        balance=balance_mc / wallet.MILLICENTS_PER_DOLLAR)
+    return Notification(email, text, seq)
+
+# ------------------- Outboxes -------------------
+class NotificationDelivery:
+    def __init__(self, sink: Callable[[List[Notification]], None], interval: float = 0.1,
+                 batch: int = 1000, outbox_size: int = 100, capacity: int = 1 << 20):
+        self.sink = sink
+        self.interval = interval
+        self.batch = batch
+        self.outbox_size = outbox_size
+        self.delivered = 0
+        self.dropped = 0
+        self._queue: deque = deque(maxlen=capacity)
+        # email -> pending records, oldest first
+        self._outboxes: Dict[str, deque] = {}
+        # emails with pending notifications, in arrival order (dict as ordered set)
+        self._ready: Dict[str, None] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._target: Optional[wallet.Wallet] = None
+
+    def _pump(self) -> None:
+        queue = self._queue
+        outboxes = self._outboxes
+        ready = self._ready
+        size = self.outbox_size
+        while queue:
+            record = queue.popleft()
+            email = record[0]
+            outbox = outboxes.get(email)
+            if outbox is None:
+                outbox = outboxes[email] = deque()
+            outbox.append(record)
+            if len(outbox) > size:
+                outbox.popleft()
+                self.dropped += 1
+            ready[email] = None
+
+    def pending(self) -> int:
+        with self._lock:
+            self._pump()
+            return sum(len(self._outboxes[email]) for email in self._ready)
+
+    def flush(self) -> int:
+        delivered = 0
+        outboxes = self._outboxes
+        with self._lock:
+            self._pump()
+            while self._ready:
+                batch: List[Notification] = []
+                taken = []
+                for email in self._ready:
+                    pending = outboxes[email]
+                    count = min(len(pending), self.batch - len(batch))
+                    batch.extend(map(_format, islice(pending, count)))
+                    taken.append((email, count))
+                    if len(batch) >= self.batch:
+                        break
+                self.sink(batch)
+                self.delivered += len(batch)
+                delivered += len(batch)
+                for email, count in taken:
+                    pending = outboxes[email]
+                    for _ in range(count):
+                        pending.popleft()
+                    if not pending:
+                        del self._ready[email]
+                        del outboxes[email]
+        return delivered
+
+    def open(self, target: Optional[wallet.Wallet] = None) -> "NotificationDelivery":
+        self._target = wallet.default_wallet() if target is None else target
+        self._target.set_notification_outbox(self._queue)
+        self._thread = threading.Thread(target=self._run, name="wallet-notify", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.flush()
+            except Exception:
+                pass  # the batch stays pending; the next round retries it
+
+    def close(self) -> None:
+        if self._target is not None:
+            self._target.set_notification_outbox(None)
+            self._target = None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+def open_delivery(sink: Callable[[List[Notification]], None], interval: float = 0.1, batch: int = 1000,
+                  outbox_size: int = 100, capacity: int = 1 << 20,
+                  target: Optional[wallet.Wallet] = None) -> NotificationDelivery:
+    return NotificationDelivery(sink, interval, batch, outbox_size, capacity).open(target)
+
+# ------------------- Sinks -------------------
+class JsonLinesSink:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __call__(self, batch: List[Notification]) -> None:
+        self._file.write("".join(json.dumps(n._asdict()) + "\n" for n in batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+class QueueSink:
+    """In-process stand-in for a message queue: each batch is put on queue as one list."""
+
+    def __init__(self, queue: Optional[Queue] = None):
+        self.queue = Queue() if queue is None else queue
+
+    def __call__(self, batch: List[Notification]) -> None:
+        self.queue.put(batch)
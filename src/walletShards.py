@@ -0,0 +1,403 @@
+"""
+Multi-Process Sharded Wallet
+
+ShardedWallet(workers: int, data_dir: Optional[str] = None)
+
+Requires:
+    - workers >= 1; every account is owned by exactly one worker process, chosen by
+      a stable hash of its email (crc32(email) % workers)
+    - the calling script guards its entry point with if __name__ == "__main__":
+      because workers are started with the "spawn" method
+    - data_dir, when given, is writable and is not shared with another ShardedWallet
+
+Ensures:
+    - register_user ... withdraw have the same arguments and results as in
+      digitalWalletSystem; they run in the worker that owns the account
+    - with token=..., view_balance, deposit, withdraw and transfer authorize the
+      (sender's) account by its session; the email is still required, since it
+      picks the shard, and must match the session. A cross-shard transfer checks
+      the token when the sender's shard prepares the debit
+    - a transfer between accounts of the same shard is one local transfer()
+    - a transfer between shards is a two-phase commit coordinated by this process:
+        1. the receiver's shard checks that the receiver exists and is logged in
+        2. prepare: the sender's shard moves the amount into an escrow (escrow_debit)
+        3. the decision is logged (COMMIT, fsynced to data_dir/coordinator.log)
+        4. commit: the receiver's shard credits the amount (escrow_credit) and the
+           sender's shard settles the escrow (escrow_settle)
+        5. the transfer is marked complete (END), and the receiver's shard then
+           forgets the txid it credited (escrow_end)
+    - run_batch() sends many requests at once, so all shards work in parallel; the
+      results are those of running the requests one by one in input order. Each
+      cross-shard transfer is a barrier: the requests before it run first, then
+      the transfer alone, then the requests after it
+    - funds are never created or lost: if a worker dies mid-transfer, recover()
+      restarts it from its journal, completes every logged COMMIT and releases every
+      escrow without one (presumed abort)
+    - a request to a dead worker returns a failed status ("Shard unavailable.")
+
+Durability notes:
+    - with data_dir each worker keeps a write-ahead log (walletJournal) in
+      data_dir/shard-NN; votes and escrow records are fsynced before the worker replies
+    - without data_dir a restarted worker starts with an empty shard, and only the
+      coordinator's in-memory decisions survive
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+import uuid
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import digitalWalletSystem as wallet
+
+SHARD_UNAVAILABLE = "Shard unavailable."
+COORDINATOR_LOG = "coordinator.log"
+
+# ------------------- Worker -------------------
+# Steps a worker must make durable before it replies: a yes vote and a prepared
+# debit are promises the coordinator relies on once it logs COMMIT, and a settle
+# must not be lost once END is logged.
+_DURABLE_OPS = frozenset(("can_receive", "escrow_debit", "escrow_credit", "escrow_settle"))
+
+def _can_receive(email: str) -> wallet.TransferStatus:
+    user = wallet.users_db.get(email)
+    if user is None:
+        return wallet.TransferStatus(False, "Sender or receiver does not exist.", reason=wallet.Reason.USER_NOT_FOUND)
+    if not user.logged_in:
+        return wallet.TransferStatus(False, "Both users must be logged in.", reason=wallet.Reason.NOT_LOGGED_IN)
+    return wallet.TransferStatus(True, "Receiver ready.")
+
+def _shard_funds() -> Tuple[int, int, int]:
+    """Return (balance_mc, escrowed_mc, accounts) for this shard."""
+    summary = wallet.ledger_summary()
+    escrowed = sum(amount_mc for _, _, amount_mc in wallet._escrows.values())
+    return summary.total_balance_mc, escrowed, summary.accounts
+
+_WORKER_OPS = {
+    "register_user": wallet.register_user,
+    "authenticate_user": wallet.authenticate_user,
+    "view_balance": wallet.view_balance,
+    "deposit": wallet.deposit,
+    "apply_interest": wallet.apply_interest,
+    "apply_interest_all": wallet.apply_interest_all,
+    "transfer": wallet.transfer,
+    "withdraw": wallet.withdraw,
+    "escrow_debit": wallet.escrow_debit,
+    "escrow_credit": wallet.escrow_credit,
+    "escrow_settle": wallet.escrow_settle,
+    "escrow_release": wallet.escrow_release,
+    "escrow_end": wallet.escrow_end,
+    "pending_escrows": wallet.pending_escrows,
+    "can_receive": _can_receive,
+    "shard_funds": _shard_funds,
+}
+
+def _worker_main(conn, shard_dir: Optional[str]) -> None:
+    journal = None
+    if shard_dir is not None:
+        import walletJournal
+        journal = walletJournal.open_journal(shard_dir)
+    try:
+        while True:
+            requests = conn.recv()
+            if requests is None:
+                break
+            results = []
+            durable = False
+            for op, args in requests:
+                try:
+                    results.append(_WORKER_OPS[op](*args))
+                except Exception as error:
+                    results.append(error)
+                durable = durable or op in _DURABLE_OPS
+            if durable and journal is not None:
+                journal.commit()
+            conn.send(results)
+    finally:
+        if journal is not None:
+            journal.close()
+        conn.close()
+
+# ------------------- Coordinator -------------------
+def _unavailable(op: str) -> Any:
+    unavailable = wallet.Reason.UNAVAILABLE
+    if op == "register_user":
+        return wallet.AccountStatus(False, SHARD_UNAVAILABLE, reason=unavailable)
+    if op == "authenticate_user":
+        return wallet.LoginStatus(False, SHARD_UNAVAILABLE, reason=unavailable)
+    if op == "view_balance":
+        return wallet.BalanceInfo(0.0, [], 0.0, SHARD_UNAVAILABLE, reason=unavailable)
+    if op == "deposit":
+        return wallet.DepositStatus(False, SHARD_UNAVAILABLE, reason=unavailable)
+    if op == "apply_interest":
+        return wallet.InterestStatus(False, SHARD_UNAVAILABLE, reason=unavailable)
+    if op == "withdraw":
+        return wallet.WithdrawalStatus(False, SHARD_UNAVAILABLE, reason=unavailable)
+    if op == "apply_interest_all":
+        return wallet.InterestSummary(False, 0, 0, 0.0, SHARD_UNAVAILABLE, reason=unavailable)
+    if op in ("escrow_settle", "escrow_release", "escrow_end", "pending_escrows", "shard_funds"):
+        return None
+    return wallet.TransferStatus(False, SHARD_UNAVAILABLE, reason=unavailable)
+
+class ShardedWallet:
+    def __init__(self, workers: int = os.cpu_count() or 1, data_dir: Optional[str] = None):
+        self.workers = workers
+        self.data_dir = data_dir
+        self._context = multiprocessing.get_context("spawn")
+        self._procs: List[Any] = [None] * workers
+        self._conns: List[Any] = [None] * workers
+        self._pipe_locks = [threading.Lock() for _ in range(workers)]
+        self._log_lock = threading.Lock()
+        self._log = None
+        # txid -> (sender, receiver, amount_mc) for logged commits not yet completed
+        self._committed: Dict[str, Tuple[str, str, int]] = {}
+        self._inflight: set = set()
+        if data_dir is not None:
+            os.makedirs(data_dir, exist_ok=True)
+            self._load_decisions()
+        for shard in range(workers):
+            self._start_worker(shard)
+
+    # ---- lifecycle ----
+    def _start_worker(self, shard: int) -> None:
+        shard_dir = None
+        if self.data_dir is not None:
+            shard_dir = os.path.join(self.data_dir, f"shard-{shard:02d}")
+        parent, child = self._context.Pipe()
+        proc = self._context.Process(target=_worker_main, args=(child, shard_dir),
+                                     name=f"wallet-shard-{shard}", daemon=True)
+        proc.start()
+        child.close()
+        self._procs[shard] = proc
+        self._conns[shard] = parent
+
+    def alive(self, shard: int) -> bool:
+        return self._procs[shard] is not None and self._procs[shard].is_alive()
+
+    def close(self) -> None:
+        for shard in range(self.workers):
+            with self._pipe_locks[shard]:
+                conn = self._conns[shard]
+                if conn is None:
+                    continue
+                try:
+                    conn.send(None)
+                except OSError:
+                    pass
+                self._procs[shard].join()
+                conn.close()
+                self._conns[shard] = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+    def __enter__(self) -> "ShardedWallet":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # ---- routing ----
+    def shard_of(self, email: str) -> int:
+        return zlib.crc32(email.encode("utf-8")) % self.workers
+
+    def _exchange(self, shard: int, requests: List[Tuple[str, tuple]]) -> Optional[list]:
+        with self._pipe_locks[shard]:
+            conn = self._conns[shard]
+            if conn is None:
+                return None
+            try:
+                conn.send(requests)
+                return conn.recv()
+            except (EOFError, OSError):
+                conn.close()
+                self._conns[shard] = None
+                return None
+
+    def _call(self, shard: int, op: str, *args) -> Any:
+        results = self._exchange(shard, [(op, args)])
+        if results is None:
+            return _unavailable(op)
+        result = results[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def run_batch(self, requests: List[Tuple]) -> List[Any]:
+        """Run (op, *args) requests, each shard's share in one round trip, all shards at once."""
+        # A phase is a run of requests that each touch one shard, so running every
+        # shard's share in order gives the same results as running them one by one.
+        # A cross-shard transfer touches two shards and ends the phase.
+        per_shard: Dict[int, List[int]] = {}
+        results: List[Any] = [None] * len(requests)
+        for index, (op, *args) in enumerate(requests):
+            if op == "transfer" and self.shard_of(args[0]) != self.shard_of(args[1]):
+                self._run_phase(requests, per_shard, results)
+                per_shard = {}
+                results[index] = self.transfer(*args)
+            else:
+                per_shard.setdefault(self.shard_of(args[0]), []).append(index)
+        self._run_phase(requests, per_shard, results)
+        return results
+
+    def _run_phase(self, requests: List[Tuple], per_shard: Dict[int, List[int]], results: List[Any]) -> None:
+        threads = []
+        for shard, indexes in per_shard.items():
+            batch = [(requests[i][0], tuple(requests[i][1:])) for i in indexes]
+            thread = threading.Thread(target=self._run_shard_batch, args=(shard, indexes, batch, results))
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+
+    def _run_shard_batch(self, shard: int, indexes: List[int], batch: list, results: list) -> None:
+        replies = self._exchange(shard, batch)
+        for position, index in enumerate(indexes):
+            results[index] = _unavailable(batch[position][0]) if replies is None else replies[position]
+
+    # ---- operations ----
+    def register_user(self, name: str, email: str, pin: str, initial_balance: float) -> wallet.AccountStatus:
+        return self._call(self.shard_of(email), "register_user", name, email, pin, initial_balance)
+
+    def authenticate_user(self, email: str, entered_pin: str, source: Optional[str] = None) -> wallet.LoginStatus:
+        return self._call(self.shard_of(email), "authenticate_user", email, entered_pin, source)
+
+    def view_balance(self, email: str, token: Optional[str] = None) -> wallet.BalanceInfo:
+        return self._call(self.shard_of(email), "view_balance", email, token)
+
+    def deposit(self, email: str, amount: float, token: Optional[str] = None) -> wallet.DepositStatus:
+        return self._call(self.shard_of(email), "deposit", email, amount, token)
+
+    def apply_interest(self, email: str, interest_rate: float) -> wallet.InterestStatus:
+        return self._call(self.shard_of(email), "apply_interest", email, interest_rate)
+
+    def withdraw(self, email: str, amount: float, token: Optional[str] = None) -> wallet.WithdrawalStatus:
+        return self._call(self.shard_of(email), "withdraw", email, amount, token)
+
+    def apply_interest_all(self, interest_rate: Optional[float] = None) -> wallet.InterestSummary:
+        summaries = [self._call(shard, "apply_interest_all", interest_rate) for shard in range(self.workers)]
+        credited = sum(s.accounts_credited for s in summaries)
+        skipped = sum(s.accounts_skipped for s in summaries)
+        total = round(sum(s.total_interest for s in summaries), 2)
+        if not all(s.success for s in summaries):
+            return wallet.InterestSummary(False, credited, skipped, total, SHARD_UNAVAILABLE,
+                                          reason=wallet.Reason.UNAVAILABLE)
+        return wallet.InterestSummary(True, credited, skipped, total,
+                                      f"Interest of ${total:.2f} applied to {credited} accounts.")
+
+    def total_funds_mc(self) -> Optional[int]:
+        """Balances plus held escrows over every shard; None if a shard is down."""
+        total = 0
+        for shard in range(self.workers):
+            funds = self._call(shard, "shard_funds")
+            if funds is None:
+                return None
+            total += funds[0] + funds[1]
+        return total
+
+    def transfer(self, sender_email: str, receiver_email: str, amount: float,
+                 token: Optional[str] = None) -> wallet.TransferStatus:
+        source = self.shard_of(sender_email)
+        target = self.shard_of(receiver_email)
+        if source == target:
+            return self._call(source, "transfer", sender_email, receiver_email, amount, token)
+
+        vote = self._call(target, "can_receive", receiver_email)
+        if not vote.success:
+            return vote
+        try:
+            amount_mc = wallet.to_millicents(amount) if amount > 0 else 0
+        except ValueError:
+            amount_mc = 0
+        if amount_mc <= 0:
+            return wallet.TransferStatus(False, "Insufficient funds or invalid amount.", reason=wallet.Reason.INVALID_AMOUNT)
+
+        txid = uuid.uuid4().hex
+        self._inflight.add(txid)
+        try:
+            prepared = self._call(source, "escrow_debit", txid, sender_email, receiver_email, amount_mc, token)
+            if not prepared.success:
+                # Nothing is held unless the worker died after preparing; recover()
+                # releases such an escrow because no COMMIT was logged for it.
+                return prepared
+            self._log_commit(txid, sender_email, receiver_email, amount_mc)
+            self._complete(txid, sender_email, receiver_email, amount_mc)
+        finally:
+            self._inflight.discard(txid)
+        return wallet.TransferStatus(True, f"Transferred ${amount:.2f} successfully.")
+
+    # ---- two-phase commit ----
+    def _complete(self, txid: str, sender: str, receiver: str, amount_mc: int) -> bool:
+        credited = self._call(self.shard_of(receiver), "escrow_credit", txid, receiver, sender, amount_mc)
+        if not credited.success:
+            return False
+        if self._call(self.shard_of(sender), "escrow_settle", txid) is None:
+            return False
+        self._log_end(txid)
+        # Only after END: until then recover() may retry the credit, which must
+        # still find the txid to stay idempotent. A lost escrow_end only leaves the
+        # txid behind.
+        self._call(self.shard_of(receiver), "escrow_end", txid)
+        return True
+
+    def _log_commit(self, txid: str, sender: str, receiver: str, amount_mc: int) -> None:
+        with self._log_lock:
+            self._committed[txid] = (sender, receiver, amount_mc)
+            self._append({"commit": txid, "sender": sender, "receiver": receiver, "amount_mc": amount_mc},
+                         sync=True)
+
+    def _log_end(self, txid: str) -> None:
+        with self._log_lock:
+            self._committed.pop(txid, None)
+            self._append({"end": txid}, sync=False)
+
+    def _append(self, entry: dict, sync: bool) -> None:
+        if self.data_dir is None:
+            return
+        if self._log is None:
+            self._log = open(os.path.join(self.data_dir, COORDINATOR_LOG), "a")
+        self._log.write(json.dumps(entry) + "\n")
+        self._log.flush()
+        if sync:
+            os.fsync(self._log.fileno())
+
+    def _load_decisions(self) -> None:
+        path = os.path.join(self.data_dir, COORDINATOR_LOG)
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # torn last line
+                if "commit" in entry:
+                    self._committed[entry["commit"]] = (entry["sender"], entry["receiver"], entry["amount_mc"])
+                else:
+                    self._committed.pop(entry["end"], None)
+
+    def recover(self) -> Dict[str, int]:
+        """Restart dead workers and resolve every in-doubt transfer."""
+        restarted = 0
+        for shard in range(self.workers):
+            if not self.alive(shard):
+                with self._pipe_locks[shard]:
+                    if self._conns[shard] is not None:
+                        self._conns[shard].close()
+                    self._start_worker(shard)
+                restarted += 1
+
+        completed = 0
+        for txid, (sender, receiver, amount_mc) in list(self._committed.items()):
+            if txid not in self._inflight and self._complete(txid, sender, receiver, amount_mc):
+                completed += 1
+
+        released = 0
+        for shard in range(self.workers):
+            escrows = self._call(shard, "pending_escrows") or {}
+            for txid in escrows:
+                if txid not in self._committed and txid not in self._inflight:
+                    released += bool(self._call(shard, "escrow_release", txid))
+        return {"restarted": restarted, "completed": completed, "released": released}
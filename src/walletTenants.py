@@ -0,0 +1,286 @@
+"""
+Multi-Tenant Wallet Registry
+
+open_registry(directory: str, capacity: int = 1000, idle: float = 300.0, interval: float = 30.0,
+              lock_stripes: int = 16, setup: Optional[Callable[[str, Wallet], None]] = None) -> TenantRegistry
+TenantRegistry.tenant(name: str) -> ContextManager[Wallet]
+TenantRegistry.evict(name: str) -> bool
+TenantRegistry.evict_idle(idle: Optional[float] = None) -> int
+TenantRegistry.resident() -> List[str]
+TenantRegistry.tenants() -> List[str]
+
+Requires:
+    - tenant names are non-empty and made of letters, digits, '-', '_' and '.', not
+      starting with '.' (each names a file in directory)
+    - directory is writable (it is created if missing) and used by one registry
+    - a Wallet obtained from tenant() is used only inside its with block
+    - capacity >= 1, idle >= 0, interval > 0, lock_stripes >= 1
+
+Ensures:
+    - every tenant has its own Wallet, so accounts, ledgers, locks, sessions,
+      escrows and hooks of different tenants never mix; a new tenant starts empty
+    - at most capacity tenants are resident; taking one more evicts the least
+      recently used tenants that are not in use
+    - once started, a background thread wakes every interval seconds and evicts
+      the tenants not used for idle seconds
+    - eviction writes the tenant's accounts (with their histories and login state),
+      escrows and ledger flows to <directory>/<name>.tenant, atomically, and drops
+      the wallet; a tenant unchanged since it was loaded is not rewritten. The next
+      tenant() call loads it back, so eviction changes no balance, history or lock
+    - a tenant file is plain JSON data, read without executing anything; loading a
+      file that is not a tenant file of TENANT_VERSION raises ValueError
+    - sessions, throttle buckets, hooks and other configuration are not persisted:
+      an evicted tenant's tokens are invalid, and setup(name, wallet) runs again on
+      every load to configure the fresh wallet
+    - a tenant is never evicted while a with block is using it; loading and saving
+      tenants does not block access to other resident tenants
+    - close() stops the thread and evicts every tenant
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+import digitalWalletSystem as wallet
+
+TENANT_VERSION = 2
+TENANT_SUFFIX = ".tenant"
+
+# Account fields stored as they are; the two histories are stored as History.dump().
+_HISTORIES = ("transactions", "notifications")
+_FIELDS = tuple(name for name in wallet.User._fields if name not in _HISTORIES)
+
+def valid_tenant(name: str) -> bool:
+    return bool(name) and name[0] != "." and all(c.isalnum() or c in "-_." for c in name)
+
+def _fsync_directory(directory: str) -> None:
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+# ------------------- Tenant Files -------------------
+def _dump_account(user: "wallet.User") -> dict:
+    account = {name: getattr(user, name) for name in _FIELDS}
+    for channel in _HISTORIES:
+        account[channel] = getattr(user, channel).dump()
+    return account
+
+def _load_account(account: dict) -> "wallet.User":
+    email = account["email"]
+    histories = {channel: wallet.History.load(email, channel, account[channel]) for channel in _HISTORIES}
+    return wallet.User(**{name: account[name] for name in _FIELDS}, **histories)
+
+# ------------------- Tenants -------------------
+class _Tenant:
+    __slots__ = ("wallet", "pins", "last_used", "dirty", "lock")
+
+    def __init__(self):
+        self.wallet: Optional[wallet.Wallet] = None
+        self.pins = 0
+        self.last_used = time.monotonic()
+        self.dirty = False
+        # held while the tenant's file is read or written
+        self.lock = threading.Lock()
+
+    def __call__(self, op: str, *args) -> None:
+        # Mutation hook: any reported mutation, including a wrong PIN ("login_failed")
+        # or a lockout, means the file is out of date.
+        self.dirty = True
+
+class TenantRegistry:
+    def __init__(self, directory: str, capacity: int = 1000, idle: float = 300.0, interval: float = 30.0,
+                 lock_stripes: int = 16, setup: Optional[Callable[[str, "wallet.Wallet"], None]] = None):
+        self.directory = directory
+        self.capacity = capacity
+        self.idle = idle
+        self.interval = interval
+        self.lock_stripes = lock_stripes
+        self.setup = setup
+        self.loads = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self._resident: "OrderedDict[str, _Tenant]" = OrderedDict()
+        # tenants removed from _resident whose file is still being written
+        self._evicting: Dict[str, _Tenant] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name + TENANT_SUFFIX)
+
+    # ---- access ----
+    @contextmanager
+    def tenant(self, name: str) -> Iterator["wallet.Wallet"]:
+        if not valid_tenant(name):
+            raise ValueError(f"Invalid tenant name {name!r}.")
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is None:
+                # A tenant still being saved is taken back as it is; entry.lock below
+                # waits for the save to finish, and the saver then keeps its wallet.
+                entry = self._evicting.get(name) or _Tenant()
+                self._resident[name] = entry
+            else:
+                self._resident.move_to_end(name)
+            entry.pins += 1
+            victims = self._take_victims(len(self._resident) - self.capacity)
+        try:
+            self._save_all(victims)
+            with entry.lock:
+                if entry.wallet is None:
+                    entry.wallet = self._load(name, entry)
+            yield entry.wallet
+        finally:
+            with self._lock:
+                entry.pins -= 1
+                entry.last_used = time.monotonic()
+
+    def resident(self) -> List[str]:
+        with self._lock:
+            return list(self._resident)
+
+    def tenants(self) -> List[str]:
+        stored = {entry[:-len(TENANT_SUFFIX)] for entry in os.listdir(self.directory)
+                  if entry.endswith(TENANT_SUFFIX)}
+        return sorted(stored.union(self.resident()))
+
+    # ---- eviction ----
+    def _take_victims(self, count: int, idle: Optional[float] = None) -> List[tuple]:
+        # Called with self._lock held. Victims leave _resident at once and are parked
+        # in _evicting, locked, until their file is written.
+        victims = []
+        if count <= 0 and idle is None:
+            return victims
+        now = time.monotonic()
+        for name, entry in list(self._resident.items()):
+            if idle is None and len(victims) >= count:
+                break
+            if entry.pins or idle is not None and now - entry.last_used < idle:
+                continue
+            if not entry.lock.acquire(blocking=False):
+                continue
+            del self._resident[name]
+            self._evicting[name] = entry
+            victims.append((name, entry))
+        return victims
+
+    def _save_all(self, victims: List[tuple]) -> None:
+        error = None
+        for name, entry in victims:
+            saved = False
+            try:
+                if entry.wallet is not None and entry.dirty:
+                    self._save(name, entry.wallet)
+                    entry.dirty = False
+                saved = True
+            except Exception as exc:  # every victim must still be released
+                error = error or exc
+            with self._lock:
+                del self._evicting[name]
+                if self._resident.get(name) is entry:
+                    pass  # taken back while it was saved
+                elif not saved:
+                    self._resident[name] = entry  # nothing was written: keep it
+                elif entry.wallet is not None:
+                    entry.wallet = None
+                    self.evictions += 1
+            entry.lock.release()
+        if error is not None:
+            raise error
+
+    def evict(self, name: str) -> bool:
+        with self._lock:
+            entry = self._resident.get(name)
+            if entry is None or entry.pins or not entry.lock.acquire(blocking=False):
+                return False
+            del self._resident[name]
+            self._evicting[name] = entry
+        self._save_all([(name, entry)])
+        return True
+
+    def evict_idle(self, idle: Optional[float] = None) -> int:
+        with self._lock:
+            victims = self._take_victims(0, self.idle if idle is None else idle)
+        self._save_all(victims)
+        return len(victims)
+
+    # ---- persistence ----
+    def _load(self, name: str, entry: _Tenant) -> "wallet.Wallet":
+        tenant = wallet.Wallet(lock_stripes=self.lock_stripes)
+        path = self._path(name)
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                try:
+                    data = json.loads(f.read())
+                except ValueError:
+                    data = None
+            if not isinstance(data, dict) or data.get("version") != TENANT_VERSION:
+                raise ValueError(f"{path} is not a version {TENANT_VERSION} tenant file.")
+            tenant.use_store({account["email"]: _load_account(account) for account in data["accounts"]})
+            tenant._escrows.update((txid, tuple(escrow)) for txid, escrow in data["escrows"].items())
+            tenant._escrow_credited.update(data["credited"])
+            # Flows are kept per period only, so they all go back into the first shard.
+            tenant._ledger[0].periods.update((int(period), totals) for period, totals in data["flows"].items())
+            self.loads += 1
+        entry.dirty = False
+        tenant.add_mutation_hook(entry)
+        if self.setup is not None:
+            self.setup(name, tenant)
+        return tenant
+
+    def _save(self, name: str, tenant: "wallet.Wallet") -> None:
+        with tenant.hold_all_accounts():
+            accounts = list(map(_dump_account, tenant.users_db.values()))
+            escrows = dict(tenant._escrows)
+            credited = list(tenant._escrow_credited)
+            flows: Dict[int, List[int]] = {}
+            for shard in tenant._ledger:
+                for period, totals in shard.periods.items():
+                    merged = flows.setdefault(period, [0, 0, 0])
+                    for column, amount_mc in enumerate(totals):
+                        merged[column] += amount_mc
+            for period in sorted(flows)[:-wallet.LEDGER_PERIODS_KEPT]:
+                del flows[period]
+        data = json.dumps({"version": TENANT_VERSION, "accounts": accounts, "escrows": escrows,
+                           "credited": credited, "flows": flows}, separators=(",", ":")).encode("utf-8")
+        path = self._path(name)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        _fsync_directory(self.directory)
+
+    # ---- background eviction ----
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="wallet-tenants", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.evict_idle()
+            except Exception:
+                pass  # a tenant that could not be saved stays resident; the next round retries it
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.evict_idle(0.0)
+
+def open_registry(directory: str, capacity: int = 1000, idle: float = 300.0, interval: float = 30.0,
+                  lock_stripes: int = 16,
+                  setup: Optional[Callable[[str, "wallet.Wallet"], None]] = None) -> TenantRegistry:
+    registry = TenantRegistry(directory, capacity, idle, interval, lock_stripes, setup)
+    registry.start()
+    return registry
@@ -0,0 +1,21 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+
+
+@pytest.fixture(autouse=True)
+def clean_wallet():
+    yield
+    wallet.users_db.clear()
+    wallet._mutation_hooks.clear()
+    wallet._escrows.clear()
+    wallet._escrow_credited.clear()
+    wallet.rebuild_ledger()
+    wallet.configure_throttle()
+    wallet.configure_sessions()
+    wallet.configure_accrual(enabled=False)
+    wallet.set_notification_outbox(None)
@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import random
+import threading
+
+import pytest
+
+import digitalWalletSystem as wallet
+
+EMAILS = [f"user{i}@mail.com" for i in range(4)]
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _open_accounts(balance):
+    for email in EMAILS:
+        wallet.register_user("User", email, "1234", balance)
+        wallet.authenticate_user(email, "1234")
+
+
+def _run_threads(worker, count):
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)
+
+
+def test_no_overdraft_and_funds_conserved(fast_switching):
+    _open_accounts(50.0)
+    withdrawn = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(2000):
+            sender, receiver = rng.sample(EMAILS, 2)
+            if rng.random() < 0.2:
+                if wallet.withdraw(sender, 3.0).success:
+                    withdrawn.append(300_000)
+            else:
+                wallet.transfer(sender, receiver, 7.0)
+
+    _run_threads(worker, 8)
+    balances = [wallet.users_db[email].balance_mc for email in EMAILS]
+    assert min(balances) >= 0
+    assert sum(balances) + sum(withdrawn) == 4 * 5_000_000
+
+
+def test_opposing_transfers_do_not_deadlock(fast_switching):
+    _open_accounts(1000.0)
+
+    def worker(seed):
+        a, b = EMAILS[0], EMAILS[1]
+        if seed % 2:
+            a, b = b, a
+        for _ in range(2000):
+            wallet.transfer(a, b, 1.0)
+            wallet.transfer_batch([(b, a, 1.0), (a, EMAILS[2], 1.0)])
+
+    _run_threads(worker, 8)
+    assert sum(wallet.users_db[email].balance_mc for email in EMAILS) == 4 * 100_000_000
+
+
+def test_concurrent_registration_admits_one_user(fast_switching):
+    results = []
+    _run_threads(lambda seed: results.append(
+        wallet.register_user("User", "same@mail.com", "1234", float(seed)).success), 8)
+    assert results.count(True) == 1
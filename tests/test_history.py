@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+
+
+@pytest.fixture
+def account():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 0.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    yield wallet.users_db["ana@mail.com"]
+    wallet.configure_history()
+
+
+def test_records_are_formatted_on_read(account):
+    wallet.deposit("ana@mail.com", 12.5)
+    wallet.withdraw("ana@mail.com", 2.5)
+    assert account.transactions == ["Deposited $12.50", "Withdrew $2.50"]
+    assert account.notifications[-1] == "Withdrawal of $2.50 successful. New balance: $10.00"
+    account.transactions.append("Manual adjustment")
+    assert account.transactions[-1] == "Manual adjustment"
+
+
+def test_history_pages_walk_backwards_with_cursor(account):
+    for i in range(1, 8):
+        wallet.deposit("ana@mail.com", float(i))
+    page = wallet.view_history("ana@mail.com", limit=3)
+    assert page.entries == ["Deposited $5.00", "Deposited $6.00", "Deposited $7.00"]
+    page = wallet.view_history("ana@mail.com", page.next_cursor, limit=3)
+    assert page.entries == ["Deposited $2.00", "Deposited $3.00", "Deposited $4.00"]
+    page = wallet.view_history("ana@mail.com", page.next_cursor, limit=3)
+    assert page.entries == ["Deposited $1.00"]
+    assert page.next_cursor is None
+
+
+def test_view_balance_returns_latest_page(account):
+    wallet.configure_history(retention=1000)
+    for _ in range(55):
+        wallet.deposit("ana@mail.com", 1.0)
+    info = wallet.view_balance("ana@mail.com")
+    assert len(info.transactions) == wallet.BALANCE_HISTORY_LIMIT
+    assert info.next_cursor == 55 - wallet.BALANCE_HISTORY_LIMIT
+
+
+def test_retention_spills_old_entries(account, tmp_path):
+    spill = tmp_path / "history.log"
+    wallet.configure_history(retention=8, spill_path=str(spill))
+    for i in range(1, 11):
+        wallet.deposit("ana@mail.com", float(i))
+    assert len(account.transactions) == 8
+    assert account.transactions.total == 10
+    assert wallet.view_history("ana@mail.com").entries[0] == "Deposited $3.00"
+    wallet.configure_history()
+    lines = spill.read_text().splitlines()
+    assert "ana@mail.com\ttransactions\t0\tDeposited $1.00" in lines
+    assert "ana@mail.com\ttransactions\t1\tDeposited $2.00" in lines
+
+
+def test_view_history_requires_login():
+    wallet.register_user("Rui", "rui@mail.com", "1234", 0.0)
+    assert wallet.view_history("rui@mail.com").message == "Access denied. User not logged in."
+    assert wallet.view_history("ghost@mail.com").message == "User does not exist."
+
+
+def test_retention_is_per_wallet():
+    small, large = wallet.Wallet(), wallet.Wallet()
+    small.configure_history(retention=8)
+    for w in (small, large):
+        w.register_user("Ana", "ana@mail.com", "1234", 0.0)
+        w.authenticate_user("ana@mail.com", "1234")
+        for _ in range(20):
+            w.deposit("ana@mail.com", 1.0)
+    assert len(small.users_db["ana@mail.com"].transactions) == 8
+    assert len(large.users_db["ana@mail.com"].transactions) == 20
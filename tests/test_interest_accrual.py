@@ -0,0 +1,41 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+
+
+def _register(email, balance, rate=0.05):
+    wallet.register_user("User", email, "1234", balance)
+    wallet.users_db[email].interest_rate = rate
+
+
+def test_bulk_rate_applies_to_positive_balances_only():
+    _register("ana@mail.com", 100.0)
+    _register("rui@mail.com", 0.0)
+    summary = wallet.apply_interest_all(0.1)
+    assert summary.success is True
+    assert summary.accounts_credited == 1
+    assert summary.accounts_skipped == 1
+    assert summary.total_interest == 10.0
+    assert wallet.users_db["ana@mail.com"].balance == 110.0
+    assert wallet.users_db["rui@mail.com"].balance == 0.0
+    assert wallet.users_db["ana@mail.com"].notifications == []
+
+
+def test_per_account_rates_and_invalid_rates_skipped():
+    _register("ana@mail.com", 100.0, 0.5)
+    _register("rui@mail.com", 100.0, 1.5)
+    summary = wallet.apply_interest_all()
+    assert summary.accounts_credited == 1
+    assert wallet.users_db["ana@mail.com"].balance == 150.0
+    assert wallet.users_db["rui@mail.com"].balance == 100.0
+
+
+def test_invalid_bulk_rate_changes_nothing():
+    _register("ana@mail.com", 100.0)
+    for rate in (0, -0.1, 1.01):
+        summary = wallet.apply_interest_all(rate)
+        assert summary.success is False
+        assert summary.message == "Invalid interest rate."
+    assert wallet.users_db["ana@mail.com"].balance == 100.0
@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+
+
+def _login(email, balance):
+    wallet.register_user("User", email, "1234", balance)
+    wallet.authenticate_user(email, "1234")
+
+
+def test_summary_tracks_every_mutator():
+    before = wallet.ledger_summary()
+    _login("ana@mail.com", 100.0)
+    _login("rui@mail.com", 50.0)
+    wallet.deposit("ana@mail.com", 20.0)
+    wallet.withdraw("rui@mail.com", 5.0)
+    wallet.transfer("ana@mail.com", "rui@mail.com", 30.0)
+    wallet.transfer_batch([("rui@mail.com", "ana@mail.com", 1.0)])
+    wallet.apply_interest("ana@mail.com", 0.1)
+    wallet.apply_interest_all(0.5)
+
+    summary = wallet.ledger_summary(verify=True)
+    assert summary.success is True
+    assert summary.accounts == 2
+    assert summary.total_balance_mc == sum(u.balance_mc for u in wallet.users_db.values())
+    assert round(summary.deposits - before.deposits, 5) == 20.0
+    assert round(summary.withdrawals - before.withdrawals, 5) == 5.0
+    assert round(summary.interest - before.interest, 5) == 96.15
+
+
+def test_locked_accounts_are_counted():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 1.0)
+    for _ in range(5):
+        wallet.authenticate_user("ana@mail.com", "0000")
+    assert wallet.ledger_summary().locked_accounts == 1
+
+
+def test_verify_reports_out_of_band_changes():
+    _login("ana@mail.com", 10.0)
+    wallet.users_db["ana@mail.com"].balance_mc += 1
+    summary = wallet.ledger_summary(verify=True)
+    assert summary.success is False
+    assert summary.message.startswith("Ledger mismatch")
+    wallet.rebuild_ledger()
+    assert wallet.ledger_summary(verify=True).success is True
+
+
+def test_other_periods_are_separate():
+    _login("ana@mail.com", 10.0)
+    wallet.deposit("ana@mail.com", 1.0)
+    current = wallet.ledger_summary().period
+    assert wallet.ledger_summary(period=current - 1).deposits == 0.0
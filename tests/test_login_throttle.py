@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+
+
+def test_email_bucket_rejects_before_pin_check():
+    wallet.configure_throttle(email_rate=0.001, email_burst=3)
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+
+    for _ in range(3):
+        wallet.authenticate_user("ana@mail.com", "0000")
+    status = wallet.authenticate_user("ana@mail.com", "1234")
+    assert not status.success
+    assert status.message == "Too many login attempts. Try again later."
+    assert wallet.users_db["ana@mail.com"].login_attempts == 3
+
+
+def test_source_bucket_covers_unknown_emails():
+    wallet.configure_throttle(source_rate=0.001, source_burst=5)
+    results = [wallet.authenticate_user(f"probe{i}@mail.com", "0000", source="10.0.0.1") for i in range(8)]
+    assert [r.message for r in results[:5]] == ["User does not exist."] * 5
+    assert all(r.message == "Too many login attempts. Try again later." for r in results[5:])
+    assert wallet.authenticate_user("probe9@mail.com", "0000", source="10.0.0.2").message == "User does not exist."
+
+
+def test_bucket_tables_stay_bounded():
+    wallet.configure_throttle(max_keys=100)
+    for i in range(1000):
+        wallet.authenticate_user(f"probe{i}@mail.com", "0000", source=f"10.0.{i}.1")
+    assert len(wallet._email_buckets) <= 100
+    assert len(wallet._source_buckets) <= 100
+
+
+def test_lockout_expires():
+    wallet.configure_throttle(lockout_seconds=60)
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    events = []
+    wallet.add_mutation_hook(lambda op, *args: events.append(op))
+    for _ in range(5):
+        wallet.authenticate_user("ana@mail.com", "0000")
+    assert wallet.authenticate_user("ana@mail.com", "1234").message.startswith("Account is locked")
+    assert wallet.ledger_summary().locked_accounts == 1
+
+    wallet.users_db["ana@mail.com"].locked_at -= 61
+    assert wallet.authenticate_user("ana@mail.com", "1234").success
+    assert wallet.ledger_summary().locked_accounts == 0
+    assert events == ["login_failed"] * 4 + ["lock", "unlock", "login"]
+
+
+def test_throttle_rejects_rates_that_never_refill():
+    for options in ({"email_rate": 0}, {"source_rate": -1.0}, {"email_burst": 0}):
+        with pytest.raises(ValueError):
+            wallet.configure_throttle(**options)
+    wallet.configure_throttle(email_rate=0, enabled=False)
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+
+
+def test_conversions_round_half_even_to_millicents():
+    assert wallet.to_millicents(0.1) == 10_000
+    assert wallet.to_millicents(12.345678) == 1_234_568
+    assert wallet.to_millicents(0.000005) == 0
+    assert wallet.to_dollars(1_234_500) == 12.345
+
+
+def test_interest_rounding_policy():
+    assert wallet.interest_millicents(3, 0.5) == 2
+    assert wallet.interest_millicents(5, 0.5) == 2
+    assert wallet.interest_millicents(7, 0.5) == 4
+    assert wallet.interest_millicents(10_000_000, 0.05) == 500_000
+    assert wallet.interest_millicents(1, 0.05) == 0
+
+
+def test_total_balance_is_exact_after_many_transfers():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 1000.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 1000.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    wallet.authenticate_user("rui@mail.com", "4321")
+    for _ in range(1000):
+        wallet.transfer("ana@mail.com", "rui@mail.com", 0.1)
+        wallet.transfer("rui@mail.com", "ana@mail.com", 0.07)
+    total = sum(u.balance_mc for u in wallet.users_db.values())
+    assert total == 200_000_000
+    assert wallet.users_db["ana@mail.com"].balance == 970.0
+
+
+def test_sub_millicent_amounts_are_rejected():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 1.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    assert wallet.deposit("ana@mail.com", 0.000001).success is False
+    assert wallet.withdraw("ana@mail.com", 0.000001).success is False
+    assert wallet.users_db["ana@mail.com"].balance_mc == 100_000
+
+
+def test_non_finite_and_huge_amounts_are_rejected():
+    for amount in (float("inf"), float("nan"), 1e300):
+        with pytest.raises(ValueError):
+            wallet.to_millicents(amount)
+        assert wallet.register_user("Ana", "ana@mail.com", "1234", amount).reason is wallet.Reason.INVALID_INPUT
+    wallet.register_user("Ana", "ana@mail.com", "1234", 1.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 1.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    wallet.authenticate_user("rui@mail.com", "4321")
+    assert wallet.deposit("ana@mail.com", float("inf")).reason is wallet.Reason.INVALID_AMOUNT
+    assert wallet.transfer("ana@mail.com", "rui@mail.com", float("inf")).reason is wallet.Reason.INVALID_AMOUNT
+    assert wallet.transfer_batch([("ana@mail.com", "rui@mail.com", 1e300)])[0].reason is wallet.Reason.INVALID_AMOUNT
+    assert wallet.users_db["ana@mail.com"].balance_mc == 100_000
+
+
+def test_user_balance_is_keyword_only():
+    with pytest.raises(TypeError):
+        wallet.User("Ana", "ana@mail.com", "1234", 10.0)
+    assert wallet.User("Ana", "ana@mail.com", "1234", balance_mc=1_000_000).balance == 10.0
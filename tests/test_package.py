@@ -0,0 +1,61 @@
+import sys
+import os
+import subprocess
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _loaded_after(code):
+    script = (code + "\nimport sys\n"
+              "print(' '.join(sorted(m for m in sys.modules if m.startswith('digitalWalletSystem.'))))")
+    result = subprocess.run([sys.executable, "-c", script], env=dict(os.environ, PYTHONPATH=SRC),
+                            capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def test_submodules_load_on_first_use():
+    assert _loaded_after("import digitalWalletSystem") == []
+    assert _loaded_after("import digitalWalletSystem as w; w.to_millicents(1.0)") == ["digitalWalletSystem.money"]
+    assert "digitalWalletSystem.engine" not in _loaded_after("import digitalWalletSystem as w; w.Reason.OK")
+    loaded = _loaded_after("import digitalWalletSystem as w; w.register_user('Ana', 'ana@mail.com', '1234', 1.0)")
+    assert "digitalWalletSystem.engine" in loaded
+
+
+def test_wallet_instances_are_independent():
+    first, second = wallet.Wallet(), wallet.Wallet(lock_stripes=8)
+    first.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    second.register_user("Ana", "ana@mail.com", "4321", 5.0)
+    assert first.authenticate_user("ana@mail.com", "1234").success
+    assert not second.authenticate_user("ana@mail.com", "1234").success
+    assert first.deposit("ana@mail.com", 1.0).success
+
+    assert first.ledger_summary().total_balance == 101.0
+    assert second.ledger_summary().total_balance == 5.0
+    assert "ana@mail.com" not in wallet.users_db
+
+
+def test_module_functions_use_the_default_wallet():
+    default = wallet.default_wallet()
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    assert wallet.users_db is default.users_db
+    assert "ana@mail.com" in default.users_db
+    previous = wallet.use_store({})
+    assert wallet.users_db is default.users_db == {}
+    wallet.use_store(previous)
+
+
+def test_records_are_slotted():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    status = wallet.authenticate_user("ana@mail.com", "1234")
+    assert not hasattr(status, "__dict__") and not hasattr(wallet.users_db["ana@mail.com"], "__dict__")
+    assert wallet.deposit("ana@mail.com", 1.0)._asdict() == {
+        "success": True, "message": "Deposited $1.00 successfully.", "reason": wallet.Reason.OK}
+    assert status._replace(token=None) == wallet.LoginStatus(True, "Login successful.")
+    script = ("import sys, digitalWalletSystem as w; w.register_user('Ana', 'ana@mail.com', '1234', 1.0); "
+              "print('dataclasses' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", script], env=dict(os.environ, PYTHONPATH=SRC),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["False"]
@@ -0,0 +1,65 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+
+
+def _login(email, pin):
+    status = wallet.authenticate_user(email, pin)
+    assert status.success and status.token
+    return status.token
+
+
+def test_token_authorizes_operations_without_email():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 50.0)
+    token = _login("ana@mail.com", "1234")
+    _login("rui@mail.com", "4321")
+    wallet.users_db["ana@mail.com"].logged_in = False
+
+    assert wallet.deposit(None, 10.0, token=token).success
+    assert wallet.withdraw("ana@mail.com", 5.0, token=token).success
+    assert wallet.transfer(None, "rui@mail.com", 20.0, token=token).success
+    assert wallet.view_balance(None, token=token).balance == 85.0
+    assert not wallet.deposit("ana@mail.com", 10.0).success
+
+
+def test_invalid_or_mismatched_token_is_rejected():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 50.0)
+    token = _login("ana@mail.com", "1234")
+
+    assert wallet.deposit("rui@mail.com", 10.0, token=token).message == wallet.INVALID_SESSION
+    assert wallet.withdraw(None, 10.0, token="forged").message == wallet.INVALID_SESSION
+    assert wallet.end_session(token)
+    assert wallet.view_balance(None, token=token).message == wallet.INVALID_SESSION
+    assert wallet.users_db["rui@mail.com"].balance == 50.0
+
+
+def test_sessions_expire_and_are_bounded():
+    wallet.configure_sessions(ttl=0.0)
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    token = _login("ana@mail.com", "1234")
+    assert wallet.deposit(None, 10.0, token=token).message == wallet.INVALID_SESSION
+
+    wallet.configure_sessions(capacity=2)
+    tokens = [_login("ana@mail.com", "1234") for _ in range(3)]
+    assert wallet.view_balance(None, token=tokens[0]).message == wallet.INVALID_SESSION
+    assert wallet.view_balance(None, token=tokens[2]).balance == 100.0
+    assert len(wallet._sessions) == 2
+
+
+def test_ending_the_last_session_logs_the_account_out():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    first = _login("ana@mail.com", "1234")
+    second = _login("ana@mail.com", "1234")
+
+    assert wallet.end_session(first)
+    assert not wallet.end_session(first)
+    assert wallet.users_db["ana@mail.com"].logged_in
+    assert wallet.deposit("ana@mail.com", 10.0).success
+
+    assert wallet.end_session(second)
+    assert not wallet.users_db["ana@mail.com"].logged_in
+    assert not wallet.deposit("ana@mail.com", 10.0).success
@@ -0,0 +1,131 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+
+
+def _seed():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 50.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    wallet.authenticate_user("rui@mail.com", "4321")
+
+
+def _state(email):
+    user = wallet.users_db[email]
+    return user.balance_mc, list(user.transactions), list(user.notifications)
+
+
+def test_failed_step_rolls_back_every_mutation():
+    _seed()
+    before = _state("ana@mail.com"), _state("rui@mail.com"), wallet.ledger_summary()
+    seen = []
+    wallet.add_mutation_hook(lambda op, *args: seen.append(op))
+
+    with wallet.transaction() as tx:
+        tx.withdraw("ana@mail.com", 1.0)
+        tx.transfer("ana@mail.com", "rui@mail.com", 60.0)
+        tx.deposit("ana@mail.com", 0.5)
+        tx.transfer("ana@mail.com", "rui@mail.com", 60.0)
+        tx.deposit("ana@mail.com", 5.0)
+
+    assert not tx.committed
+    assert tx.status.reason is wallet.Reason.INSUFFICIENT_FUNDS
+    assert (_state("ana@mail.com"), _state("rui@mail.com"), wallet.ledger_summary()) == before
+    assert seen == []
+
+
+def test_commit_reports_mutations_in_order():
+    _seed()
+    seen = []
+    wallet.add_mutation_hook(lambda op, *args: seen.append((op,) + args))
+
+    with wallet.transaction(["ana@mail.com", "rui@mail.com"]) as tx:
+        wallet.withdraw("ana@mail.com", 1.0)
+        wallet.transfer("ana@mail.com", "rui@mail.com", 10.0)
+        assert seen == []
+
+    assert tx.committed
+    assert wallet.users_db["ana@mail.com"].balance == 89.0
+    assert wallet.users_db["rui@mail.com"].balance == 60.0
+    assert seen == [("withdraw", "ana@mail.com", 100_000),
+                    ("transfer", "ana@mail.com", "rui@mail.com", 1_000_000)]
+
+
+def test_exception_rolls_back_and_propagates():
+    _seed()
+    with pytest.raises(KeyError):
+        with wallet.transaction():
+            wallet.deposit("ana@mail.com", 10.0)
+            with wallet.transaction() as inner:
+                inner.apply_interest("ana@mail.com", 0.1)
+            raise KeyError("boom")
+    assert wallet.users_db["ana@mail.com"].balance == 100.0
+    assert len(wallet.users_db["ana@mail.com"].transactions) == 0
+    assert wallet.ledger_summary().total_balance == 150.0
+
+
+def test_rollback_restores_interest_accrual():
+    clock = [1_000_000]
+    wallet.configure_accrual(year_seconds=100, clock=lambda: clock[0])
+    _seed()
+    clock[0] += 10
+    user = wallet.users_db["ana@mail.com"]
+    accrual = user.accrued_at, user.accrual_carry
+
+    with wallet.transaction(["ana@mail.com"]) as tx:
+        tx.deposit("ana@mail.com", 10.0)
+        tx.withdraw("ana@mail.com", 500.0)
+
+    assert not tx.committed
+    assert (user.balance_mc, user.accrued_at, user.accrual_carry) == (100 * wallet.MILLICENTS_PER_DOLLAR,) + accrual
+    assert wallet.view_balance("ana@mail.com").balance == 100.5
+
+
+def test_rollback_undoes_a_batch_and_commit_reports_its_transfers():
+    _seed()
+    before = _state("ana@mail.com"), _state("rui@mail.com"), wallet.ledger_summary()
+    seen = []
+    wallet.add_mutation_hook(lambda op, *args: seen.append((op, *args)))
+
+    with wallet.transaction() as tx:
+        tx.transfer_batch([("ana@mail.com", "rui@mail.com", 10.0), ("rui@mail.com", "ana@mail.com", 4.0)])
+        tx.withdraw("rui@mail.com", 500.0)
+    assert not tx.committed
+    assert (_state("ana@mail.com"), _state("rui@mail.com"), wallet.ledger_summary()) == before
+    assert seen == []
+
+    with wallet.transaction() as tx:
+        tx.transfer_batch([("ana@mail.com", "rui@mail.com", 10.0), ("rui@mail.com", "ana@mail.com", 4.0)])
+    assert tx.committed
+    assert wallet.users_db["ana@mail.com"].balance == 94.0
+    assert seen == [("transfer", "ana@mail.com", "rui@mail.com", 1_000_000),
+                    ("transfer", "rui@mail.com", "ana@mail.com", 400_000)]
+
+
+def test_operations_are_confined_to_the_listed_accounts():
+    _seed()
+    wallet.register_user("Eva", "eva@mail.com", "1111", 10.0)
+    wallet.authenticate_user("eva@mail.com", "1111")
+    before = _state("ana@mail.com"), _state("eva@mail.com")
+
+    with pytest.raises(RuntimeError):
+        with wallet.transaction(["ana@mail.com", "rui@mail.com"]) as tx:
+            tx.transfer("ana@mail.com", "rui@mail.com", 5.0)
+            tx.deposit("eva@mail.com", 5.0)
+    assert (_state("ana@mail.com"), _state("eva@mail.com")) == before
+
+
+def test_registration_inside_a_transaction_is_refused():
+    _seed()
+    with pytest.raises(RuntimeError):
+        with wallet.transaction(["ana@mail.com"]):
+            wallet.register_user("Eva", "eva@mail.com", "1111", 10.0)
+    with pytest.raises(RuntimeError):
+        with wallet.transaction():
+            wallet.apply_interest_all(0.1)
+    assert "eva@mail.com" not in wallet.users_db
+    assert wallet.register_user("Eva", "eva@mail.com", "1111", 10.0).success
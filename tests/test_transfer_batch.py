@@ -0,0 +1,72 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+
+
+def _login(*accounts):
+    for name, email, balance in accounts:
+        wallet.register_user(name, email, "1234", balance)
+        wallet.authenticate_user(email, "1234")
+
+
+def test_batch_applies_net_amounts():
+    _login(("Ana", "ana@mail.com", 100.0), ("Rui", "rui@mail.com", 0.0), ("Eva", "eva@mail.com", 10.0))
+    results = wallet.transfer_batch([
+        ("ana@mail.com", "rui@mail.com", 60.0),
+        ("rui@mail.com", "eva@mail.com", 50.0),
+        ("eva@mail.com", "ana@mail.com", 5.0),
+    ])
+    assert all(r.success for r in results)
+    assert wallet.users_db["ana@mail.com"].balance == 45.0
+    assert wallet.users_db["rui@mail.com"].balance == 10.0
+    assert wallet.users_db["eva@mail.com"].balance == 55.0
+    assert len(wallet.users_db["rui@mail.com"].transactions) == 1
+
+
+def test_invalid_item_rejects_whole_batch():
+    _login(("Ana", "ana@mail.com", 100.0), ("Rui", "rui@mail.com", 0.0))
+    results = wallet.transfer_batch([
+        ("ana@mail.com", "rui@mail.com", 10.0),
+        ("ana@mail.com", "ghost@mail.com", 10.0),
+        ("ana@mail.com", "ana@mail.com", 10.0),
+    ])
+    assert [r.message for r in results] == [
+        "Batch rejected; no transfers were applied.",
+        "Sender or receiver does not exist.",
+        "Cannot transfer to self.",
+    ]
+    assert wallet.users_db["ana@mail.com"].balance == 100.0
+    assert wallet.users_db["rui@mail.com"].balance == 0.0
+
+
+def test_net_overdraft_is_rejected():
+    _login(("Ana", "ana@mail.com", 10.0), ("Rui", "rui@mail.com", 0.0))
+    results = wallet.transfer_batch([
+        ("ana@mail.com", "rui@mail.com", 8.0),
+        ("ana@mail.com", "rui@mail.com", 8.0),
+    ])
+    assert not any(r.success for r in results)
+    assert results[0].message == "Insufficient funds or invalid amount."
+    assert wallet.users_db["ana@mail.com"].balance == 10.0
+
+
+def test_batch_emits_one_hook_call_per_item():
+    _login(("Ana", "ana@mail.com", 10.0), ("Rui", "rui@mail.com", 0.0))
+    seen = []
+    wallet.add_mutation_hook(lambda op, *args: seen.append((op, args)))
+    wallet.transfer_batch([("ana@mail.com", "rui@mail.com", 1.0)] * 3)
+    assert seen == [("transfer", ("ana@mail.com", "rui@mail.com", 100_000))] * 3
+
+
+def test_shared_results_are_read_only():
+    _login(("Ana", "ana@mail.com", 100.0), ("Rui", "rui@mail.com", 0.0))
+    first = wallet.transfer_batch([("ana@mail.com", "rui@mail.com", 1.0)])[0]
+    with pytest.raises(AttributeError):
+        first.success = False
+    assert first == wallet.TransferStatus(True, "Transfer applied.")
+    assert first._replace(message="changed").message == "changed"
+    assert wallet.transfer_batch([("ana@mail.com", "rui@mail.com", 1.0)])[0].success
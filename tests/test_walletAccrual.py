@@ -0,0 +1,135 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletAccrual
+import walletColumnar
+import walletJournal
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _accruing(year_seconds=100):
+    clock = FakeClock()
+    wallet.configure_accrual(year_seconds=year_seconds, clock=clock)
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    return clock
+
+
+def test_view_balance_includes_pending_interest_without_settling():
+    clock = _accruing()
+    clock.now += 10
+
+    info = wallet.view_balance("ana@mail.com")
+    assert info.balance == 100.5
+    assert info.pending_interest == 0.5
+    assert wallet.users_db["ana@mail.com"].balance == 100.0
+    assert wallet.ledger_summary().total_balance == 100.0
+
+
+def test_mutation_settles_exactly_with_carry():
+    clock = _accruing(year_seconds=3)
+    clock.now += 1
+    # 100 * 0.05 / 3 = 1.66666... dollars; the sub-millicent rest is carried
+    assert wallet.deposit("ana@mail.com", 1.0).success
+    user = wallet.users_db["ana@mail.com"]
+    assert user.balance_mc == 101 * wallet.MILLICENTS_PER_DOLLAR + 166_666
+    assert user.accrual_carry == 100 * wallet.MILLICENTS_PER_DOLLAR * 50_000_000 % 3_000_000_000
+    clock.now += 2
+    interest, _ = divmod(user.balance_mc * 50_000_000 * 2 + user.accrual_carry, 3_000_000_000)
+    expected = user.balance_mc + interest - wallet.MILLICENTS_PER_DOLLAR
+    assert wallet.withdraw("ana@mail.com", 1.0).success
+    assert user.balance_mc == expected
+    assert wallet.ledger_summary().total_balance == user.balance
+
+
+def test_accrual_is_journaled_and_replayed(tmp_path):
+    journal = walletJournal.open_journal(str(tmp_path))
+    clock = _accruing()
+    clock.now += 10
+    wallet.deposit("ana@mail.com", 1.0)
+    journal.snapshot()
+    clock.now += 7
+    wallet.withdraw("ana@mail.com", 1.0)
+    user = wallet.users_db["ana@mail.com"]
+    expected = (user.balance_mc, user.accrued_at, user.accrual_carry)
+    journal.close()
+
+    wallet.users_db.clear()
+    journal = walletJournal.open_journal(str(tmp_path))
+    user = wallet.users_db["ana@mail.com"]
+    assert (user.balance_mc, user.accrued_at, user.accrual_carry) == expected
+    journal.close()
+
+
+def test_compactor_settles_when_quiet():
+    clock = _accruing()
+    for i in range(5):
+        wallet.register_user("User", f"user{i}@mail.com", "1234", 10.0)
+    clock.now += 10
+
+    compactor = walletAccrual.AccrualCompactor(batch=2, idle=0.0)
+    wallet.add_mutation_hook(compactor.record)
+    assert compactor.compact() == 6
+    assert wallet.users_db["ana@mail.com"].balance == 100.5
+    assert wallet.users_db["user0@mail.com"].balance == 10.05
+
+    compactor.idle = 3600.0
+    wallet.deposit("ana@mail.com", 1.0)
+    assert compactor.compact() == 0
+    compactor.close()
+
+
+def test_compactor_passes_once_per_quiet_period():
+    clock = _accruing()
+    wallet.register_user("Zed", "zed@mail.com", "1234", 0.0)
+    events = []
+    wallet.add_mutation_hook(lambda op, *args: events.append((op,) + args))
+    clock.now += 10
+
+    compactor = walletAccrual.AccrualCompactor(idle=0.0)
+    wallet.add_mutation_hook(compactor.record)
+    assert compactor.compact() == 1
+    assert [event[:3] for event in events] == [("accrue", "ana@mail.com", 50_000)]
+    assert wallet.users_db["zed@mail.com"].accrued_at == clock.now - 10
+
+    clock.now += 10
+    assert compactor.compact() == 0
+    assert len(events) == 1
+
+    wallet.authenticate_user("zed@mail.com", "1234")
+    assert wallet.deposit("zed@mail.com", 1.0).success
+    clock.now += 10
+    assert compactor.compact() == 2
+    compactor.close()
+
+
+def test_enabling_accrual_starts_existing_accounts():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    clock = FakeClock()
+    wallet.configure_accrual(year_seconds=100, clock=clock)
+    assert wallet.users_db["ana@mail.com"].accrued_at == clock.now
+
+    clock.now += 10
+    assert wallet.view_balance("ana@mail.com").pending_interest == 0.5
+
+
+def test_columnar_accounts_accrue_from_registration():
+    store = walletColumnar.ColumnarStore()
+    previous = wallet.use_store(store)
+    try:
+        clock = _accruing()
+        assert wallet.users_db["ana@mail.com"].accrued_at == clock.now
+        clock.now += 10
+        assert wallet.view_balance("ana@mail.com").pending_interest == 0.5
+    finally:
+        wallet.use_store(previous)
@@ -0,0 +1,118 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import asyncio
+
+import pytest
+
+import digitalWalletSystem as wallet
+import walletAsync
+
+
+def test_async_wallet_runs_on_its_target():
+    target = wallet.Wallet()
+
+    async def scenario():
+        async with walletAsync.AsyncWallet(target=target) as aw:
+            assert (await aw.register_user("Ana", "ana@mail.com", "1234", 100.0)).success
+            token = (await aw.authenticate_user("ana@mail.com", "1234")).token
+            assert (await aw.escrow_debit("tx-1", None, "rui@mail.com", 1_000_000, token=token)).success
+            return await aw.pending_escrows()
+
+    assert asyncio.run(scenario()) == {"tx-1": ("ana@mail.com", "rui@mail.com", 1_000_000)}
+    assert target.users_db["ana@mail.com"].balance == 90.0
+    assert "ana@mail.com" not in wallet.users_db
+
+
+def test_async_operations_match_sync_results():
+    async def scenario():
+        async with walletAsync.AsyncWallet() as aw:
+            assert (await aw.register_user("Ana", "ana@mail.com", "1234", 100.0)).success
+            assert (await aw.register_user("Rui", "rui@mail.com", "4321", 0.0)).success
+            assert (await aw.authenticate_user("ana@mail.com", "1234")).success
+            assert (await aw.authenticate_user("rui@mail.com", "4321")).success
+            assert (await aw.deposit("ana@mail.com", 10.0)).success
+            assert (await aw.transfer("ana@mail.com", "rui@mail.com", 30.0)).success
+            assert (await aw.withdraw("rui@mail.com", 5.0)).success
+            assert not (await aw.withdraw("rui@mail.com", 500.0)).success
+            return await aw.view_balance("ana@mail.com")
+
+    info = asyncio.run(scenario())
+    assert info.balance == 80.0
+    assert wallet.users_db["rui@mail.com"].balance == 25.0
+
+
+def test_concurrent_requests_are_coalesced_into_batches():
+    async def scenario():
+        aw = walletAsync.AsyncWallet(max_pending=64, max_batch=32)
+        aw.start()
+        await aw.register_user("Ana", "ana@mail.com", "1234", 0.0)
+        await aw.authenticate_user("ana@mail.com", "1234")
+        results = await asyncio.gather(*(aw.deposit("ana@mail.com", 1.0) for _ in range(1000)))
+        await aw.close()
+        return aw, results
+
+    aw, results = asyncio.run(scenario())
+    assert all(r.success for r in results)
+    assert wallet.users_db["ana@mail.com"].balance == 1000.0
+    assert aw.requests == 1002
+    assert aw.batches < 100
+
+
+def test_close_finishes_queued_requests():
+    async def scenario():
+        aw = walletAsync.AsyncWallet()
+        aw.start()
+        pending = [asyncio.ensure_future(aw.register_user("User", f"u{i}@mail.com", "1234", 1.0))
+                   for i in range(50)]
+        await asyncio.sleep(0)
+        await aw.close()
+        return await asyncio.gather(*pending)
+
+    results = asyncio.run(scenario())
+    assert all(r.success for r in results)
+    assert len(wallet.users_db) == 50
+
+
+def test_history_sessions_and_ledger_are_awaitable():
+    async def scenario():
+        async with walletAsync.AsyncWallet() as aw:
+            await aw.register_user("Ana", "ana@mail.com", "1234", 100.0)
+            token = (await aw.authenticate_user("ana@mail.com", "1234")).token
+            await aw.deposit(None, 5.0, token)
+            page = await aw.view_history(None, token=token)
+            summary = await aw.ledger_summary()
+            ended = await aw.end_session(token)
+            return page, summary, ended, await aw.pending_escrows()
+
+    page, summary, ended, escrows = asyncio.run(scenario())
+    assert page.entries == ["Deposited $5.00"]
+    assert summary.total_balance == 105.0
+    assert ended and escrows == {}
+
+
+def test_submit_requires_a_running_wallet():
+    async def scenario():
+        aw = walletAsync.AsyncWallet()
+        with pytest.raises(RuntimeError):
+            await aw.view_balance("ana@mail.com")
+        aw.start()
+        await aw.close()
+        with pytest.raises(RuntimeError):
+            await aw.view_balance("ana@mail.com")
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+def test_requests_waiting_for_room_fail_after_close():
+    async def scenario():
+        aw = walletAsync.AsyncWallet(max_pending=1, max_batch=1)
+        aw.start()
+        calls = [asyncio.ensure_future(aw.view_balance("ana@mail.com")) for _ in range(5)]
+        await asyncio.sleep(0)
+        await aw.close()
+        return await asyncio.gather(*calls, return_exceptions=True)
+
+    results = asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert all(isinstance(r, (wallet.BalanceInfo, RuntimeError)) for r in results)
@@ -0,0 +1,73 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletBulk
+
+
+def test_import_reports_bad_rows_and_duplicates(tmp_path):
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    source = tmp_path / "accounts.csv"
+    source.write_text(
+        "name,email,pin,balance\n"
+        "Rui,rui@mail.com,4321,50.25\n"
+        "Ana,ana@mail.com,1234,10\n"
+        "Eva,eva-at-mail,1111,10\n"
+        "Rui,rui@mail.com,4321,50\n"
+        "Leo,leo@mail.com,12a4,10\n"
+        "Mia,mia@mail.com,2222,-1\n"
+        "Zoe,zoe@mail.com,3333,0,0.1\n"
+    )
+    errors = tmp_path / "errors.csv"
+    summary = walletBulk.import_accounts(str(source), str(errors), chunk_size=2)
+
+    assert (summary.imported, summary.rejected) == (2, 5)
+    assert wallet.users_db["rui@mail.com"].balance_mc == 5_025_000
+    assert wallet.users_db["zoe@mail.com"].interest_rate == 0.1
+    assert wallet.ledger_summary().accounts == 3
+    lines = errors.read_text().splitlines()
+    assert lines[0] == "line,email,reason"
+    assert lines[1:3] == ["3,ana@mail.com,User already exists.", "4,eva-at-mail,Invalid registration input."]
+    assert lines[3] == "5,rui@mail.com,User already exists."
+
+
+def test_export_round_trips(tmp_path):
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 0.00001)
+    path = tmp_path / "export.csv"
+    assert walletBulk.export_accounts(str(path), chunk_size=1) == 2
+    before = {email: user.balance_mc for email, user in wallet.users_db.items()}
+
+    wallet.users_db.clear()
+    wallet.rebuild_ledger()
+    events = []
+    wallet.add_mutation_hook(lambda op, *args: events.append(op))
+    assert walletBulk.import_accounts(str(path)).imported == 2
+    assert {email: user.balance_mc for email, user in wallet.users_db.items()} == before
+    assert events == ["register", "register"]
+
+
+def test_import_rejects_balances_that_are_not_finite_amounts(tmp_path):
+    source = tmp_path / "accounts.csv"
+    source.write_text(
+        "name,email,pin,balance\n"
+        "Ana,ana@mail.com,1234,inf\n"
+        "Rui,rui@mail.com,4321,nan\n"
+        "Eva,eva@mail.com,1111,1e300\n"
+        "Leo,leo@mail.com,2222\n"
+        "Mia,mia@mail.com,3333,1.5,2\n"
+        "Zoe,zoe@mail.com,4444,1.5\n"
+    )
+    errors = tmp_path / "errors.csv"
+    summary = walletBulk.import_accounts(str(source), str(errors))
+
+    assert (summary.imported, summary.rejected) == (1, 5)
+    assert list(wallet.users_db) == ["zoe@mail.com"]
+    assert errors.read_text().splitlines()[1:] == [
+        "2,ana@mail.com,Invalid registration input.",
+        "3,rui@mail.com,Invalid registration input.",
+        "4,eva@mail.com,Invalid registration input.",
+        "5,leo@mail.com,Missing columns.",
+        "6,mia@mail.com,Invalid registration input.",
+    ]
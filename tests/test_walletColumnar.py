@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+import walletColumnar
+
+
+@pytest.fixture
+def store():
+    store = walletColumnar.ColumnarStore()
+    previous = wallet.use_store(store)
+    yield store
+    wallet.use_store(previous)
+
+
+def test_operations_work_on_columnar_store(store):
+    assert wallet.users_db == {}
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 0.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    wallet.authenticate_user("rui@mail.com", "4321")
+    assert wallet.deposit("ana@mail.com", 20.0).success
+    assert wallet.transfer("ana@mail.com", "rui@mail.com", 50.0).success
+    assert wallet.withdraw("rui@mail.com", 10.0).success
+    info = wallet.view_balance("ana@mail.com")
+    assert info.balance == 70.0
+    assert info.transactions == ["Deposited $20.00", "Transferred $50.00 to rui@mail.com"]
+    assert store.balance_mc[store.slot_of("rui@mail.com")] == 4_000_000
+
+
+def test_lockout_is_stored_in_columns(store):
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    for _ in range(5):
+        wallet.authenticate_user("ana@mail.com", "0000")
+    assert store["ana@mail.com"].locked is True
+    assert store.login_attempts[store.slot_of("ana@mail.com")] == 5
+
+
+def test_deleted_slots_are_reused(store):
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    slot = store.slot_of("ana@mail.com")
+    del store["ana@mail.com"]
+    assert "ana@mail.com" not in store
+    wallet.register_user("Rui", "rui@mail.com", "4321", 5.0)
+    assert store.slot_of("rui@mail.com") == slot
+    assert store["rui@mail.com"].balance == 5.0
+    assert store["rui@mail.com"].transactions == []
+
+
+def test_bulk_interest_uses_columns(store):
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 0.0)
+    summary = wallet.apply_interest_all(0.5)
+    assert summary.accounts_credited == 1
+    assert summary.accounts_skipped == 1
+    assert store["ana@mail.com"].balance == 150.0
+
+
+def test_view_matches_equivalent_user(store):
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    assert store["ana@mail.com"] == wallet.User("Ana", "ana@mail.com", "1234", balance_mc=10_000_000)
+
+
+def test_reading_histories_creates_none(store):
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    view = store["ana@mail.com"]
+    assert view.transactions == [] and view.notifications.total == 0
+    assert wallet.view_balance("ana@mail.com").transactions == []
+    assert store.transactions == {} and store.notifications == {}
+    wallet.deposit("ana@mail.com", 1.0)
+    assert view.transactions == ["Deposited $1.00"]
+    assert len(store.transactions) == 1
+
+
+def test_stale_view_does_not_reach_the_next_account(store):
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    token = wallet.authenticate_user("ana@mail.com", "1234").token
+    stale = store["ana@mail.com"]
+    del store["ana@mail.com"]
+    wallet.register_user("Rui", "rui@mail.com", "4321", 5.0)
+    with pytest.raises(KeyError):
+        stale.balance_mc
+    with pytest.raises(KeyError):
+        wallet.deposit(None, 1.0, token=token)
+    assert store["rui@mail.com"].balance == 5.0
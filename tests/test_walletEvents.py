@@ -0,0 +1,56 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletEvents
+
+
+def _seed():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 50.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    wallet.authenticate_user("rui@mail.com", "4321")
+    wallet.deposit("ana@mail.com", 25.0)
+    wallet.transfer("ana@mail.com", "rui@mail.com", 40.0)
+    wallet.withdraw("rui@mail.com", 10.0)
+
+
+def test_mutations_become_typed_events():
+    stream = walletEvents.open_stream(64)
+    _seed()
+    events = stream.subscribe().poll()
+
+    assert [e.kind for e in events] == ["register", "register", "login", "login", "deposit", "transfer", "withdraw"]
+    assert [e.offset for e in events] == list(range(7))
+    assert events[2].email == "ana@mail.com"
+    transfer = events[5]
+    assert (transfer.email, transfer.counterparty, transfer.amount) == ("ana@mail.com", "rui@mail.com", 40.0)
+    assert "1234" not in events[0]
+
+
+def test_subscription_is_at_least_once_and_reports_gaps():
+    stream = walletEvents.open_stream(4)
+    subscription = stream.subscribe()
+    _seed()
+
+    assert [e.offset for e in subscription.poll(2)] == [3, 4]
+    assert subscription.missed == 3
+    subscription.rewind()
+    assert [e.offset for e in subscription.poll(2)] == [3, 4]
+    subscription.commit()
+    assert [e.offset for e in subscription.poll()] == [5, 6]
+    assert subscription.poll() == []
+
+
+def test_file_sink_writes_json_lines(tmp_path):
+    stream = walletEvents.open_stream(64)
+    path = tmp_path / "events.jsonl"
+    sink = walletEvents.FileSink(stream.subscribe(), str(path))
+    _seed()
+    sink.close()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["kind"] for line in lines] == ["register", "register", "login", "login", "deposit", "transfer", "withdraw"]
+    assert sink.subscription.committed == 7
@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletIndex
+
+
+def _seed():
+    wallet.register_user("Ana Silva", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 50.0)
+    wallet.register_user("anabela", "bela@mail.com", "1111", 5_000.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    wallet.authenticate_user("rui@mail.com", "4321")
+
+
+def _scan(low, high):
+    users = sorted(wallet.users_db.values(), key=lambda u: (u.balance_mc, u.email))
+    return [u.email for u in users if low <= u.balance <= high]
+
+
+def test_indexes_follow_mutations():
+    _seed()
+    index = walletIndex.open_index()
+    wallet.register_user("Zoe", "zoe@mail.com", "2222", 75.0)
+    wallet.authenticate_user("zoe@mail.com", "2222")
+    wallet.transfer("ana@mail.com", "rui@mail.com", 60.0)
+    wallet.deposit("zoe@mail.com", 25.0)
+    wallet.withdraw("rui@mail.com", 10.0)
+    wallet.apply_interest_all()
+    for _ in range(wallet.MAX_LOGIN_ATTEMPTS):
+        wallet.authenticate_user("bela@mail.com", "0000")
+
+    assert index.balance_range(50.0, 200.0) == _scan(50.0, 200.0)
+    assert index.balance_range() == _scan(0, 1e12)
+    assert index.balance_range(100.0, limit=1) == _scan(100.0, 1e12)[:1]
+    assert index.locked() == ["bela@mail.com"]
+    assert sorted(index.logged_in()) == ["ana@mail.com", "rui@mail.com", "zoe@mail.com"]
+    assert index.by_name("ANA") == ["ana@mail.com", "bela@mail.com"]
+    assert index.by_name("anab") == ["bela@mail.com"]
+    assert index.by_name("x") == []
+
+    index.close()
+    wallet.deposit("zoe@mail.com", 1_000.0)
+    assert index.balance_range(1_000.0) == ["bela@mail.com"]
+
+
+def test_rolled_back_transaction_leaves_index_unchanged():
+    _seed()
+    index = walletIndex.open_index()
+    with wallet.transaction() as tx:
+        tx.deposit("ana@mail.com", 1_000.0)
+        tx.withdraw("rui@mail.com", 1_000.0)
+    assert not tx.committed
+    assert index.balance_range(1_000.0) == ["bela@mail.com"]
+
+
+def test_sorted_keys_split_and_merge_buckets(monkeypatch):
+    monkeypatch.setattr(walletIndex, "BUCKET_SIZE", 4)
+    keys = walletIndex._SortedKeys()
+    for i in range(50):
+        keys.add(((i * 7) % 50, str(i)))
+    for i in range(0, 50, 3):
+        keys.remove(((i * 7) % 50, str(i)))
+    keys.move((1, "43"), (1, "43a"))
+    keys.move((48, "14"), (0, "14"))
+    keys.move((0, "14"), (48, "14"))
+    expected = sorted(((i * 7) % 50, str(i) + ("a" if i == 43 else "")) for i in range(50) if i % 3)
+    assert list(keys.irange(())) == expected
+    assert list(keys.irange((20,))) == [key for key in expected if key >= (20,)]
+    assert len(keys) == len(expected)
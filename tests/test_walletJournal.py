@@ -0,0 +1,169 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+import walletJournal
+
+
+def _seed():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 50.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    wallet.authenticate_user("rui@mail.com", "4321")
+    wallet.deposit("ana@mail.com", 25.0)
+    wallet.transfer("ana@mail.com", "rui@mail.com", 40.0)
+    wallet.withdraw("rui@mail.com", 10.0)
+
+
+def test_recovery_replays_log(tmp_path):
+    journal = walletJournal.open_journal(str(tmp_path))
+    _seed()
+    journal.close()
+
+    wallet.users_db.clear()
+    journal = walletJournal.open_journal(str(tmp_path))
+    assert wallet.users_db["ana@mail.com"].balance == 85.0
+    assert wallet.users_db["rui@mail.com"].balance == 80.0
+    assert wallet.users_db["ana@mail.com"].logged_in is False
+    journal.close()
+
+
+def test_journal_targets_its_own_wallet(tmp_path):
+    target = wallet.Wallet()
+    journal = walletJournal.open_journal(str(tmp_path), target=target)
+    target.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 50.0)
+    journal.snapshot()
+    target.register_user("Eva", "eva@mail.com", "1111", 5.0)
+    journal.close()
+
+    recovered = wallet.Wallet()
+    journal = walletJournal.open_journal(str(tmp_path), target=recovered)
+    assert sorted(recovered.users_db) == ["ana@mail.com", "eva@mail.com"]
+    assert recovered.users_db["ana@mail.com"].balance == 100.0
+    assert recovered.ledger_summary().total_balance == 105.0
+    assert list(wallet.users_db) == ["rui@mail.com"]
+    journal.close()
+
+
+def test_snapshot_blocks_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(walletJournal, "ACCOUNT_BLOCK", 2)
+    journal = walletJournal.open_journal(str(tmp_path))
+    wallet.register_user("Zoë", "zoe@mail.com", "1234", 1.0)
+    for i in range(4):
+        wallet.register_user("User", f"user{i}@mail.com", "1234", float(i))
+    journal.snapshot()
+    journal.close()
+
+    wallet.users_db.clear()
+    journal = walletJournal.open_journal(str(tmp_path))
+    assert len(wallet.users_db) == 5
+    assert wallet.users_db["zoe@mail.com"].name == "Zoë"
+    assert wallet.users_db["user3@mail.com"].balance == 3.0
+    journal.close()
+
+
+def test_group_commit_defers_fsync(tmp_path):
+    journal = walletJournal.open_journal(str(tmp_path), sync_every=1000, sync_interval=3600)
+    _seed()
+    assert os.path.getsize(journal._segment_path(journal.generation)) == 0
+    journal.commit()
+    assert os.path.getsize(journal._segment_path(journal.generation)) > 0
+    journal.close()
+
+
+def test_snapshot_compacts_segments(tmp_path):
+    journal = walletJournal.open_journal(str(tmp_path), snapshot_every=3)
+    _seed()
+    wallet.deposit("rui@mail.com", 5.0)
+    journal.close()
+    assert len(journal._segments()) == 1
+
+    wallet.users_db.clear()
+    journal = walletJournal.open_journal(str(tmp_path))
+    assert wallet.users_db["ana@mail.com"].balance == 85.0
+    assert wallet.users_db["rui@mail.com"].balance == 85.0
+    journal.close()
+
+
+def test_tampered_snapshot_is_refused(tmp_path):
+    journal = walletJournal.open_journal(str(tmp_path), snapshot_every=3)
+    _seed()
+    wallet.escrow_debit("tx-1", "rui@mail.com", "eva@mail.com", 1_000_000)
+    journal.close()
+    path = tmp_path / walletJournal.SNAPSHOT_NAME
+    data = path.read_bytes()
+
+    wallet.users_db.clear()
+    wallet._escrows.clear()
+    journal = walletJournal.open_journal(str(tmp_path))
+    assert wallet.users_db["rui@mail.com"].balance == 70.0
+    assert wallet.pending_escrows() == {"tx-1": ("rui@mail.com", "eva@mail.com", 1_000_000)}
+    journal.close()
+
+    for tampered in (data[:-1], data[:40] + bytes((data[40] ^ 1,)) + data[41:], b"\x80\x05N."):
+        path.write_bytes(tampered)
+        with pytest.raises(ValueError):
+            walletJournal.open_journal(str(tmp_path))
+
+
+def test_torn_tail_is_discarded(tmp_path):
+    journal = walletJournal.open_journal(str(tmp_path))
+    _seed()
+    journal.close()
+    path = journal._segment_path(journal.generation)
+    with open(path, "ab") as f:
+        f.write(walletJournal.encode_record("deposit", "ana@mail.com", 100_000)[:-3])
+
+    wallet.users_db.clear()
+    journal = walletJournal.open_journal(str(tmp_path))
+    assert wallet.users_db["ana@mail.com"].balance == 85.0
+    journal.close()
+    assert os.path.getsize(path) == len(open(path, "rb").read())
+
+
+def test_lockout_is_durable(tmp_path):
+    journal = walletJournal.open_journal(str(tmp_path))
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    for _ in range(5):
+        wallet.authenticate_user("ana@mail.com", "0000")
+    journal.close()
+
+    wallet.users_db.clear()
+    journal = walletJournal.open_journal(str(tmp_path))
+    assert wallet.users_db["ana@mail.com"].locked is True
+    journal.close()
+
+
+def test_interest_rate_is_durable(tmp_path):
+    journal = walletJournal.open_journal(str(tmp_path))
+    wallet._insert_account("Ana", "ana@mail.com", "1234", 100_000, 0.1)
+    journal.close()
+    path = journal._segment_path(journal.generation)
+    with open(path, "ab") as f:
+        # a registration logged before interest rates were
+        f.write(walletJournal.encode_record("register", "rui@mail.com", "Rui", "4321", 100_000,
+                                            ops={"register": (1, "sssq")}))
+
+    wallet.users_db.clear()
+    journal = walletJournal.open_journal(str(tmp_path))
+    assert wallet.users_db["ana@mail.com"].interest_rate == 0.1
+    assert wallet.users_db["rui@mail.com"].interest_rate == wallet.DEFAULT_INTEREST_RATE
+    journal.close()
+
+
+def test_escrow_end_forgets_credited_txid(tmp_path):
+    journal = walletJournal.open_journal(str(tmp_path))
+    _seed()
+    wallet.escrow_credit("tx-1", "rui@mail.com", "eva@mail.com", 100_000)
+    wallet.escrow_credit("tx-2", "rui@mail.com", "eva@mail.com", 100_000)
+    wallet.escrow_end("tx-1")
+    journal.close()
+
+    wallet.users_db.clear()
+    journal = walletJournal.open_journal(str(tmp_path))
+    assert wallet.default_wallet()._escrow_credited == {"tx-2"}
+    journal.close()
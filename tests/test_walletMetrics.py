@@ -0,0 +1,83 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import digitalWalletSystem as wallet
+import walletMetrics
+
+
+def test_statuses_carry_reasons():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 50.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+
+    assert wallet.transfer("ana@mail.com", "rui@mail.com", 10.0).reason is wallet.Reason.NOT_LOGGED_IN
+    assert wallet.transfer("ana@mail.com", "eva@mail.com", 10.0).reason is wallet.Reason.USER_NOT_FOUND
+    wallet.authenticate_user("rui@mail.com", "4321")
+    assert wallet.transfer("ana@mail.com", "rui@mail.com", 500.0).reason is wallet.Reason.INSUFFICIENT_FUNDS
+    assert wallet.transfer("ana@mail.com", "rui@mail.com", 10.0).reason is wallet.Reason.OK
+    assert wallet.authenticate_user("rui@mail.com", "0000").reason is wallet.Reason.WRONG_PIN
+    assert wallet.view_balance("eva@mail.com").reason is wallet.Reason.USER_NOT_FOUND
+
+
+def test_enable_counts_outcomes_and_disable_restores():
+    original = wallet.deposit
+    walletMetrics.enable()
+    try:
+        wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+        wallet.deposit("ana@mail.com", 5.0)
+        wallet.authenticate_user("ana@mail.com", "1234")
+        wallet.deposit("ana@mail.com", 5.0)
+        wallet.deposit("ana@mail.com", -1.0)
+        metrics = walletMetrics.snapshot()["deposit"]
+    finally:
+        walletMetrics.disable()
+        walletMetrics.reset()
+
+    assert wallet.deposit == original
+    assert metrics.calls == 3 and sum(metrics.buckets) == 3
+    assert metrics.outcomes == {wallet.Reason.NOT_LOGGED_IN: 1, wallet.Reason.OK: 1,
+                                wallet.Reason.INVALID_AMOUNT: 1}
+
+
+def test_prometheus_text_export(tmp_path):
+    walletMetrics.enable(["deposit"])
+    try:
+        wallet.deposit("eva@mail.com", 5.0)
+        path = tmp_path / "metrics.prom"
+        exporter = walletMetrics.TextFileExporter(str(path))
+        walletMetrics.add_exporter(exporter)
+        walletMetrics.export()
+    finally:
+        walletMetrics.remove_exporter(exporter)
+        walletMetrics.disable()
+        walletMetrics.reset()
+
+    text = path.read_text()
+    assert 'wallet_operations_total{operation="deposit",reason="user_not_found"} 1' in text
+    assert 'wallet_operation_seconds_bucket{operation="deposit",le="+Inf"} 1' in text
+    assert 'wallet_operation_seconds_count{operation="deposit"} 1' in text
+
+
+def test_reasons_do_not_depend_on_the_message():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 10.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 0.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    wallet.authenticate_user("rui@mail.com", "4321")
+    assert wallet.transfer("ana@mail.com", "rui@mail.com", -1.0).reason is wallet.Reason.INVALID_AMOUNT
+    assert wallet.withdraw("ana@mail.com", 50.0).reason is wallet.Reason.INSUFFICIENT_FUNDS
+    assert wallet.withdraw("ana@mail.com", 0.0).reason is wallet.Reason.INVALID_AMOUNT
+
+
+def test_every_wallet_is_measured():
+    tenant = wallet.Wallet()
+    walletMetrics.enable(["register_user"])
+    try:
+        tenant.register_user("Ana", "ana@mail.com", "1234", 1.0)
+        wallet.register_user("Ana", "ana@mail.com", "1234", 1.0)
+        tenant.register_user("Ana", "ana@mail.com", "1234", 1.0)
+        metrics = walletMetrics.snapshot()["register_user"]
+    finally:
+        walletMetrics.disable()
+        walletMetrics.reset()
+    assert metrics.outcomes == {wallet.Reason.OK: 2, wallet.Reason.USER_EXISTS: 1}
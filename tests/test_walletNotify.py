@@ -0,0 +1,137 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+import walletNotify
+
+
+def _seed():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 50.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+    wallet.authenticate_user("rui@mail.com", "4321")
+
+
+def _delivery(sink, **options):
+    # a long interval keeps the worker out of the way; the tests flush explicitly
+    return walletNotify.open_delivery(sink, interval=3600, **options)
+
+
+def test_notifications_are_delivered_in_batches():
+    _seed()
+    sink = walletNotify.QueueSink()
+    delivery = _delivery(sink, batch=2)
+    wallet.deposit("ana@mail.com", 25.0)
+    wallet.transfer("ana@mail.com", "rui@mail.com", 40.0)
+    wallet.withdraw("rui@mail.com", 10.0)
+
+    assert sink.queue.empty()
+    assert delivery.flush() == 4
+    batches = [sink.queue.get_nowait() for _ in range(sink.queue.qsize())]
+    assert [len(batch) for batch in batches] == [2, 2]
+    assert [n[:2] for n in batches[0]] == [
+        ("ana@mail.com", "Deposit successful. New balance: $125.00"),
+        ("ana@mail.com", "Transferred $40.00 to rui@mail.com. New balance: $85.00"),
+    ]
+    assert batches[1][0][:2] == ("rui@mail.com", "Received $40.00 from ana@mail.com. New balance: $90.00")
+    seqs = [n.seq for batch in batches for n in batch]
+    assert len(set(seqs)) == 4 and seqs[0] < seqs[1]
+    delivery.close()
+
+
+def test_repeats_are_delivered_and_outbox_is_bounded():
+    _seed()
+    batches = []
+    delivery = _delivery(batches.append, outbox_size=3)
+    wallet.deposit("ana@mail.com", 5.0)
+    wallet.withdraw("ana@mail.com", 5.0)
+    wallet.deposit("ana@mail.com", 5.0)
+    assert delivery.pending() == 3
+
+    for _ in range(4):
+        wallet.deposit("rui@mail.com", 1.0)
+    assert delivery.pending() == 6
+    assert delivery.dropped == 1
+    delivery.close()
+    texts = [n.text for batch in batches for n in batch]
+    assert texts.count("Deposit successful. New balance: $105.00") == 2
+    assert texts[-1] == "Deposit successful. New balance: $54.00"
+    assert len(texts) == 6
+
+
+def test_failed_batch_is_retried(tmp_path):
+    _seed()
+    sink = walletNotify.JsonLinesSink(str(tmp_path / "out.jsonl"))
+    calls = []
+
+    def flaky(batch):
+        calls.append(len(batch))
+        if len(calls) == 1:
+            raise OSError("sink down")
+        sink(batch)
+
+    delivery = _delivery(flaky)
+    wallet.deposit("ana@mail.com", 25.0)
+    with pytest.raises(OSError):
+        delivery.flush()
+    assert delivery.flush() == 1
+    delivery.close()
+    sink.close()
+    lines = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    assert [{k: v for k, v in line.items() if k != "seq"} for line in lines] == [
+        {"email": "ana@mail.com", "text": "Deposit successful. New balance: $125.00"}]
+    assert isinstance(lines[0]["seq"], int)
+
+
+def test_batches_before_a_failure_count_as_delivered():
+    _seed()
+    batches = []
+
+    def failing_second(batch):
+        if batches:
+            raise OSError("sink down")
+        batches.append(batch)
+
+    delivery = _delivery(failing_second, batch=1)
+    wallet.deposit("ana@mail.com", 25.0)
+    wallet.deposit("rui@mail.com", 5.0)
+    with pytest.raises(OSError):
+        delivery.flush()
+    assert delivery.delivered == 1
+    assert delivery.pending() == 1
+    delivery.sink = batches.append
+    delivery.close()
+    assert delivery.delivered == 2
+
+
+def test_rolled_back_notifications_are_not_delivered():
+    _seed()
+    batches = []
+    delivery = _delivery(batches.append)
+    with wallet.transaction() as tx:
+        tx.deposit("ana@mail.com", 25.0)
+        tx.withdraw("rui@mail.com", 500.0)
+    with wallet.transaction() as tx:
+        tx.deposit("rui@mail.com", 1.0)
+    delivery.close()
+    assert [n.email for batch in batches for n in batch] == ["rui@mail.com"]
+
+
+def test_delivery_attaches_to_the_given_wallet_and_forgets_drained_users():
+    _seed()
+    book = wallet.Wallet()
+    book.register_user("Eva", "eva@mail.com", "1111", 10.0)
+    book.authenticate_user("eva@mail.com", "1111")
+    batches = []
+    delivery = _delivery(batches.append, target=book)
+    wallet.deposit("ana@mail.com", 5.0)
+    book.deposit("eva@mail.com", 5.0)
+    assert delivery.flush() == 1
+    assert delivery._outboxes == {}
+    delivery.close()
+    assert book._outbox is None
+    assert [n.email for batch in batches for n in batch] == ["eva@mail.com"]
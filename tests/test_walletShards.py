@@ -0,0 +1,136 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+import walletShards
+
+
+def _cross_shard_pair(sharded):
+    emails = [f"user{i}@mail.com" for i in range(16)]
+    sender = emails[0]
+    receiver = next(e for e in emails if sharded.shard_of(e) != sharded.shard_of(sender))
+    return sender, receiver
+
+
+def _seed(sharded, *emails):
+    for email in emails:
+        assert sharded.register_user("User", email, "1234", 100.0).success
+        assert sharded.authenticate_user(email, "1234").success
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    with walletShards.ShardedWallet(2, data_dir=str(tmp_path)) as sharded:
+        yield sharded
+
+
+def test_escrow_steps_are_idempotent():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    wallet.register_user("Rui", "rui@mail.com", "4321", 0.0)
+    wallet.authenticate_user("ana@mail.com", "1234")
+
+    assert wallet.escrow_debit("t1", "ana@mail.com", "rui@mail.com", 3_000_000).success
+    assert wallet.escrow_debit("t1", "ana@mail.com", "rui@mail.com", 3_000_000).success
+    assert wallet.users_db["ana@mail.com"].balance == 70.0
+    assert wallet.escrow_credit("t1", "rui@mail.com", "ana@mail.com", 3_000_000).success
+    assert wallet.escrow_credit("t1", "rui@mail.com", "ana@mail.com", 3_000_000).success
+    assert wallet.users_db["rui@mail.com"].balance == 30.0
+    assert wallet.escrow_settle("t1") is True
+    assert wallet.escrow_release("t1") is False
+    assert wallet.pending_escrows() == {}
+    assert wallet.escrow_end("t1") is True
+    assert wallet.escrow_end("t1") is False
+    assert not wallet.default_wallet()._escrow_credited
+
+
+def test_cross_shard_transfer(sharded):
+    sender, receiver = _cross_shard_pair(sharded)
+    _seed(sharded, sender, receiver)
+
+    assert sharded.transfer(sender, receiver, 40.0).success
+    assert sharded.view_balance(sender).balance == 60.0
+    assert sharded.view_balance(receiver).balance == 140.0
+    assert not sharded.transfer(sender, receiver, 500.0).success
+    assert sharded.total_funds_mc() == 200 * wallet.MILLICENTS_PER_DOLLAR
+
+
+def test_run_batch_keeps_input_order(sharded):
+    sender, receiver = _cross_shard_pair(sharded)
+    _seed(sharded, sender, receiver)
+
+    results = sharded.run_batch([
+        ("deposit", sender, 10.0),
+        ("transfer", sender, receiver, 110.0),
+        ("withdraw", sender, 1.0),
+        ("withdraw", receiver, 210.0),
+    ])
+    assert [r.success for r in results] == [True, True, False, True]
+    assert sharded.view_balance(sender).balance == 0.0
+    assert sharded.view_balance(receiver).balance == 0.0
+
+
+def test_cross_shard_transfer_checks_the_token(sharded):
+    sender, receiver = _cross_shard_pair(sharded)
+    _seed(sharded, sender, receiver)
+    token = sharded.authenticate_user(sender, "1234").token
+
+    forged = sharded.transfer(sender, receiver, 10.0, token="forged")
+    assert forged.reason is wallet.Reason.INVALID_SESSION
+    assert sharded.transfer(sender, receiver, 10.0, token=token).success
+    assert sharded.view_balance(sender, token=token).balance == 90.0
+    assert sharded.total_funds_mc() == 200 * wallet.MILLICENTS_PER_DOLLAR
+
+
+def test_worker_killed_after_commit_is_completed_on_recover(sharded, monkeypatch):
+    sender, receiver = _cross_shard_pair(sharded)
+    _seed(sharded, sender, receiver)
+    log_commit = sharded._log_commit
+
+    def log_then_kill(*args):
+        log_commit(*args)
+        sharded._procs[sharded.shard_of(receiver)].kill()
+        sharded._procs[sharded.shard_of(receiver)].join()
+
+    monkeypatch.setattr(sharded, "_log_commit", log_then_kill)
+    assert sharded.transfer(sender, receiver, 25.0).success
+    assert sharded.view_balance(receiver).message == walletShards.SHARD_UNAVAILABLE
+
+    report = sharded.recover()
+    assert report["restarted"] == 1 and report["completed"] == 1
+    sharded.authenticate_user(receiver, "1234")
+    assert sharded.view_balance(sender).balance == 75.0
+    assert sharded.view_balance(receiver).balance == 125.0
+    assert sharded.total_funds_mc() == 200 * wallet.MILLICENTS_PER_DOLLAR
+
+
+def test_escrow_without_commit_is_released_on_recover(sharded):
+    sender, receiver = _cross_shard_pair(sharded)
+    _seed(sharded, sender, receiver)
+
+    sharded._call(sharded.shard_of(sender), "escrow_debit", "lost", sender, receiver, 1_000_000)
+    sharded._procs[sharded.shard_of(sender)].kill()
+    sharded._procs[sharded.shard_of(sender)].join()
+    assert sharded.deposit(sender, 1.0).message == walletShards.SHARD_UNAVAILABLE
+
+    assert sharded.recover()["released"] == 1
+    sharded.authenticate_user(sender, "1234")
+    assert sharded.view_balance(sender).balance == 100.0
+    assert sharded.total_funds_mc() == 200 * wallet.MILLICENTS_PER_DOLLAR
+
+
+def test_token_only_escrow_debit_can_be_released_and_settled():
+    wallet.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    token = wallet.authenticate_user("ana@mail.com", "1234").token
+
+    assert wallet.escrow_debit("t1", None, "rui@mail.com", 3_000_000, token=token).success
+    assert wallet.pending_escrows() == {"t1": ("ana@mail.com", "rui@mail.com", 3_000_000)}
+    assert wallet.escrow_release("t1") is True
+    assert wallet.users_db["ana@mail.com"].balance == 100.0
+
+    assert wallet.escrow_debit("t2", None, "rui@mail.com", 3_000_000, token=token).success
+    assert wallet.escrow_settle("t2") is True
+    assert wallet.users_db["ana@mail.com"].balance == 70.0
+    assert wallet.ledger_summary(verify=True).success
@@ -0,0 +1,115 @@
+import sys
+import os
+import json
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import pytest
+
+import digitalWalletSystem as wallet
+import walletTenants
+
+
+def _registry(tmp_path, **options):
+    # no background thread: the tests evict explicitly
+    return walletTenants.TenantRegistry(str(tmp_path), **options)
+
+
+def test_tenants_are_isolated(tmp_path):
+    registry = _registry(tmp_path)
+    with registry.tenant("acme") as acme, registry.tenant("globex") as globex:
+        acme.register_user("Ana", "ana@mail.com", "1234", 100.0)
+        globex.register_user("Ana", "ana@mail.com", "4321", 5.0)
+        assert acme is not globex
+        assert acme.authenticate_user("ana@mail.com", "1234").success
+        assert not globex.authenticate_user("ana@mail.com", "1234").success
+        assert acme.ledger_summary().total_balance == 100.0
+        assert globex.ledger_summary().total_balance == 5.0
+    assert "ana@mail.com" not in wallet.users_db
+    with pytest.raises(ValueError):
+        with registry.tenant("../escape"):
+            pass
+
+
+def test_eviction_round_trips_through_disk(tmp_path):
+    registry = _registry(tmp_path)
+    with registry.tenant("acme") as acme:
+        acme.register_user("Ana", "ana@mail.com", "1234", 100.0)
+        acme.register_user("Rui", "rui@mail.com", "4321", 50.0)
+        acme.authenticate_user("ana@mail.com", "1234")
+        acme.deposit("ana@mail.com", 25.0)
+        for _ in range(wallet.MAX_LOGIN_ATTEMPTS):
+            acme.authenticate_user("rui@mail.com", "0000")
+        history = acme.view_history("ana@mail.com").entries
+        summary = acme.ledger_summary()
+
+    assert registry.evict("acme")
+    assert registry.resident() == [] and registry.tenants() == ["acme"]
+    path = tmp_path / "acme.tenant"
+    written = path.stat().st_mtime_ns
+
+    with registry.tenant("acme") as acme:
+        assert acme.view_balance("ana@mail.com").balance == 125.0
+        assert acme.view_history("ana@mail.com").entries == history
+        assert acme.users_db["rui@mail.com"].locked
+        assert acme.ledger_summary() == summary
+    assert registry.loads == 1
+
+    # nothing changed since the load, so the second eviction leaves the file alone
+    assert registry.evict("acme")
+    assert path.stat().st_mtime_ns == written
+    assert registry.evictions == 2
+
+    # a wrong PIN alone changes the account, so it is saved
+    with registry.tenant("acme") as acme:
+        assert not acme.authenticate_user("ana@mail.com", "0000").success
+    assert registry.evict("acme")
+    with registry.tenant("acme") as acme:
+        assert acme.users_db["ana@mail.com"].login_attempts == 1
+
+
+def test_capacity_evicts_least_recently_used_but_not_pinned(tmp_path):
+    registry = _registry(tmp_path, capacity=2)
+    for name in ("a", "b"):
+        with registry.tenant(name) as tenant:
+            tenant.register_user("Ana", "ana@mail.com", "1234", 1.0)
+    with registry.tenant("a"):
+        pass
+    with registry.tenant("c"):
+        assert registry.resident() == ["a", "c"]  # b was least recently used
+    with registry.tenant("a"), registry.tenant("c"):
+        assert not registry.evict("a")
+        with registry.tenant("b") as b:
+            # a and c are in use, so capacity is exceeded rather than evicting them
+            assert sorted(registry.resident()) == ["a", "b", "c"]
+            assert b.view_balance("ana@mail.com").message == "Access denied. User not logged in."
+            assert "ana@mail.com" in b.users_db
+    assert registry.evict_idle(0.0) == 3
+    assert registry.resident() == []
+
+
+def test_setup_runs_on_every_load(tmp_path):
+    loaded = []
+    registry = _registry(tmp_path, setup=lambda name, tenant: loaded.append((name, tenant)))
+    with registry.tenant("acme") as first:
+        first.register_user("Ana", "ana@mail.com", "1234", 1.0)
+        token = first.authenticate_user("ana@mail.com", "1234").token
+    registry.close()
+    with registry.tenant("acme") as second:
+        assert second is not first
+        assert second.view_balance(None, token=token).message == wallet.INVALID_SESSION
+    assert loaded == [("acme", first), ("acme", second)]
+
+
+def test_tenant_files_are_plain_data(tmp_path):
+    registry = _registry(tmp_path)
+    with registry.tenant("acme") as acme:
+        acme.register_user("Ana", "ana@mail.com", "1234", 100.0)
+    assert registry.evict("acme")
+    data = json.loads((tmp_path / "acme.tenant").read_text())
+    assert data["version"] == walletTenants.TENANT_VERSION
+    assert data["accounts"][0]["balance_mc"] == 10_000_000
+
+    (tmp_path / "globex.tenant").write_bytes(b"\x80\x05K\x01.")  # a pickle
+    with pytest.raises(ValueError):
+        with registry.tenant("globex"):
+            pass